@@ -2,24 +2,149 @@
 FastAPI 이상 탐지 API 클라이언트
 """
 import requests
-from typing import Tuple, List, Optional, Dict
+from requests.adapters import HTTPAdapter
+from typing import Tuple, List, Optional, Dict, Callable, Iterable, Sequence, Union
 from PIL import Image
 import io
 import os
 import zipfile
-import csv
 import tempfile
+import threading
+import shutil
+import sqlite3
+import itertools
+import time
+from collections import deque
+from collections.abc import Sized
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from batch_job import JobManifest, backoff_delay, is_retryable_error
+from chunk_planner import ChunkPlanner
+from endpoints import EndpointPool
+from folder_scan import IMAGE_EXTENSIONS, iter_chunks, iter_image_files
+from instrumentation import NULL_TIMER, Instrumentation
+from metrics import evaluate_threshold, ranking_metrics, threshold_sweep
+from overlay_export import ExportProgressCallback, export_overlays
+from preprocess import PreparedImages, Preprocessor, content_type_for
+from result_cache import ResultCache
+from result_zip import SCORES_CSV, find_overlay_members, merge_result_zips, read_score_table, write_result_zip
+from streaming import (MultipartFileStream, ProgressCallback, TransferCallback, TransferProgress, chain_progress,
+                       download_to_file)
+
+# 요청 제한 시간 초과 시 에러 메시지 (청크 크기 조절에서 시간 초과를 구분할 때 사용)
+TIMEOUT_ERROR = "요청 시간이 초과되었습니다."
+
+# stop_event로 중단한 청크 배치 추론의 에러 메시지
+CANCELLED_ERROR = "작업이 취소되었습니다."
 
 
 class VisionADClient:
     """Vision Anomaly Detection API 클라이언트"""
 
-    def __init__(self, base_url: str = "http://bigsoft.iptime.org:55630"):
+    # 배치 요청 기본 제한 시간 (초)
+    BATCH_TIMEOUT = 300
+
+    def __init__(self, base_url: Union[str, Sequence[str], EndpointPool] = "http://bigsoft.iptime.org:55630",
+                 pool_connections: int = 4, pool_maxsize: int = 16,
+                 pool_block: bool = False, keep_alive: bool = True,
+                 cache: Optional[ResultCache] = None, preprocessor: Optional[Preprocessor] = None,
+                 instrumentation: Optional[Instrumentation] = None):
         """
         Args:
-            base_url: FastAPI 서버 주소
+            base_url: FastAPI 서버 주소, 여러 서버의 주소 리스트(또는 쉼표로 구분한 문자열), 또는 EndpointPool
+                      (여러 서버이면 요청/청크마다 진행 중인 작업이 가장 적은 서버로 보냄, 모두 같은 모델이라고 가정)
+            pool_connections: 호스트별 커넥션 풀을 캐시할 최대 호스트 수
+            pool_maxsize: 호스트 하나당 유지할 최대 커넥션 수
+            pool_block: True이면 pool_maxsize를 넘는 요청은 커넥션이 반납될 때까지 대기
+            keep_alive: False이면 요청마다 커넥션을 닫음 (Connection: close)
+            cache: 추론 결과 캐시 (지정하면 캐시된 이미지는 서버로 보내지 않음)
+            preprocessor: 업로드 전 이미지 전처리기 (지정하면 리사이즈/재인코딩한 이미지를 원본 파일명으로 전송)
+            instrumentation: 호출별 단계 시간/전송량 기록기 (None이면 계측하지 않음)
+        """
+        self.endpoints = base_url if isinstance(base_url, EndpointPool) else EndpointPool(base_url)
+        self.base_url = self.endpoints.primary_url
+        self.cache = cache
+        self.preprocessor = preprocessor
+        self.instrumentation = instrumentation
+        self.pool_connections = pool_connections
+        self.pool_maxsize = pool_maxsize
+        self.pool_block = pool_block
+        self.keep_alive = keep_alive
+
+        self._session_lock = threading.Lock()
+        self._session = None
+
+    @property
+    def session(self) -> requests.Session:
+        """
+        모든 호출이 공유하는 keep-alive 세션 (최초 접근 시 생성)
+
+        커넥션 풀(urllib3)은 스레드 안전하므로 GUI 작업 스레드에서 그대로 재사용할 수 있습니다.
         """
-        self.base_url = base_url.rstrip('/')
+        with self._session_lock:
+            if self._session is None:
+                self._session = self._create_session()
+            return self._session
+
+    def _create_session(self) -> requests.Session:
+        """커넥션 풀 설정이 적용된 세션 생성"""
+        session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=self.pool_connections,
+            pool_maxsize=self.pool_maxsize,
+            pool_block=self.pool_block
+        )
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        session.headers['Connection'] = 'keep-alive' if self.keep_alive else 'close'
+        return session
+
+    def close(self):
+        """세션과 풀에 남아있는 커넥션, 전처리 프로세스 풀, 서버 상태 확인 스레드를 모두 닫음 (다시 호출하면 새로 생성됨)"""
+        with self._session_lock:
+            if self._session is not None:
+                self._session.close()
+                self._session = None
+        self.endpoints.close()
+        if self.preprocessor:
+            self.preprocessor.close()
+
+    def _cache_namespace(self) -> str:
+        """캐시 키에 포함할 서버/전처리 구분 문자열"""
+        if self.preprocessor:
+            return f"{self.base_url}|{self.preprocessor.signature}"
+        return self.base_url
+
+    def _prepare_uploads(self, image_paths: List[str]) -> PreparedImages:
+        """업로드할 파일 경로와 Content-Type (전처리기가 있으면 전처리 결과)"""
+        if self.preprocessor:
+            return self.preprocessor.prepare(image_paths)
+        return PreparedImages(list(image_paths), [content_type_for(p) for p in image_paths])
+
+    def _start_timer(self, kind: str, images: int = 1):
+        """호출 계측 시작 (instrumentation이 없으면 아무것도 하지 않는 타이머)"""
+        if self.instrumentation is None:
+            return NULL_TIMER
+        return self.instrumentation.start(kind, images)
+
+    @staticmethod
+    def _upload_progress(timer, callback: Optional[ProgressCallback]) -> Optional[ProgressCallback]:
+        """마지막 바이트를 보낸 시점에 upload 단계를 끝내도록 업로드 진행 콜백 감싸기"""
+        if timer is NULL_TIMER:
+            return callback
+
+        def on_progress(sent, total):
+            if sent >= total:
+                timer.mark('upload')
+            if callback:
+                callback(sent, total)
+
+        return on_progress
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
 
     def inference_single(self, image_path: str) -> Tuple[Optional[Image.Image], Optional[float], Optional[str]]:
         """
@@ -31,69 +156,688 @@ class VisionADClient:
         Returns:
             (결과 이미지, anomaly_score, 에러 메시지)
         """
-        try:
-            url = f"{self.base_url}/InferenceVisionAD_Single"
-
-            with open(image_path, 'rb') as f:
-                files = {'file': (image_path.split('/')[-1], f, 'image/jpeg')}
-                response = requests.post(url, files=files, timeout=60)
-
-            if response.status_code == 200:
-                # 헤더에서 anomaly score 추출
-                anomaly_score = float(response.headers.get('X-Anomaly-Score', 0.0))
-
-                # 이미지 데이터를 PIL Image로 변환
-                result_image = Image.open(io.BytesIO(response.content))
+        timer = self._start_timer('single')
+        result = self._inference_single(image_path, timer)
+        timer.finish(result[2])
+        return result
 
-                return result_image, anomaly_score, None
-            else:
-                return None, None, f"API Error: {response.status_code}"
+    def _inference_single(self, image_path: str,
+                          timer) -> Tuple[Optional[Image.Image], Optional[float], Optional[str]]:
+        try:
+            # 캐시에 overlay까지 있으면 서버 요청 없이 반환
+            cache_key = None
+            if self.cache:
+                cache_key = self.cache.key_for(image_path, self._cache_namespace())
+                entry = self.cache.get(cache_key, require_overlay=True)
+                timer.mark('cache')
+                if entry:
+                    with open(entry.overlay_path, 'rb') as f:
+                        result_image = Image.open(io.BytesIO(f.read()))
+                        result_image.load()
+                    timer.mark('decode')
+                    return result_image, entry.score, None
+
+            with self._prepare_uploads([image_path]) as prepared:
+                timer.mark('prepare')
+                fields = [('file', image_path.split('/')[-1], prepared.paths[0], prepared.content_types[0])]
+
+                # 진행 중인 작업이 가장 적은 서버로 전송 (걸린 시간과 실패 여부는 서버별 통계에 기록)
+                # 연결하지 못하면 아직 시도하지 않은 다른 서버로 다시 전송
+                tried = []
+                while True:
+                    try:
+                        with self.endpoints.acquire(1, exclude=tried) as lease:
+                            tried.append(lease.endpoint)
+                            url = f"{lease.url}/InferenceVisionAD_Single"
+                            with MultipartFileStream(fields, progress_callback=self._upload_progress(timer, None)) as body:
+                                response = self.session.post(url, data=body, headers={'Content-Type': body.content_type},
+                                                             timeout=60, stream=True)
+                                timer.mark('server')
+                                timer.add_bytes(up=len(body))
+
+                            with response:
+                                if response.status_code != 200:
+                                    if response.status_code >= 500:
+                                        lease.mark_failed()
+                                    return None, None, f"API Error: {response.status_code}"
+
+                                # 헤더에서 anomaly score 추출
+                                anomaly_score = float(response.headers.get('X-Anomaly-Score', 0.0))
+                                content = response.content
+                                timer.mark('download')
+                                timer.add_bytes(down=len(content))
+                        break
+                    except requests.exceptions.ConnectionError:
+                        if not self.endpoints.has_alternative(tried):
+                            raise
+
+            # 이미지 데이터를 PIL Image로 변환 (디코딩까지 이 스레드에서 수행)
+            result_image = Image.open(io.BytesIO(content))
+            result_image.load()
+            timer.mark('decode')
+
+            if cache_key:
+                # 캐시된 결과로 배치 ZIP을 만들 때 서버 ZIP과 같은 overlays/<stem>.<ext> 구조가 되도록 저장
+                stem = os.path.splitext(os.path.basename(image_path))[0]
+                overlay_name = f"overlays/{stem}.{(result_image.format or 'png').lower()}"
+                self.cache.put(cache_key, anomaly_score, overlay_name, content)
+                timer.mark('cache')
+
+            return result_image, anomaly_score, None
 
         except requests.exceptions.ConnectionError:
             return None, None, "서버에 연결할 수 없습니다. 서버가 실행 중인지 확인하세요."
         except requests.exceptions.Timeout:
-            return None, None, "요청 시간이 초과되었습니다."
+            return None, None, TIMEOUT_ERROR
         except Exception as e:
             return None, None, f"Error: {str(e)}"
 
-    def inference_batch(self, image_paths: List[str], output_path: str) -> Tuple[bool, Optional[str]]:
+    def inference_batch(self, image_paths: List[str], output_path: str,
+                        upload_callback: Optional[ProgressCallback] = None,
+                        download_callback: Optional[ProgressCallback] = None,
+                        timeout: Optional[float] = None,
+                        progress_callback: Optional[TransferCallback] = None) -> Tuple[bool, Optional[str]]:
         """
         배치 이미지 이상 탐지 추론
 
+        이미지는 메모리에 미리 읽어두지 않고 전송하면서 디스크에서 스트리밍하고,
+        결과 ZIP도 청크 단위로 임시 파일에 받은 뒤 output_path로 원자적으로 교체합니다.
+
         Args:
             image_paths: 이미지 파일 경로 리스트
             output_path: 결과 ZIP 파일을 저장할 경로
+            upload_callback: 업로드 진행 콜백 (전송한 바이트 수, 전체 바이트 수)
+            download_callback: 다운로드 진행 콜백 (받은 바이트 수, 전체 바이트 수 또는 None)
+            timeout: 요청 제한 시간 (초, None이면 BATCH_TIMEOUT)
+            progress_callback: 단계별(업로드 → 서버 처리 대기 → 다운로드 → 종료) 진행 이벤트 콜백
+                               (처리량/남은 시간 포함, 0.1초 간격으로 제한, streaming.TransferProgress 참고)
 
         Returns:
             (성공 여부, 에러 메시지)
         """
+        timer = self._start_timer('batch', len(image_paths))
+        timeout = timeout or self.BATCH_TIMEOUT
+        progress = TransferProgress(progress_callback) if progress_callback else None
+        if progress:
+            upload_callback = chain_progress(progress.upload, upload_callback)
+            download_callback = chain_progress(progress.download, download_callback)
+        if self.cache:
+            success, error = self._inference_batch_cached(image_paths, output_path, upload_callback,
+                                                          download_callback, timer, timeout)
+        else:
+            success, error = self._post_batch(image_paths, output_path, upload_callback, download_callback,
+                                              timer, timeout)
+        timer.finish(error)
+        if progress:
+            progress.finish(error)
+        return success, error
+
+    def _post_batch(self, image_paths: List[str], output_path: str,
+                    upload_callback: Optional[ProgressCallback] = None,
+                    download_callback: Optional[ProgressCallback] = None,
+                    timer=NULL_TIMER, timeout: Optional[float] = None) -> Tuple[bool, Optional[str]]:
+        """배치 추론 요청을 서버로 전송하고 결과 ZIP 저장 (캐시 미사용)"""
         try:
-            url = f"{self.base_url}/InferenceVisionAD_Batch"
+            with self._prepare_uploads(image_paths) as prepared:
+                timer.mark('prepare')
 
-            files = []
-            for img_path in image_paths:
-                with open(img_path, 'rb') as f:
-                    file_content = f.read()
+                # 전처리 후에도 원본 파일명으로 전송해 scores.csv 파일명 매칭 유지
+                fields = []
+                for img_path, upload_path, content_type in zip(image_paths, prepared.paths, prepared.content_types):
                     filename = img_path.split('\\')[-1].split('/')[-1]
-                    files.append(('files', (filename, io.BytesIO(file_content), 'image/jpeg')))
-
-            response = requests.post(url, files=files, timeout=300)
-
-            if response.status_code == 200:
-                # ZIP 파일로 저장
-                with open(output_path, 'wb') as f:
-                    f.write(response.content)
-                return True, None
-            else:
-                return False, f"API Error: {response.status_code}"
+                    fields.append(('files', filename, upload_path, content_type))
+
+                # 진행 중인 작업이 가장 적은 서버로 전송하고, 연결하지 못하면 다른 서버로 다시 전송
+                tried = []
+                while True:
+                    try:
+                        with self.endpoints.acquire(len(image_paths), exclude=tried) as lease:
+                            tried.append(lease.endpoint)
+                            url = f"{lease.url}/InferenceVisionAD_Batch"
+                            with MultipartFileStream(fields, progress_callback=self._upload_progress(timer, upload_callback)) as body:
+                                response = self.session.post(url, data=body, headers={'Content-Type': body.content_type},
+                                                             timeout=timeout or self.BATCH_TIMEOUT, stream=True)
+                                timer.mark('server')
+                                timer.add_bytes(up=len(body))
+
+                            with response:
+                                if response.status_code == 200:
+                                    # ZIP 파일로 저장 (청크 단위 스트리밍)
+                                    download_to_file(response, output_path, progress_callback=download_callback)
+                                    timer.mark('download')
+                                    timer.add_bytes(down=os.path.getsize(output_path))
+                                    return True, None
+                                else:
+                                    if response.status_code >= 500:
+                                        lease.mark_failed()
+                                    return False, f"API Error: {response.status_code}"
+                    except requests.exceptions.ConnectionError:
+                        if not self.endpoints.has_alternative(tried):
+                            raise
 
         except requests.exceptions.ConnectionError:
             return False, "서버에 연결할 수 없습니다. 서버가 실행 중인지 확인하세요."
         except requests.exceptions.Timeout:
-            return False, "요청 시간이 초과되었습니다."
+            return False, TIMEOUT_ERROR
+        except Exception as e:
+            return False, f"Error: {str(e)}"
+
+    def _inference_batch_cached(self, image_paths: List[str], output_path: str,
+                                upload_callback: Optional[ProgressCallback] = None,
+                                download_callback: Optional[ProgressCallback] = None,
+                                timer=NULL_TIMER, timeout: Optional[float] = None) -> Tuple[bool, Optional[str]]:
+        """
+        캐시를 사용하는 배치 추론
+
+        캐시에 없는 이미지만 서버로 보내고 그 결과를 캐시에 저장한 뒤,
+        캐시 hit 결과(점수 + overlay)를 합쳐 inference_batch와 같은 형식의 ZIP을 만듭니다.
+        """
+        temp_dir = None
+
+        try:
+            keys = {}
+            entries = []  # image_paths 순서의 CacheEntry (miss이면 None)
+            misses = []
+            for img_path in image_paths:
+                key = self.cache.key_for(img_path, self._cache_namespace())
+                keys[img_path] = key
+                entry = self.cache.get(key)
+                entries.append(entry)
+                if entry is None:
+                    misses.append(img_path)
+            timer.mark('cache')
+
+            # 모두 miss이면 기존 경로 그대로 사용
+            if len(misses) == len(image_paths):
+                success, error = self._post_batch(image_paths, output_path, upload_callback, download_callback,
+                                                  timer, timeout)
+                if success:
+                    self._store_batch_results(output_path, image_paths, keys)
+                    timer.mark('cache')
+                return success, error
+
+            temp_dir = tempfile.mkdtemp(prefix='visionad_cache_')
+            header = ('img_path', 'anomaly_score')
+            miss_results = []  # misses 순서의 (scores.csv 경로, 점수, overlay 멤버, 추출한 overlay 경로) (점수가 없으면 None)
+
+            if misses:
+                miss_zip_path = os.path.join(temp_dir, 'misses.zip')
+                success, error = self._post_batch(misses, miss_zip_path, upload_callback, download_callback,
+                                                  timer, timeout)
+                if not success:
+                    return False, error
+                header = self._store_batch_results(miss_zip_path, misses, keys)
+                timer.mark('cache')
+
+                with zipfile.ZipFile(miss_zip_path, 'r') as zip_ref:
+                    table = read_score_table(zip_ref)
+                    overlay_members = find_overlay_members(zip_ref)
+                    for img_path, row in zip(misses, table.match(misses)):
+                        if row is None:
+                            miss_results.append(None)
+                            continue
+                        member = overlay_members.get(os.path.splitext(os.path.basename(img_path))[0])
+                        overlay_path = zip_ref.extract(member, os.path.join(temp_dir, 'overlays')) if member else None
+                        miss_results.append((table.paths[row], table.scores[row], member, overlay_path))
+
+            # scores.csv 행은 업로드 순서(image_paths)대로 기록
+            # (파일명이 같은 이미지는 ScoreTable.match가 행 순서로 대응시키므로 hit/miss 순서가 섞이면 점수가 바뀜)
+            rows = []
+            overlays = []
+            overlay_names = set()
+            miss_iter = iter(miss_results)
+            for img_path, entry in zip(image_paths, entries):
+                if entry is None:
+                    result = next(miss_iter)
+                    if result is None:
+                        continue
+                    row_path, score, member, overlay_path = result
+                else:
+                    row_path, score, member, overlay_path = (os.path.basename(img_path), entry.score,
+                                                             entry.overlay_name, entry.overlay_path)
+                rows.append((row_path, score))
+                # 같은 이름의 overlay는 먼저 나온 것만 유지 (find_overlay_members와 같은 기준)
+                if member and overlay_path and member not in overlay_names:
+                    overlay_names.add(member)
+                    overlays.append((member, overlay_path))
+
+            merged_path = os.path.join(temp_dir, 'merged.zip')
+            write_result_zip(merged_path, rows, overlays, header)
+            shutil.move(merged_path, output_path)
+            timer.mark('merge')
+            return True, None
+
+        except Exception as e:
+            return False, f"Error: {str(e)}"
+
+        finally:
+            if temp_dir:
+                shutil.rmtree(temp_dir, ignore_errors=True)
+
+    def _store_batch_results(self, zip_path: str, image_paths: List[str], keys: Dict[str, str]) -> Tuple[str, str]:
+        """
+        배치 결과 ZIP의 점수와 overlay를 캐시에 저장
+
+        Returns:
+            결과 ZIP scores.csv의 (경로 컬럼, 점수 컬럼) 이름
+        """
+        with zipfile.ZipFile(zip_path, 'r') as zip_ref:
+            table = read_score_table(zip_ref)
+            overlay_members = find_overlay_members(zip_ref)
+
+            for img_path, row in zip(image_paths, table.match(image_paths)):
+                if row is None:
+                    continue
+
+                overlay_name = overlay_members.get(os.path.splitext(os.path.basename(img_path))[0])
+                overlay_data = None
+                if overlay_name and self.cache.store_overlays:
+                    overlay_data = zip_ref.read(overlay_name)
+
+                self.cache.put(keys[img_path], table.scores[row], overlay_name, overlay_data)
+
+        return table.path_column, table.score_column
+
+    def inference_batch_chunked(self, image_paths: Iterable[str], output_path: str,
+                                chunk_size: int = 100, max_workers: int = 4,
+                                chunk_callback: Optional[Callable[[int, int], None]] = None,
+                                scores_callback: Optional[Callable[[List[Tuple[str, float]]], None]] = None,
+                                planner: Optional[ChunkPlanner] = None,
+                                stop_event: Optional[threading.Event] = None,
+                                progress_callback: Optional[TransferCallback] = None) -> Tuple[bool, Optional[str]]:
+        """
+        이미지들을 청크로 나누어 병렬로 배치 추론한 뒤 결과 ZIP을 하나로 병합
+
+        최대 max_workers개의 청크 요청을 동시에 보내 업로드와 서버 추론이 겹치도록 하고,
+        청크별 ZIP은 원래 순서대로 병합해 하나의 overlays + scores.csv를 만듭니다.
+        (calculate_f1_from_zip 등은 inference_batch 결과와 동일하게 사용 가능)
+
+        image_paths는 리스트뿐 아니라 제너레이터도 받을 수 있습니다 (예: folder_scan.iter_image_files).
+        입력은 청크 단위로 필요한 만큼만 소비하므로 폴더 탐색이 끝나기 전에 추론이 시작됩니다.
+
+        planner를 지정하면 청크 크기와 요청별 제한 시간을 측정된 처리 시간에 맞춰 정하고,
+        시간이 초과된 청크는 절반으로 나누어 다시 보냅니다 (결과 순서는 유지).
+
+        Args:
+            image_paths: 이미지 파일 경로 리스트 또는 이터러블
+            output_path: 병합된 결과 ZIP 파일을 저장할 경로
+            chunk_size: 요청 하나에 담을 이미지 수 (planner를 지정하면 사용하지 않음)
+            max_workers: 동시에 처리할 청크 수 (pool_maxsize 이하 권장)
+            chunk_callback: 청크 완료 콜백 (완료된 청크 수, 전체 청크 수)
+                            (image_paths가 리스트가 아니거나 planner를 사용하면 전체 청크 수 대신 지금까지 보낸 청크 수)
+            scores_callback: 청크가 끝날 때마다 그 청크의 [(이미지 경로, 점수), ...]를 전달하는 콜백
+                             (전체 병합 전에 결과를 미리 집계할 때 사용)
+            planner: 적응형 청크 크기 플래너 (chunk_planner.ChunkPlanner)
+            stop_event: set되면 새 청크를 보내지 않고 진행 중인 청크만 마친 뒤 CANCELLED_ERROR로 중단
+            progress_callback: 청크 요청별 전송 진행 이벤트 콜백 (inference_batch와 같음, 이벤트의
+                               'request'로 요청 구분, 여러 스레드에서 동시에 호출됨)
+
+        Returns:
+            (성공 여부, 에러 메시지)
+        """
+        timer = self._start_timer('chunked', 0)
+        success, error = self._inference_batch_chunked(image_paths, output_path, chunk_size, max_workers,
+                                                       chunk_callback, scores_callback, planner,
+                                                       stop_event, progress_callback, timer)
+        timer.finish(error)
+        return success, error
+
+    def _inference_batch_chunked(self, image_paths: Iterable[str], output_path: str, chunk_size: int,
+                                 max_workers: int, chunk_callback: Optional[Callable[[int, int], None]],
+                                 scores_callback: Optional[Callable[[List[Tuple[str, float]]], None]],
+                                 planner: Optional[ChunkPlanner], stop_event: Optional[threading.Event],
+                                 progress_callback: Optional[TransferCallback],
+                                 timer) -> Tuple[bool, Optional[str]]:
+        if chunk_size < 1 or max_workers < 1:
+            return False, "chunk_size와 max_workers는 1 이상이어야 합니다"
+        if stop_event is not None and stop_event.is_set():
+            return False, CANCELLED_ERROR
+
+        # (이미지 경로 리스트, 파일 크기 합 또는 None)
+        if planner:
+            chunks = planner.iter_chunks(image_paths)
+        else:
+            chunks = ((chunk, None) for chunk in iter_chunks(image_paths, chunk_size))
+        first = next(chunks, None)
+        if first is None:
+            return False, "추론할 이미지가 없습니다"
+        second = next(chunks, None)
+
+        # 청크가 하나뿐이면 병합 없이 바로 저장 (planner는 시간 초과 시 나누어 보내야 하므로 제외)
+        if second is None and planner is None:
+            first = first[0]
+            timer.add_images(len(first))
+            success, error = self.inference_batch(first, output_path, progress_callback=progress_callback)
+            if success:
+                try:
+                    if scores_callback:
+                        scores_callback(self._read_chunk_scores(output_path, first))
+                except Exception as e:
+                    return False, f"Error: {str(e)}"
+                if chunk_callback:
+                    chunk_callback(1, 1)
+            return success, error
+
+        total_chunks = None
+        if isinstance(image_paths, Sized) and planner is None:
+            total_chunks = (len(image_paths) + chunk_size - 1) // chunk_size
+
+        temp_dir = tempfile.mkdtemp(prefix='visionad_chunks_')
+        # 청크 키는 (순번,) 이고 나누어 다시 보낸 청크는 (순번, 0), (순번, 1) ... 이므로 키 순서가 곧 병합 순서
+        chunk_zip_paths = {}
+        pending = {}
+        split_queue = deque()
+        stopped = False
+
+        try:
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                # 대기 중인 청크는 max_workers의 두 배까지만 만들어 입력을 미리 다 읽지 않음
+                remaining = itertools.chain([first] if second is None else [first, second], chunks)
+                submitted = 0
+                completed = 0
+
+                while True:
+                    while len(pending) < max_workers * 2:
+                        if split_queue:
+                            key, chunk, payload = split_queue.popleft()
+                        else:
+                            entry = next(remaining, None)
+                            if entry is None:
+                                break
+                            key, (chunk, payload) = (submitted,), entry
+                            submitted += 1
+
+                        # 중단 요청 이후에는 아직 시작하지 않은 청크를 버리고 진행 중인 청크만 마침
+                        if stop_event is not None and stop_event.is_set():
+                            stopped = True
+                            pending = {f: entry for f, entry in pending.items() if not f.cancel()}
+                            break
+
+                        name = 'chunk_' + '_'.join(f"{part:05d}" for part in key) + '.zip'
+                        chunk_zip_paths[key] = os.path.join(temp_dir, name)
+                        timeout = planner.request_timeout(len(chunk)) if planner else None
+                        future = executor.submit(self._timed_batch, chunk, chunk_zip_paths[key], timeout,
+                                                 progress_callback)
+                        pending[future] = (key, chunk, payload)
+
+                    if not pending:
+                        break
+
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    timer.mark('chunks')
+                    for future in done:
+                        key, chunk, payload = pending.pop(future)
+                        success, error, seconds = future.result()
+                        if not success:
+                            if planner and error == TIMEOUT_ERROR and len(chunk) > 1:
+                                # 시간 초과: 크기를 줄이고 같은 이미지를 절반씩 나누어 다시 전송
+                                planner.record_timeout(len(chunk))
+                                del chunk_zip_paths[key]
+                                half = (len(chunk) + 1) // 2
+                                split_queue.append((key + (0,), chunk[:half], None))
+                                split_queue.append((key + (1,), chunk[half:], None))
+                                continue
+                            # with 블록을 나가면 shutdown(wait=True)가 대기 중인 청크까지 실행하므로 먼저 취소
+                            for pending_future in pending:
+                                pending_future.cancel()
+                            total = total_chunks or submitted
+                            return False, f"청크 {key[0] + 1}/{total} 추론 실패: {error}"
+
+                        if planner:
+                            planner.record_success(len(chunk), seconds, payload)
+                        completed += 1
+                        timer.add_images(len(chunk))
+                        if scores_callback:
+                            scores_callback(self._read_chunk_scores(chunk_zip_paths[key], chunk))
+                        if chunk_callback:
+                            chunk_callback(completed, total_chunks or submitted)
+
+            if stopped:
+                return False, CANCELLED_ERROR
+
+            merge_result_zips([chunk_zip_paths[key] for key in sorted(chunk_zip_paths)], output_path)
+            timer.mark('merge')
+            return True, None
+
         except Exception as e:
             return False, f"Error: {str(e)}"
 
+        finally:
+            shutil.rmtree(temp_dir, ignore_errors=True)
+
+    def _timed_batch(self, image_paths: List[str], output_path: str, timeout: Optional[float],
+                     progress_callback: Optional[TransferCallback] = None) -> Tuple[bool, Optional[str], float]:
+        """inference_batch를 실행하고 걸린 시간(초)을 함께 반환"""
+        start = time.perf_counter()
+        success, error = self.inference_batch(image_paths, output_path, timeout=timeout,
+                                              progress_callback=progress_callback)
+        return success, error, time.perf_counter() - start
+
+    def inference_folder(self, folder: str, output_path: str, recursive: bool = True,
+                         extensions: Sequence[str] = IMAGE_EXTENSIONS,
+                         chunk_size: int = 100, max_workers: int = 4,
+                         chunk_callback: Optional[Callable[[int, int], None]] = None,
+                         scores_callback: Optional[Callable[[List[Tuple[str, float]]], None]] = None,
+                         planner: Optional[ChunkPlanner] = None,
+                         stop_event: Optional[threading.Event] = None,
+                         progress_callback: Optional[TransferCallback] = None) -> Tuple[bool, Optional[str]]:
+        """
+        폴더 아래의 이미지를 탐색하면서 바로 청크 단위로 배치 추론
+
+        폴더 탐색은 제너레이터로 진행되어, 첫 청크가 채워지면 나머지를 탐색하는 동안 추론이 시작됩니다.
+        인자와 결과는 inference_batch_chunked와 같습니다.
+
+        Args:
+            folder: 이미지 폴더
+            output_path: 결과 ZIP 파일을 저장할 경로
+            recursive: 하위 폴더까지 탐색할지 여부
+            extensions: 수집할 확장자
+
+        Returns:
+            (성공 여부, 에러 메시지)
+        """
+        if not os.path.isdir(folder):
+            return False, f"폴더를 찾을 수 없습니다: {folder}"
+
+        return self.inference_batch_chunked(iter_image_files(folder, extensions, recursive), output_path,
+                                            chunk_size, max_workers, chunk_callback, scores_callback, planner,
+                                            stop_event, progress_callback)
+
+    def inference_batch_resumable(self, image_paths: Optional[Iterable[str]], output_path: str,
+                                  job_dir: Optional[str] = None, chunk_size: int = 100, max_workers: int = 4,
+                                  max_retries: int = 5, backoff_base: float = 1.0, backoff_max: float = 60.0,
+                                  chunk_callback: Optional[Callable[[int, int], None]] = None,
+                                  scores_callback: Optional[Callable[[List[Tuple[str, float]]], None]] = None,
+                                  stop_event: Optional[threading.Event] = None,
+                                  keep_job: bool = False,
+                                  progress_callback: Optional[TransferCallback] = None) -> Tuple[bool, Optional[str]]:
+        """
+        중단되어도 이어서 실행할 수 있는 청크 배치 추론
+
+        청크가 끝날 때마다 결과 ZIP과 이미지별 점수를 작업 폴더의 매니페스트(batch_job.JobManifest)에 기록하고,
+        실패한 청크는 지수 백오프 + jitter로 최대 max_retries번 다시 보냅니다.
+        같은 job_dir로 다시 호출하면 완료되지 않은 청크의 이미지만 전송하며,
+        청크 구성과 병합 순서가 같으므로 최종 ZIP은 중단 없이 실행한 결과와 같습니다.
+
+        Args:
+            image_paths: 이미지 파일 경로 리스트 또는 이터러블
+                         (이어서 실행할 때는 None 가능, 지정하면 기록된 목록과 같은지 확인)
+            output_path: 병합된 결과 ZIP 파일을 저장할 경로
+            job_dir: 작업 폴더 (기본값: output_path + '.job')
+            chunk_size: 요청 하나에 담을 이미지 수 (이어서 실행할 때는 기록된 값 사용)
+            max_workers: 동시에 처리할 청크 수
+            max_retries: 청크 하나의 최대 재시도 횟수
+            backoff_base: 첫 재시도의 최대 대기 시간 (초, 재시도마다 두 배)
+            backoff_max: 재시도 대기 시간 상한 (초)
+            chunk_callback: 청크 완료 콜백 (완료된 청크 수, 전체 청크 수)
+            scores_callback: 청크가 끝날 때마다 [(이미지 경로, 점수), ...]를 전달하는 콜백
+                             (이어서 실행하면 이전에 완료된 청크의 점수를 먼저 전달)
+            stop_event: set되면 새 청크를 보내지 않고 진행 중인 청크만 마친 뒤 중단
+            keep_job: True이면 성공 후에도 작업 폴더를 남김
+            progress_callback: 청크 요청별 전송 진행 이벤트 콜백 (inference_batch_chunked와 같음)
+
+        Returns:
+            (성공 여부, 에러 메시지)
+        """
+        timer = self._start_timer('job', 0)
+        job_dir = job_dir or output_path + '.job'
+        try:
+            manifest = JobManifest(job_dir)
+        except (OSError, sqlite3.Error) as e:
+            timer.finish(str(e))
+            return False, f"작업 폴더를 열 수 없습니다: {str(e)}"
+
+        try:
+            success, error = self._run_batch_job(
+                manifest, image_paths, output_path, chunk_size, max_workers,
+                (max_retries, backoff_base, backoff_max), chunk_callback, scores_callback,
+                stop_event or threading.Event(), progress_callback, timer)
+        finally:
+            manifest.close()
+
+        # 성공했거나 이미지가 하나도 기록되지 않은 작업 폴더는 남길 필요가 없음
+        if (success and not keep_job) or not manifest.image_count:
+            shutil.rmtree(job_dir, ignore_errors=True)
+        timer.finish(error)
+        return success, error
+
+    def _run_batch_job(self, manifest: JobManifest, image_paths: Optional[Iterable[str]], output_path: str,
+                       chunk_size: int, max_workers: int, retry: Tuple[int, float, float],
+                       chunk_callback: Optional[Callable[[int, int], None]],
+                       scores_callback: Optional[Callable[[List[Tuple[str, float]]], None]],
+                       stop_event: threading.Event, progress_callback: Optional[TransferCallback],
+                       timer) -> Tuple[bool, Optional[str]]:
+        if chunk_size < 1 or max_workers < 1:
+            return False, "chunk_size와 max_workers는 1 이상이어야 합니다"
+
+        try:
+            if not manifest.initialized:
+                if image_paths is None:
+                    return False, f"이어서 실행할 작업이 없습니다: {manifest.job_dir}"
+                manifest.initialize(image_paths, chunk_size)
+            elif image_paths is not None:
+                if not isinstance(image_paths, Sequence):
+                    image_paths = list(image_paths)
+                if not manifest.matches(image_paths):
+                    return False, (f"작업 폴더의 이미지 목록이 현재 선택과 다릅니다. "
+                                   f"새로 시작하려면 작업 폴더를 삭제하세요: {manifest.job_dir}")
+            timer.mark('prepare')
+
+            if not manifest.image_count:
+                return False, "추론할 이미지가 없습니다"
+
+            total_chunks = manifest.chunk_count
+            pending_indices = manifest.pending_chunks()
+            completed = total_chunks - len(pending_indices)
+            timer.mark('cache')
+
+            # 이전 실행에서 끝난 청크의 점수를 먼저 전달해 콜백이 모든 이미지를 한 번씩 받도록 함
+            if completed:
+                if scores_callback:
+                    done_indices = set(range(total_chunks)) - set(pending_indices)
+                    for index in sorted(done_indices):
+                        scores_callback(manifest.chunk_scores(index))
+                if chunk_callback:
+                    chunk_callback(completed, total_chunks)
+
+            failure = None
+            halt = threading.Event()  # 실패 후 아직 시작하지 않은 청크를 보내지 않도록 알림
+            pending = {}
+            remaining = iter(pending_indices)
+
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                while True:
+                    # 실패나 중단 요청 이후에는 새 청크를 보내지 않고 진행 중인 청크만 기록
+                    while failure is None and not stop_event.is_set() and len(pending) < max_workers * 2:
+                        index = next(remaining, None)
+                        if index is None:
+                            break
+                        chunk = manifest.chunk_images(index)
+                        future = executor.submit(self._run_job_chunk, manifest, index, chunk, retry, stop_event,
+                                                 progress_callback, halt)
+                        pending[future] = (index, chunk)
+
+                    if not pending:
+                        break
+
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    timer.mark('chunks')
+                    for future in done:
+                        index, chunk = pending.pop(future)
+                        success, error = future.result()
+                        if not success:
+                            if error == CANCELLED_ERROR:
+                                continue  # 중단 요청 후 시작되어 보내지 않은 청크 (다음 실행에서 다시 시도)
+                            if failure is None:
+                                failure = f"청크 {index + 1}/{total_chunks} 추론 실패: {error}"
+                                halt.set()
+                            continue
+
+                        scores = self._read_job_scores(manifest.chunk_zip_path(index), chunk,
+                                                       index * manifest.chunk_size)
+                        manifest.record_chunk(index, scores)
+                        completed += 1
+                        timer.add_images(len(chunk))
+                        if scores_callback:
+                            scores_callback([(chunk[i - index * manifest.chunk_size], score) for i, score in scores])
+                        if chunk_callback:
+                            chunk_callback(completed, total_chunks)
+
+                    # 실패나 중단 요청 이후에는 아직 시작하지 않은 청크를 취소
+                    if failure is not None or stop_event.is_set():
+                        pending = {f: entry for f, entry in pending.items() if not f.cancel()}
+
+            if failure:
+                return False, f"{failure} (다시 실행하면 완료되지 않은 청크부터 이어서 진행합니다)"
+            if completed < total_chunks:
+                return False, f"작업이 중단되었습니다 ({completed}/{total_chunks} 청크 완료, 다시 실행하면 이어서 진행합니다)"
+
+            merge_result_zips([manifest.chunk_zip_path(i) for i in range(total_chunks)], output_path)
+            timer.mark('merge')
+            return True, None
+
+        except Exception as e:
+            return False, f"Error: {str(e)}"
+
+    def _run_job_chunk(self, manifest: JobManifest, index: int, chunk: List[str],
+                       retry: Tuple[int, float, float], stop_event: threading.Event,
+                       progress_callback: Optional[TransferCallback] = None,
+                       halt: Optional[threading.Event] = None) -> Tuple[bool, Optional[str]]:
+        """청크 하나를 추론해 작업 폴더에 저장 (실패하면 백오프 후 재시도)"""
+        if stop_event.is_set() or (halt is not None and halt.is_set()):
+            # 대기하는 동안 중단 요청이나 다른 청크의 실패가 있었으면 보내지 않음 (시도하지 않은 것으로 처리)
+            return False, CANCELLED_ERROR
+
+        max_retries, backoff_base, backoff_max = retry
+        attempt = 0
+        while True:
+            success, error = self.inference_batch(chunk, manifest.chunk_zip_path(index),
+                                                  progress_callback=progress_callback)
+            manifest.record_attempt(index, error)
+            if success or attempt >= max_retries or not is_retryable_error(error):
+                return success, error
+
+            # 대기 중에 중단 요청이 오면 바로 종료
+            if stop_event.wait(backoff_delay(attempt, backoff_base, backoff_max)):
+                return False, error
+            attempt += 1
+
+    @staticmethod
+    def _read_job_scores(zip_path: str, image_paths: List[str], first_index: int) -> List[Tuple[int, float]]:
+        """청크 결과 ZIP에서 [(이미지 번호, 점수), ...] 추출 (점수가 없는 이미지는 제외)"""
+        with zipfile.ZipFile(zip_path, 'r') as zip_ref:
+            table = read_score_table(zip_ref)
+        return [(first_index + offset, table.scores[row])
+                for offset, row in enumerate(table.match(image_paths)) if row is not None]
+
+    @staticmethod
+    def _read_chunk_scores(zip_path: str, image_paths: List[str]) -> List[Tuple[str, float]]:
+        """청크 결과 ZIP에서 [(이미지 경로, 점수), ...] 추출 (점수가 없는 이미지는 제외)"""
+        with zipfile.ZipFile(zip_path, 'r') as zip_ref:
+            table = read_score_table(zip_ref)
+        return [(img_path, table.scores[row])
+                for img_path, row in zip(image_paths, table.match(image_paths)) if row is not None]
+
     def calculate_f1_score(self, normal_images: List[str], abnormal_images: List[str],
                           threshold: float = 0.5) -> Tuple[Optional[Dict], Optional[str]]:
         """
@@ -113,7 +857,11 @@ class VisionADClient:
                 'abnormal_scores': List[float],
                 'tp': int, 'fp': int, 'tn': int, 'fn': int,
                 'precision': float, 'recall': float, 'f1_score': float,
-                'accuracy': float
+                'accuracy': float,
+                'best_threshold': float, 'best_f1': float,  # F1 최적 threshold
+                'sweep': Dict,  # 전체 threshold 곡선 (metrics.threshold_sweep)
+                'auroc': float, 'average_precision': float,
+                'fpr_at_tpr': float, 'target_tpr': float  # TPR이 target_tpr(0.99) 이상일 때의 FPR
             }
         """
         temp_zip_path = None
@@ -135,112 +883,7 @@ class VisionADClient:
             if not success:
                 return None, error
 
-            # ZIP 파일에서 scores.csv 추출 및 파싱
-            score_dict = {}  # {filename: anomaly_score}
-
-            try:
-                with zipfile.ZipFile(temp_zip_path, 'r') as zip_ref:
-                    # ZIP 내용 확인
-                    zip_contents = zip_ref.namelist()
-                    print(f"DEBUG: ZIP 파일 내용: {zip_contents}")
-
-                    # scores.csv 읽기
-                    if 'scores.csv' not in zip_contents:
-                        return None, f"결과 ZIP에 scores.csv가 없습니다. 포함된 파일: {zip_contents}"
-
-                    with zip_ref.open('scores.csv') as csv_file:
-                        # CSV 파싱
-                        csv_content = csv_file.read().decode('utf-8')
-                        print(f"DEBUG: CSV 내용 미리보기:\n{csv_content[:500]}")
-
-                        csv_reader = csv.DictReader(csv_content.splitlines())
-
-                        # CSV 헤더 확인
-                        fieldnames = csv_reader.fieldnames
-                        print(f"DEBUG: CSV 컬럼: {fieldnames}")
-
-                        for row in csv_reader:
-                            # CSV 구조: img_path, anomaly_score 등
-                            img_path_full = (row.get('img_path') or
-                                           row.get('filename') or
-                                           row.get('image') or
-                                           row.get('file_name') or
-                                           row.get('image_name') or '')
-
-                            score_str = (row.get('anomaly_score') or
-                                       row.get('score') or
-                                       row.get('anomaly') or '0')
-
-                            if not img_path_full:
-                                print(f"DEBUG: 파일 경로를 찾을 수 없는 행: {row}")
-                                continue
-
-                            # 전체 경로에서 파일명만 추출
-                            filename = os.path.basename(img_path_full)
-
-                            try:
-                                score = float(score_str)
-                            except ValueError:
-                                print(f"DEBUG: 점수 변환 실패: {score_str}")
-                                score = 0.0
-
-                            score_dict[filename] = score
-                            print(f"DEBUG: 파일명={filename}, 점수={score}")
-
-                print(f"DEBUG: 추출된 점수 딕셔너리: {score_dict}")
-
-            except Exception as e:
-                return None, f"ZIP/CSV 파싱 오류: {str(e)}"
-
-            # 정상/비정상 이미지의 점수 분리
-            normal_scores = []
-            abnormal_scores = []
-
-            for img_path in normal_images:
-                filename = os.path.basename(img_path)
-                if filename in score_dict:
-                    normal_scores.append(score_dict[filename])
-                else:
-                    return None, f"정상 이미지 '{filename}'의 점수를 찾을 수 없습니다"
-
-            for img_path in abnormal_images:
-                filename = os.path.basename(img_path)
-                if filename in score_dict:
-                    abnormal_scores.append(score_dict[filename])
-                else:
-                    return None, f"비정상 이미지 '{filename}'의 점수를 찾을 수 없습니다"
-
-            # 혼동 행렬 계산
-            # TN: 정상 이미지를 정상으로 판정 (score <= threshold)
-            tn = sum(1 for score in normal_scores if score <= threshold)
-            # FP: 정상 이미지를 비정상으로 판정 (score > threshold)
-            fp = sum(1 for score in normal_scores if score > threshold)
-            # TP: 비정상 이미지를 비정상으로 판정 (score > threshold)
-            tp = sum(1 for score in abnormal_scores if score > threshold)
-            # FN: 비정상 이미지를 정상으로 판정 (score <= threshold)
-            fn = sum(1 for score in abnormal_scores if score <= threshold)
-
-            # 성능 지표 계산
-            precision = tp / (tp + fp) if (tp + fp) > 0 else 0.0
-            recall = tp / (tp + fn) if (tp + fn) > 0 else 0.0
-            f1_score = 2 * (precision * recall) / (precision + recall) if (precision + recall) > 0 else 0.0
-            accuracy = (tp + tn) / (tp + tn + fp + fn) if (tp + tn + fp + fn) > 0 else 0.0
-
-            result = {
-                'threshold': threshold,
-                'normal_scores': normal_scores,
-                'abnormal_scores': abnormal_scores,
-                'tp': tp,
-                'fp': fp,
-                'tn': tn,
-                'fn': fn,
-                'precision': precision,
-                'recall': recall,
-                'f1_score': f1_score,
-                'accuracy': accuracy
-            }
-
-            return result, None
+            return self._f1_from_zip(temp_zip_path, normal_images, abnormal_images, threshold)
 
         except Exception as e:
             import traceback
@@ -274,115 +917,112 @@ class VisionADClient:
             if not os.path.exists(zip_path):
                 return None, f"ZIP 파일을 찾을 수 없습니다: {zip_path}"
 
-            # ZIP 파일에서 scores.csv 추출 및 파싱
-            score_dict = {}  # {filename: anomaly_score}
+            return self._f1_from_zip(zip_path, normal_images, abnormal_images, threshold)
 
-            try:
-                with zipfile.ZipFile(zip_path, 'r') as zip_ref:
-                    # ZIP 내용 확인
-                    zip_contents = zip_ref.namelist()
-                    print(f"DEBUG: ZIP 파일 내용: {zip_contents}")
+        except Exception as e:
+            import traceback
+            error_detail = traceback.format_exc()
+            print(f"ERROR: F1 Score 계산 중 예외 발생:\n{error_detail}")
+            return None, f"F1 Score 계산 오류: {str(e)}\n\n상세 정보:\n{error_detail}"
 
-                    # scores.csv 읽기
-                    if 'scores.csv' not in zip_contents:
-                        return None, f"결과 ZIP에 scores.csv가 없습니다. 포함된 파일: {zip_contents}"
+    def export_overlays_from_zip(self, zip_path: str, output_dir: str, threshold: float = 0.5,
+                                 normal_images: Optional[List[str]] = None,
+                                 abnormal_images: Optional[List[str]] = None,
+                                 max_workers: int = 4, use_processes: bool = False,
+                                 thumbnail_size: Optional[int] = None,
+                                 progress_callback: Optional[ExportProgressCallback] = None,
+                                 stop_event: Optional[threading.Event] = None) -> Tuple[Optional[Dict], Optional[str]]:
+        """
+        저장된 ZIP 파일의 overlay를 판정(threshold 초과/이하)과 라벨별 폴더로 병렬 추출
 
-                    with zip_ref.open('scores.csv') as csv_file:
-                        # CSV 파싱
-                        csv_content = csv_file.read().decode('utf-8')
-                        print(f"DEBUG: CSV 내용 미리보기:\n{csv_content[:500]}")
+        F1 계산과 같은 scores.csv 데이터를 사용하며, 정상/비정상 이미지를 지정하면
+        above/normal(오탐), below/abnormal(미탐)처럼 라벨 폴더로도 나눕니다.
 
-                        csv_reader = csv.DictReader(csv_content.splitlines())
+        Args:
+            zip_path: 배치 추론 결과 ZIP 파일 경로
+            output_dir: 출력 폴더
+            threshold: 이상 판정 임계값
+            normal_images: 정상 이미지 경로 리스트 (파일명 매칭용, 선택)
+            abnormal_images: 비정상 이미지 경로 리스트 (파일명 매칭용, 선택)
+            max_workers: 추출 작업자 수 (작업자마다 ZipFile 핸들을 하나씩 사용)
+            use_processes: 스레드 대신 프로세스 풀 사용 (썸네일 생성 시 유리)
+            thumbnail_size: 지정하면 thumbnails/ 폴더에 JPEG 썸네일도 저장
+            progress_callback: (처리한 overlay 수, 전체 overlay 수)를 받는 콜백
+            stop_event: set되면 남은 추출을 멈추고 CANCELLED_ERROR와 함께 그때까지의 결과 반환
 
-                        # CSV 헤더 확인
-                        fieldnames = csv_reader.fieldnames
-                        print(f"DEBUG: CSV 컬럼: {fieldnames}")
+        Returns:
+            (결과 딕셔너리, 에러 메시지)
+        """
+        try:
+            if not os.path.exists(zip_path):
+                return None, f"ZIP 파일을 찾을 수 없습니다: {zip_path}"
 
-                        for row in csv_reader:
-                            # CSV 구조: img_path, anomaly_score 등
-                            img_path_full = (row.get('img_path') or
-                                           row.get('filename') or
-                                           row.get('image') or
-                                           row.get('file_name') or
-                                           row.get('image_name') or '')
+            with zipfile.ZipFile(zip_path, 'r') as zip_ref:
+                try:
+                    zip_ref.getinfo(SCORES_CSV)
+                except KeyError:
+                    return None, f"결과 ZIP에 scores.csv가 없습니다. 포함된 파일 수: {len(zip_ref.infolist())}"
+
+            result = export_overlays(zip_path, output_dir, threshold,
+                                     normal_images=normal_images,
+                                     abnormal_images=abnormal_images,
+                                     max_workers=max_workers,
+                                     use_processes=use_processes,
+                                     thumbnail_size=thumbnail_size,
+                                     progress_callback=progress_callback,
+                                     stop_event=stop_event)
 
-                            score_str = (row.get('anomaly_score') or
-                                       row.get('score') or
-                                       row.get('anomaly') or '0')
+        except Exception as e:
+            return None, f"overlay 추출 오류: {str(e)}"
 
-                            if not img_path_full:
-                                print(f"DEBUG: 파일 경로를 찾을 수 없는 행: {row}")
-                                continue
+        if result['cancelled']:
+            return result, CANCELLED_ERROR
+        return result, None
 
-                            # 전체 경로에서 파일명만 추출
-                            filename = os.path.basename(img_path_full)
+    def _f1_from_zip(self, zip_path: str, normal_images: List[str], abnormal_images: List[str],
+                     threshold: float) -> Tuple[Optional[Dict], Optional[str]]:
+        """결과 ZIP의 scores.csv를 읽어 정상/비정상 점수를 분리하고 F1 Score 결과 생성"""
+        try:
+            with zipfile.ZipFile(zip_path, 'r') as zip_ref:
+                # scores.csv 읽기
+                try:
+                    zip_ref.getinfo(SCORES_CSV)
+                except KeyError:
+                    return None, f"결과 ZIP에 scores.csv가 없습니다. 포함된 파일 수: {len(zip_ref.infolist())}"
+                table = read_score_table(zip_ref)
 
-                            try:
-                                score = float(score_str)
-                            except ValueError:
-                                print(f"DEBUG: 점수 변환 실패: {score_str}")
-                                score = 0.0
+        except Exception as e:
+            return None, f"ZIP/CSV 파싱 오류: {str(e)}"
 
-                            score_dict[filename] = score
-                            print(f"DEBUG: 파일명={filename}, 점수={score}")
+        # 정상/비정상 이미지의 점수 분리 (파일명이 같은 이미지는 전송 순서대로 대응)
+        rows = table.match(normal_images + abnormal_images)
+        normal_rows, abnormal_rows = rows[:len(normal_images)], rows[len(normal_images):]
 
-                print(f"DEBUG: 추출된 점수 딕셔너리: {score_dict}")
+        for img_path, row in zip(normal_images, normal_rows):
+            if row is None:
+                return None, f"정상 이미지 '{os.path.basename(img_path)}'의 점수를 찾을 수 없습니다"
+        for img_path, row in zip(abnormal_images, abnormal_rows):
+            if row is None:
+                return None, f"비정상 이미지 '{os.path.basename(img_path)}'의 점수를 찾을 수 없습니다"
 
-            except Exception as e:
-                return None, f"ZIP/CSV 파싱 오류: {str(e)}"
+        normal_scores = [table.scores[row] for row in normal_rows]
+        abnormal_scores = [table.scores[row] for row in abnormal_rows]
 
-            # 정상/비정상 이미지의 점수 분리
-            normal_scores = []
-            abnormal_scores = []
+        # 점수는 한 번만 정렬해 지정 threshold 평가와 전체 threshold 탐색에 같이 사용
+        normal_sorted = sorted(normal_scores)
+        abnormal_sorted = sorted(abnormal_scores)
 
-            for img_path in normal_images:
-                filename = os.path.basename(img_path)
-                if filename in score_dict:
-                    normal_scores.append(score_dict[filename])
-                else:
-                    return None, f"정상 이미지 '{filename}'의 점수를 찾을 수 없습니다"
+        result = evaluate_threshold(normal_sorted, abnormal_sorted, threshold, presorted=True)
+        result['normal_scores'] = normal_scores
+        result['abnormal_scores'] = abnormal_scores
 
-            for img_path in abnormal_images:
-                filename = os.path.basename(img_path)
-                if filename in score_dict:
-                    abnormal_scores.append(score_dict[filename])
-                else:
-                    return None, f"비정상 이미지 '{filename}'의 점수를 찾을 수 없습니다"
-
-            # 혼동 행렬 계산
-            # TN: 정상 이미지를 정상으로 판정 (score <= threshold)
-            tn = sum(1 for score in normal_scores if score <= threshold)
-            # FP: 정상 이미지를 비정상으로 판정 (score > threshold)
-            fp = sum(1 for score in normal_scores if score > threshold)
-            # TP: 비정상 이미지를 비정상으로 판정 (score > threshold)
-            tp = sum(1 for score in abnormal_scores if score > threshold)
-            # FN: 비정상 이미지를 정상으로 판정 (score <= threshold)
-            fn = sum(1 for score in abnormal_scores if score <= threshold)
-
-            # 성능 지표 계산
-            precision = tp / (tp + fp) if (tp + fp) > 0 else 0.0
-            recall = tp / (tp + fn) if (tp + fn) > 0 else 0.0
-            f1_score = 2 * (precision * recall) / (precision + recall) if (precision + recall) > 0 else 0.0
-            accuracy = (tp + tn) / (tp + tn + fp + fn) if (tp + tn + fp + fn) > 0 else 0.0
-
-            result = {
-                'threshold': threshold,
-                'normal_scores': normal_scores,
-                'abnormal_scores': abnormal_scores,
-                'tp': tp,
-                'fp': fp,
-                'tn': tn,
-                'fn': fn,
-                'precision': precision,
-                'recall': recall,
-                'f1_score': f1_score,
-                'accuracy': accuracy
-            }
+        # 전체 threshold 곡선과 F1 최적 threshold
+        sweep = threshold_sweep(normal_sorted, abnormal_sorted, presorted=True)
+        result['best_threshold'] = sweep['best_threshold']
+        result['best_f1'] = sweep['best_f1']
+        result['sweep'] = sweep
 
-            return result, None
+        # Threshold와 무관한 순위 기반 지표 (AUROC, AP, FPR@99% TPR)
+        result.update(ranking_metrics(normal_sorted, abnormal_sorted, presorted=True))
 
-        except Exception as e:
-            import traceback
-            error_detail = traceback.format_exc()
-            print(f"ERROR: F1 Score 계산 중 예외 발생:\n{error_detail}")
-            return None, f"F1 Score 계산 오류: {str(e)}\n\n상세 정보:\n{error_detail}"
+        return result, None
@@ -3,16 +3,60 @@ Vision Anomaly Detection API 테스트 GUI 애플리케이션
 """
 import customtkinter as ctk
 from tkinter import filedialog, messagebox
-from PIL import Image, ImageTk
-import threading
-from api_client import VisionADClient
+from PIL import ImageTk
+import multiprocessing
+from api_client import CANCELLED_ERROR, VisionADClient
+from chunk_planner import ChunkPlanner
+from preprocess import Preprocessor
+from metrics import IncrementalEvaluator, evaluate_threshold, score_stats
+from result_cache import ResultCache
+from thumbnails import ThumbnailLoader
+from instrumentation import BUCKET_BOUNDS, TOTAL, Instrumentation
+from image_list import VirtualImageList
+from result_browser import OverlayGrid, ResultIndex
+from job_scheduler import RUNNING, JobScheduler
+from progress_bus import ProgressBus, format_bytes, format_duration
+from folder_scan import ABNORMAL, NORMAL, iter_image_files, iter_labeled_images
 import os
+import shutil
+import zipfile
 
 
 class VisionADTestApp:
-    # F1 Score 계산을 위한 Threshold 값 (고정)
+    # F1 Score 계산을 위한 Threshold 기본값
     THRESHOLD = 0.68
 
+    # 배치 추론 시 요청 하나에 담을 이미지 수 / 동시에 보낼 요청 수
+    BATCH_CHUNK_SIZE = 100
+    BATCH_MAX_WORKERS = 4
+
+    # 이어서 실행하지 않는 배치 추론은 청크 크기를 서버 처리 시간에 맞춰 조절 (요청 하나의 목표 시간, 초)
+    ADAPTIVE_CHUNKS = True
+    BATCH_TARGET_SECONDS = 30.0
+
+    # 배치 추론 진행 상황(진행 막대, 처리 속도, 남은 시간, 실시간 점수 통계) 표시 간격 (ms)
+    PROGRESS_FRAME_MS = 100
+
+    # 통계 탭 자동 갱신 간격 (ms)
+    STATS_REFRESH_MS = 1000
+
+    # 동시에 실행할 백그라운드 작업 수 (나머지는 대기) / 작업 스레드의 UI 갱신 요청을 처리하는 간격 (ms)
+    JOB_MAX_WORKERS = 3
+    UI_POLL_MS = 50
+    UI_POLL_MAX_ITEMS = 200
+
+    # overlay 내보내기 작업자 수 (작업자마다 결과 ZIP 핸들을 하나씩 사용)
+    EXPORT_MAX_WORKERS = 4
+
+    # 폴더 탐색 중 리스트에 한 번에 추가할 경로 수
+    SCAN_BATCH_SIZE = 500
+
+    # 전처리 시 기본 최대 크기 (px)
+    PREPROCESS_SIZE = 512
+
+    # 결과 캐시 저장 위치
+    CACHE_DIR = os.path.join(os.path.expanduser("~"), ".visionad_cache")
+
     def __init__(self):
         self.root = ctk.CTk()
         self.root.title("Vision AD API 테스트")
@@ -25,8 +69,38 @@ class VisionADTestApp:
         self.current_image = None
         self.result_image = None
 
+        # 호출별 단계 시간/전송량 계측 (통계 탭)
+        self.instrumentation = Instrumentation()
+
+        # 진행 중인 폴더 탐색 수 (탐색 중에는 리스트가 계속 늘어나므로 추론 시작을 막음)
+        self.active_scans = 0
+
+        # 미리보기 썸네일은 백그라운드에서 생성 (라벨별 마지막 요청만 표시)
+        self.thumbnail_loader = ThumbnailLoader()
+        self.display_requests = {}
+
+        # 결과 보기 탭에 열린 결과 ZIP 인덱스와 마지막으로 저장한 결과 ZIP
+        self.result_index = None
+        self.last_result_zip = None
+
+        # 추론/탐색 작업은 스케줄러에서 실행하고, 작업 스레드의 위젯 갱신은 UI 큐를 거쳐 메인 스레드에서 처리
+        self.scheduler = JobScheduler(max_workers=self.JOB_MAX_WORKERS, on_change=self.update_job_status)
+
+        # 진행 상황은 작업 스레드가 bus에 게시하고 PROGRESS_FRAME_MS마다 채널별 최신 상태만 표시
+        self.progress_bus = ProgressBus()
+        # 채널마다 진행 상황을 표시 중인 작업의 키 (채널 하나는 작업 하나만 표시)
+        self.progress_owners = {}
+
         # UI 초기화
         self.setup_ui()
+        self.progress_bus.subscribe('batch', self.render_batch_progress)
+        self.progress_bus.subscribe('f1', self.render_f1_progress)
+        self.progress_bus.subscribe('export', self.render_export_progress)
+        self.root.after(self.UI_POLL_MS, self.process_ui_queue)
+        self.root.after(self.PROGRESS_FRAME_MS, self.render_progress)
+
+        # 창을 닫을 때 커넥션 풀 정리
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
 
     def setup_ui(self):
         """UI 구성"""
@@ -41,9 +115,34 @@ class VisionADTestApp:
 
         ctk.CTkButton(top_frame, text="연결", command=self.connect_to_api, width=100).pack(side="left", padx=5)
 
+        # 결과 캐시 (같은 이미지를 다시 추론할 때 서버 요청 생략)
+        self.cache_var = ctk.BooleanVar(value=False)
+        ctk.CTkCheckBox(top_frame, text="결과 캐시", variable=self.cache_var).pack(side="left", padx=5)
+        ctk.CTkLabel(top_frame, text="모델 버전:").pack(side="left", padx=(5, 2))
+        self.model_version_entry = ctk.CTkEntry(top_frame, width=100, placeholder_text="default")
+        self.model_version_entry.pack(side="left", padx=2)
+
+        # 업로드 전 전처리 (리사이즈 + JPEG 재인코딩)
+        self.preprocess_var = ctk.BooleanVar(value=False)
+        ctk.CTkCheckBox(top_frame, text="전처리", variable=self.preprocess_var).pack(side="left", padx=(10, 5))
+        self.preprocess_size_entry = ctk.CTkEntry(top_frame, width=60, placeholder_text=str(self.PREPROCESS_SIZE))
+        self.preprocess_size_entry.pack(side="left", padx=2)
+        self.preprocess_size_entry.insert(0, str(self.PREPROCESS_SIZE))
+        ctk.CTkLabel(top_frame, text="px").pack(side="left", padx=(2, 5))
+
         self.status_label = ctk.CTkLabel(top_frame, text="미연결", text_color="gray")
         self.status_label.pack(side="left", padx=10)
 
+        # 대기/실행 중인 작업과 취소 버튼
+        job_frame = ctk.CTkFrame(self.root)
+        job_frame.pack(fill="x", padx=10)
+
+        self.job_status_label = ctk.CTkLabel(job_frame, text="실행 중인 작업 없음", font=("Arial", 12), anchor="w")
+        self.job_status_label.pack(side="left", fill="x", expand=True, padx=5)
+        self.cancel_jobs_button = ctk.CTkButton(job_frame, text="작업 취소", command=self.cancel_jobs,
+                                                width=100, fg_color="#9E9E9E", state="disabled")
+        self.cancel_jobs_button.pack(side="right", padx=5, pady=5)
+
         # 탭뷰
         self.tabview = ctk.CTkTabview(self.root)
         self.tabview.pack(fill="both", expand=True, padx=10, pady=10)
@@ -60,6 +159,14 @@ class VisionADTestApp:
         self.tab_f1 = self.tabview.add("F1 Score 계산")
         self.setup_f1_tab()
 
+        # 통계 탭
+        self.tab_stats = self.tabview.add("통계")
+        self.setup_stats_tab()
+
+        # 결과 보기 탭
+        self.tab_results = self.tabview.add("결과 보기")
+        self.setup_results_tab()
+
     def setup_single_tab(self):
         """단일 이미지 추론 탭 구성"""
         # 좌측: 입력 이미지
@@ -110,7 +217,10 @@ class VisionADTestApp:
         top_frame.pack(fill="x", padx=10, pady=10)
 
         ctk.CTkButton(top_frame, text="이미지 선택 (여러 개)", command=self.select_batch_images).pack(side="left", padx=5)
+        ctk.CTkButton(top_frame, text="폴더 추가", command=self.select_batch_folder).pack(side="left", padx=5)
         ctk.CTkButton(top_frame, text="선택 초기화", command=self.clear_batch_images).pack(side="left", padx=5)
+        ctk.CTkButton(top_frame, text="폴더 바로 추론", command=self.run_folder_inference,
+                      fg_color="#2196F3").pack(side="right", padx=5)
 
         # 중앙: 선택된 파일 리스트
         middle_frame = ctk.CTkFrame(self.tab_batch)
@@ -118,7 +228,7 @@ class VisionADTestApp:
 
         ctk.CTkLabel(middle_frame, text="선택된 이미지", font=("Arial", 14, "bold")).pack(pady=5)
 
-        self.batch_listbox = ctk.CTkTextbox(middle_frame, height=300)
+        self.batch_listbox = VirtualImageList(middle_frame, height=300)
         self.batch_listbox.pack(fill="both", expand=True, pady=5)
 
         self.batch_image_paths = []
@@ -135,15 +245,34 @@ class VisionADTestApp:
             font=("Arial", 14, "bold")
         ).pack(pady=10)
 
+        # 청크 완료마다 작업 폴더에 기록하고 실패한 청크는 재시도 (중단 후 같은 저장 경로로 실행하면 이어서 진행)
+        self.batch_resumable_var = ctk.BooleanVar(value=True)
+        ctk.CTkCheckBox(bottom_frame, text="중단 시 이어서 실행 (재시도 포함)",
+                        variable=self.batch_resumable_var).pack()
+
         self.batch_status_label = ctk.CTkLabel(bottom_frame, text="", font=("Arial", 12))
         self.batch_status_label.pack(pady=5)
 
+        self.batch_progress_bar = ctk.CTkProgressBar(bottom_frame, width=500)
+        self.batch_progress_bar.pack(pady=2)
+        self.batch_progress_bar.set(0)
+        self.batch_progress_label = ctk.CTkLabel(bottom_frame, text="", font=("Arial", 11))
+        self.batch_progress_label.pack(pady=2)
+
+        # 진행 중인 요청의 업로드/서버 처리 대기/다운로드 상황
+        self.batch_transfer_bar = ctk.CTkProgressBar(bottom_frame, width=500, height=8)
+        self.batch_transfer_bar.pack(pady=2)
+        self.batch_transfer_bar.set(0)
+        self.batch_transfer_label = ctk.CTkLabel(bottom_frame, text="", font=("Arial", 10))
+        self.batch_transfer_label.pack(pady=2)
+
     def setup_f1_tab(self):
         """F1 Score 계산 탭 구성"""
         # 초기화
         self.normal_image_paths = []
         self.abnormal_image_paths = []
         self.f1_zip_path = None  # 배치 추론 결과 ZIP 파일 경로
+        self.f1_result = None  # 마지막 F1 Score 계산 결과 (Threshold 재적용용)
 
         # 좌측: 정상 이미지
         left_frame = ctk.CTkFrame(self.tab_f1)
@@ -151,13 +280,14 @@ class VisionADTestApp:
 
         ctk.CTkLabel(left_frame, text="정상 이미지", font=("Arial", 16, "bold"), text_color="#4CAF50").pack(pady=5)
 
-        self.normal_listbox = ctk.CTkTextbox(left_frame, height=200)
+        self.normal_listbox = VirtualImageList(left_frame, summary_format="총 {total}개의 정상 이미지", height=200)
         self.normal_listbox.pack(fill="both", expand=True, pady=5)
 
         normal_btn_frame = ctk.CTkFrame(left_frame)
         normal_btn_frame.pack(fill="x", pady=5)
 
         ctk.CTkButton(normal_btn_frame, text="정상 이미지 선택", command=self.select_normal_images).pack(side="left", padx=5)
+        ctk.CTkButton(normal_btn_frame, text="폴더 추가", command=self.select_normal_folder).pack(side="left", padx=5)
         ctk.CTkButton(normal_btn_frame, text="초기화", command=self.clear_normal_images).pack(side="left", padx=5)
 
         # 우측: 비정상 이미지
@@ -166,36 +296,41 @@ class VisionADTestApp:
 
         ctk.CTkLabel(right_frame, text="비정상 이미지", font=("Arial", 16, "bold"), text_color="#FF6B6B").pack(pady=5)
 
-        self.abnormal_listbox = ctk.CTkTextbox(right_frame, height=200)
+        self.abnormal_listbox = VirtualImageList(right_frame, summary_format="총 {total}개의 비정상 이미지", height=200)
         self.abnormal_listbox.pack(fill="both", expand=True, pady=5)
 
         abnormal_btn_frame = ctk.CTkFrame(right_frame)
         abnormal_btn_frame.pack(fill="x", pady=5)
 
         ctk.CTkButton(abnormal_btn_frame, text="비정상 이미지 선택", command=self.select_abnormal_images).pack(side="left", padx=5)
+        ctk.CTkButton(abnormal_btn_frame, text="폴더 추가", command=self.select_abnormal_folder).pack(side="left", padx=5)
         ctk.CTkButton(abnormal_btn_frame, text="초기화", command=self.clear_abnormal_images).pack(side="left", padx=5)
 
         # 하단: 설정 및 실행
         bottom_frame = ctk.CTkFrame(self.tab_f1)
         bottom_frame.pack(fill="x", padx=10, pady=10)
 
-        # # Threshold 설정 (사용자 입력)
-        # threshold_frame = ctk.CTkFrame(bottom_frame)
-        # threshold_frame.pack(fill="x", pady=5)
-        #
-        # ctk.CTkLabel(threshold_frame, text="Threshold:", font=("Arial", 14)).pack(side="left", padx=5)
-        # self.threshold_entry = ctk.CTkEntry(threshold_frame, width=100, placeholder_text="0.75")
-        # self.threshold_entry.pack(side="left", padx=5)
-        # self.threshold_entry.insert(0, "0.75")
-        # ctk.CTkLabel(threshold_frame, text="(Anomaly Score > Threshold → 비정상 판정)", font=("Arial", 10)).pack(side="left", padx=5)
-
-        # Threshold 정보 표시 (고정값)
-        # threshold_label = ctk.CTkLabel(
-        #     bottom_frame,
-        #     text=f"Threshold: {self.THRESHOLD} (Anomaly Score > {self.THRESHOLD} → 비정상 판정)",
-        #     font=("Arial", 12)
-        # )
-        # threshold_label.pack(pady=5)
+        # 하위 폴더 이름(normal/good/ok, abnormal/defect/ng 등)으로 정상/비정상 자동 구분
+        folder_frame = ctk.CTkFrame(bottom_frame)
+        folder_frame.pack(fill="x", pady=5)
+
+        ctk.CTkButton(folder_frame, text="라벨 폴더 추가", command=self.select_labeled_folder,
+                      width=140).pack(side="left", padx=5)
+        self.f1_scan_label = ctk.CTkLabel(folder_frame, text="(하위 폴더 이름으로 정상/비정상 구분)", font=("Arial", 10))
+        self.f1_scan_label.pack(side="left", padx=5)
+
+        # Threshold 설정 (재추론 없이 저장된 점수로 다시 계산)
+        threshold_frame = ctk.CTkFrame(bottom_frame)
+        threshold_frame.pack(fill="x", pady=5)
+
+        ctk.CTkLabel(threshold_frame, text="Threshold:", font=("Arial", 14)).pack(side="left", padx=5)
+        self.threshold_entry = ctk.CTkEntry(threshold_frame, width=100, placeholder_text=str(self.THRESHOLD))
+        self.threshold_entry.pack(side="left", padx=5)
+        self.threshold_entry.insert(0, str(self.THRESHOLD))
+        ctk.CTkButton(threshold_frame, text="적용", command=self.apply_f1_threshold, width=60).pack(side="left", padx=5)
+        ctk.CTkButton(threshold_frame, text="최적 Threshold 적용", command=self.apply_best_f1_threshold,
+                      width=140).pack(side="left", padx=5)
+        ctk.CTkLabel(threshold_frame, text="(Anomaly Score > Threshold → 비정상 판정)", font=("Arial", 10)).pack(side="left", padx=5)
 
         # 실행 버튼 프레임
         btn_frame = ctk.CTkFrame(bottom_frame)
@@ -223,10 +358,33 @@ class VisionADTestApp:
             fg_color="#FF9800"
         ).pack(side="left", padx=5, expand=True)
 
+        # 3단계(선택): 판정/라벨별 overlay 추출
+        ctk.CTkButton(
+            btn_frame,
+            text="3 Overlay 내보내기",
+            command=self.run_f1_overlay_export,
+            height=40,
+            width=250,
+            font=("Arial", 14, "bold"),
+            fg_color="#607D8B"
+        ).pack(side="left", padx=5, expand=True)
+
         # 진행 상태
         self.f1_status_label = ctk.CTkLabel(bottom_frame, text="", font=("Arial", 12))
         self.f1_status_label.pack(pady=5)
 
+        self.f1_progress_bar = ctk.CTkProgressBar(bottom_frame, width=500)
+        self.f1_progress_bar.pack(pady=2)
+        self.f1_progress_bar.set(0)
+        self.f1_progress_label = ctk.CTkLabel(bottom_frame, text="", font=("Arial", 11))
+        self.f1_progress_label.pack(pady=2)
+
+        self.f1_transfer_bar = ctk.CTkProgressBar(bottom_frame, width=500, height=8)
+        self.f1_transfer_bar.pack(pady=2)
+        self.f1_transfer_bar.set(0)
+        self.f1_transfer_label = ctk.CTkLabel(bottom_frame, text="", font=("Arial", 10))
+        self.f1_transfer_label.pack(pady=2)
+
         # ZIP 파일 경로 표시
         self.f1_zip_label = ctk.CTkLabel(bottom_frame, text="추론 결과 ZIP: 없음", font=("Arial", 10), text_color="gray")
         self.f1_zip_label.pack(pady=2)
@@ -322,6 +480,19 @@ class VisionADTestApp:
                                           width=448, height=45, fg_color="#9C27B0", corner_radius=5)
         self.accuracy_label.grid(row=2, column=0, columnspan=2, padx=4, pady=4)
 
+        # 순위 기반 지표 (Threshold 무관)
+        self.auroc_label = ctk.CTkLabel(metrics_grid, text="AUROC: -", font=("Arial", 13),
+                                        width=220, height=45, fg_color="#607D8B", corner_radius=5)
+        self.auroc_label.grid(row=3, column=0, padx=4, pady=4)
+
+        self.ap_label = ctk.CTkLabel(metrics_grid, text="AP (PR-AUC): -", font=("Arial", 13),
+                                     width=220, height=45, fg_color="#607D8B", corner_radius=5)
+        self.ap_label.grid(row=3, column=1, padx=4, pady=4)
+
+        self.fpr_at_tpr_label = ctk.CTkLabel(metrics_grid, text="FPR @ 99% Recall: -", font=("Arial", 13),
+                                             width=448, height=45, fg_color="#607D8B", corner_radius=5)
+        self.fpr_at_tpr_label.grid(row=4, column=0, columnspan=2, padx=4, pady=4)
+
         # 4. Anomaly Score 분포
         dist_frame = ctk.CTkFrame(result_main_frame)
         dist_frame.pack(fill="x", pady=10)
@@ -329,6 +500,15 @@ class VisionADTestApp:
         self.f1_dist_label = ctk.CTkLabel(dist_frame, text="", font=("Arial", 11), justify="left")
         self.f1_dist_label.pack(anchor="w", padx=20, pady=5)
 
+        # 5. Threshold 탐색 (F1 최적 threshold + 곡선)
+        sweep_frame = ctk.CTkFrame(result_main_frame)
+        sweep_frame.pack(fill="x", pady=10)
+        ctk.CTkLabel(sweep_frame, text="🔍 Threshold 탐색", font=("Arial", 14, "bold")).pack(pady=5)
+        self.f1_sweep_label = ctk.CTkLabel(sweep_frame, text="", font=("Arial", 11), justify="left")
+        self.f1_sweep_label.pack(anchor="w", padx=20, pady=5)
+        self.f1_curve_canvas = ctk.CTkCanvas(sweep_frame, width=480, height=200, bg="#2B2B2B", highlightthickness=0)
+        self.f1_curve_canvas.pack(pady=5)
+
     def connect_to_api(self):
         """API 서버 연결"""
         url = self.url_entry.get().strip()
@@ -336,9 +516,44 @@ class VisionADTestApp:
             messagebox.showerror("오류", "API 서버 URL을 입력하세요")
             return
 
-        self.client = VisionADClient(base_url=url)
-        self.status_label.configure(text="연결됨", text_color="green")
-        messagebox.showinfo("성공", f"{url}에 연결되었습니다")
+        preprocess_size = None
+        if self.preprocess_var.get():
+            try:
+                preprocess_size = int(self.preprocess_size_entry.get().strip())
+                if preprocess_size <= 0:
+                    raise ValueError
+            except ValueError:
+                messagebox.showerror("오류", "전처리 크기는 양의 정수로 입력하세요")
+                return
+
+        # 실행 중인 작업이 이전 클라이언트(커넥션 풀, 캐시, 전처리 풀)를 쓰고 있으면 닫지 않음
+        if self.client and self.scheduler.jobs():
+            messagebox.showwarning("알림", "실행 중인 작업이 끝나거나 취소된 뒤 다시 연결하세요")
+            return
+
+        # 이전 클라이언트의 커넥션 풀 정리
+        if self.client:
+            self.client.close()
+            if self.client.cache:
+                self.client.cache.close()
+
+        cache = None
+        if self.cache_var.get():
+            model_version = self.model_version_entry.get().strip() or "default"
+            cache = ResultCache(self.CACHE_DIR, model_version=model_version)
+
+        preprocessor = None
+        if preprocess_size:
+            preprocessor = Preprocessor(target_size=(preprocess_size, preprocess_size))
+
+        instrumentation = self.instrumentation if self.stats_enabled_var.get() else None
+        # 쉼표로 여러 서버를 입력하면 요청을 나누어 보냄
+        self.client = VisionADClient(base_url=url, cache=cache, preprocessor=preprocessor,
+                                     instrumentation=instrumentation)
+        urls = [endpoint.url for endpoint in self.client.endpoints.endpoints]
+        self.status_label.configure(text="연결됨" if len(urls) == 1 else f"연결됨 (서버 {len(urls)}대)",
+                                    text_color="green")
+        messagebox.showinfo("성공", "\n".join(urls) + "\n에 연결되었습니다")
 
     def select_single_image(self):
         """단일 이미지 선택"""
@@ -352,30 +567,39 @@ class VisionADTestApp:
             self.display_image(file_path, self.input_image_label)
 
     def display_image(self, image_path, label_widget, max_size=(400, 400)):
-        """이미지를 라벨에 표시"""
-        try:
-            image = Image.open(image_path)
-            image.thumbnail(max_size, Image.Resampling.LANCZOS)
+        """이미지를 라벨에 표시 (디코딩과 리사이즈는 백그라운드에서 수행)"""
+        token = self.next_display_request(label_widget)
+        self.thumbnail_loader.load(
+            image_path, max_size,
+            lambda thumbnail, error: self.scheduler.post(self.show_thumbnail, label_widget, token, thumbnail, error)
+        )
 
-            photo = ImageTk.PhotoImage(image)
-            label_widget.configure(image=photo, text="")
-            label_widget.image = photo  # 참조 유지
+    def display_pil_image(self, pil_image, label_widget, max_size=(400, 400)):
+        """PIL 이미지를 라벨에 표시 (리사이즈는 백그라운드에서 수행)"""
+        token = self.next_display_request(label_widget)
+        self.thumbnail_loader.load_image(
+            pil_image, max_size,
+            lambda thumbnail, error: self.scheduler.post(self.show_thumbnail, label_widget, token, thumbnail, error)
+        )
 
-        except Exception as e:
-            messagebox.showerror("오류", f"이미지를 표시할 수 없습니다: {str(e)}")
+    def next_display_request(self, label_widget):
+        """라벨의 표시 요청 번호 갱신 (이전 요청 결과는 무시되도록)"""
+        token = self.display_requests.get(id(label_widget), 0) + 1
+        self.display_requests[id(label_widget)] = token
+        return token
 
-    def display_pil_image(self, pil_image, label_widget, max_size=(400, 400)):
-        """PIL 이미지를 라벨에 표시"""
-        try:
-            image = pil_image.copy()
-            image.thumbnail(max_size, Image.Resampling.LANCZOS)
+    def show_thumbnail(self, label_widget, token, thumbnail, error):
+        """준비된 썸네일을 라벨에 표시 (메인 스레드에서 호출)"""
+        if self.display_requests.get(id(label_widget)) != token:
+            return  # 더 최근에 선택한 이미지가 있음
 
-            photo = ImageTk.PhotoImage(image)
-            label_widget.configure(image=photo, text="")
-            label_widget.image = photo  # 참조 유지
+        if error:
+            messagebox.showerror("오류", f"이미지를 표시할 수 없습니다: {error}")
+            return
 
-        except Exception as e:
-            messagebox.showerror("오류", f"이미지를 표시할 수 없습니다: {str(e)}")
+        photo = ImageTk.PhotoImage(thumbnail)
+        label_widget.configure(image=photo, text="")
+        label_widget.image = photo  # 참조 유지
 
     def run_single_inference(self):
         """단일 이미지 추론 실행"""
@@ -387,21 +611,26 @@ class VisionADTestApp:
             messagebox.showerror("오류", "이미지를 먼저 선택하세요")
             return
 
+        image_path = self.selected_image_path
+        client = self.client
+        post = self.scheduler.post
+
         # 비동기 처리
-        def inference_task():
-            self.score_label.configure(text="추론 중...")
+        def inference_task(job):
+            post(self.score_label.configure, text="추론 중...")
 
-            result_image, anomaly_score, error = self.client.inference_single(self.selected_image_path)
+            result_image, anomaly_score, error = client.inference_single(image_path)
 
-            if error:
-                self.root.after(0, lambda: messagebox.showerror("오류", error))
-                self.root.after(0, lambda: self.score_label.configure(text="Anomaly Score: -"))
+            if job.cancelled:
+                post(self.score_label.configure, text="Anomaly Score: - (취소됨)")
+            elif error:
+                post(messagebox.showerror, "오류", error)
+                post(self.score_label.configure, text="Anomaly Score: -")
             else:
-                self.root.after(0, lambda: self.display_pil_image(result_image, self.output_image_label))
-                self.root.after(0, lambda: self.score_label.configure(text=f"Anomaly Score: {anomaly_score:.6f}"))
+                post(self.display_pil_image, result_image, self.output_image_label)
+                post(self.score_label.configure, text=f"Anomaly Score: {anomaly_score:.6f}")
 
-        thread = threading.Thread(target=inference_task)
-        thread.start()
+        self.submit_job(('single', image_path), f"단일 추론: {os.path.basename(image_path)}", inference_task)
 
     def select_batch_images(self):
         """배치 이미지 선택"""
@@ -419,12 +648,210 @@ class VisionADTestApp:
         self.batch_image_paths = []
         self.update_batch_listbox()
 
+    def select_batch_folder(self):
+        """폴더의 이미지를 (하위 폴더 포함) 배치 리스트에 추가"""
+        folder = filedialog.askdirectory(title="이미지 폴더 선택")
+        if not folder:
+            return
+
+        def on_paths(paths):
+            self.batch_image_paths.extend(paths)
+            self.update_batch_listbox()
+            self.batch_status_label.configure(text=f"폴더 탐색 중... ({len(self.batch_image_paths)}개)")
+
+        def on_done(count, error):
+            if error:
+                messagebox.showerror("오류", f"폴더를 탐색할 수 없습니다: {error}")
+            self.batch_status_label.configure(text=f"폴더에서 {count}개 이미지 추가됨")
+
+        self.scan_folder(('scan', 'batch', folder), iter_image_files(folder), on_paths, on_done)
+
+    def scan_folder(self, key, items, on_items, on_done):
+        """
+        폴더 탐색 제너레이터를 백그라운드 작업으로 소비하며 SCAN_BATCH_SIZE개씩 메인 스레드로 전달
+
+        Args:
+            key: 작업 키 (같은 대상에 같은 폴더를 탐색 중이면 다시 시작하지 않음)
+            items: folder_scan의 제너레이터 (iter_image_files, iter_labeled_images)
+            on_items: 찾은 항목 리스트를 받는 콜백 (메인 스레드에서 호출)
+            on_done: 탐색 종료 콜백 (전체 항목 수, 에러 메시지) (메인 스레드에서 호출, 취소되면 에러 메시지에 표시)
+
+        Returns:
+            작업을 등록했는지 여부
+        """
+        post = self.scheduler.post
+
+        def finish(count, error):
+            self.active_scans -= 1
+            on_done(count, error)
+
+        def scan_task(job):
+            batch = []
+            count = 0
+            error = None
+            try:
+                for item in items:
+                    if job.cancelled:
+                        error = "탐색이 취소되었습니다"
+                        break
+                    batch.append(item)
+                    count += 1
+                    if len(batch) >= self.SCAN_BATCH_SIZE:
+                        post(on_items, batch)
+                        batch = []
+            except Exception as e:
+                error = str(e)
+
+            if batch:
+                post(on_items, batch)
+            post(finish, count, error)
+
+        # 대기 중인 탐색도 끝날 리스트를 바꾸므로 등록 시점부터 진행 중으로 셈 (시작 전에 취소되면 바로 종료 처리)
+        if not self.submit_job(key, f"폴더 탐색: {os.path.basename(key[-1]) or key[-1]}", scan_task,
+                               on_cancelled=lambda: finish(0, "탐색이 취소되었습니다")):
+            return False
+        self.active_scans += 1
+        return True
+
+    def check_no_active_scan(self):
+        """폴더 탐색 중이면 알리고 False 반환"""
+        if self.active_scans:
+            messagebox.showwarning("알림", "폴더 탐색이 끝난 뒤 실행하세요")
+            return False
+        return True
+
+    def submit_job(self, key, name, func, on_cancelled=None):
+        """
+        백그라운드 작업 등록 (같은 작업이 이미 대기/실행 중이면 알리고 None 반환)
+
+        Args:
+            key: 작업 키 (예: ('batch', 저장 경로))
+            name: 작업 표시줄에 보일 이름
+            func: 작업 스레드에서 func(job)으로 호출할 함수 (위젯 갱신은 self.scheduler.post로 요청)
+            on_cancelled: 시작하기 전에 취소되었을 때 호출할 콜백 (메인 스레드에서 호출)
+        """
+        job = self.scheduler.submit(key, name, func, on_cancelled=on_cancelled)
+        if job is None:
+            messagebox.showwarning("알림", "같은 작업이 이미 실행 중입니다")
+        return job
+
+    def check_job_not_active(self, key):
+        """같은 키의 작업이 대기/실행 중이면 알리고 False 반환"""
+        if self.scheduler.is_active(key):
+            messagebox.showwarning("알림", "같은 작업이 이미 실행 중입니다")
+            return False
+        return True
+
+    def check_progress_channel_free(self, channel):
+        """채널에 진행 상황을 표시 중인 작업이 대기/실행 중이면 알리고 False 반환"""
+        key = self.progress_owners.get(channel)
+        if key is not None and self.scheduler.is_active(key):
+            messagebox.showwarning("알림", "진행 중인 같은 종류의 작업이 끝난 뒤 실행하세요")
+            return False
+        return True
+
+    def start_progress(self, channel, key, total=None, extra=None):
+        """작업 키를 채널의 표시 작업으로 기록하고 진행 상황 보고 시작 (check_progress_channel_free 확인 후 호출)"""
+        self.progress_owners[channel] = key
+        return self.progress_bus.start(channel, total=total, extra=extra)
+
+    def cancel_jobs(self):
+        """대기/실행 중인 모든 작업 취소 (진행 중인 요청은 끝난 뒤 중단)"""
+        if self.scheduler.cancel_all():
+            self.update_job_status()
+
+    def update_job_status(self):
+        """작업 표시줄 갱신 (작업이 등록/시작/종료될 때 메인 스레드에서 호출)"""
+        jobs = self.scheduler.jobs()
+        if not jobs:
+            self.job_status_label.configure(text="실행 중인 작업 없음")
+            self.cancel_jobs_button.configure(state="disabled")
+            return
+
+        running = [job.name + (" (취소 중)" if job.cancelled else "") for job in jobs if job.state == RUNNING]
+        waiting = len(jobs) - len(running)
+        text = "실행 중: " + (", ".join(running) if running else "-")
+        if waiting:
+            text += f" | 대기 {waiting}개"
+        self.job_status_label.configure(text=text)
+        self.cancel_jobs_button.configure(state="normal")
+
+    def process_ui_queue(self):
+        """작업 스레드가 요청한 위젯 갱신을 메인 스레드에서 처리하고 다음 처리를 예약"""
+        try:
+            self.scheduler.drain(self.UI_POLL_MAX_ITEMS)
+        finally:
+            self.root.after(self.UI_POLL_MS, self.process_ui_queue)
+
+    def render_progress(self):
+        """progress bus에 게시된 채널별 최신 진행 상황을 표시하고 다음 frame 예약"""
+        try:
+            self.progress_bus.poll()
+        finally:
+            self.root.after(self.PROGRESS_FRAME_MS, self.render_progress)
+
+    def render_batch_progress(self, state):
+        """배치 탭 진행 상황 표시 (progress bus 표시 함수)"""
+        self.update_progress_view(self.batch_progress_bar, self.batch_progress_label, state)
+        self.update_transfer_view(self.batch_transfer_bar, self.batch_transfer_label, state['transfer'])
+
+    def update_progress_view(self, progress_bar, label, state):
+        """진행 막대와 처리 이미지 수/처리 속도/남은 시간/점수 통계 표시"""
+        done, total = state['done'], state['total']
+        if total:
+            progress_bar.set(min(1.0, done / total))
+            parts = [f"{done:,}/{total:,}개 ({done / total:.1%})"]
+        else:
+            progress_bar.set(0)
+            parts = [f"{done:,}개"]
+
+        if state['chunks_total']:
+            parts.append(f"청크 {state['chunks_done']}/{state['chunks_total']}")
+        parts.append(f"{state['rate']:.1f} img/s" if state['rate'] is not None else "- img/s")
+        if total:
+            parts.append(f"남은 시간 {format_duration(state['eta'])}")
+
+        scores = state['scores']
+        if scores['count']:
+            parts.append(f"점수 평균 {scores['mean']:.4f} (최소 {scores['min']:.4f} / 최대 {scores['max']:.4f})")
+        label.configure(text=" · ".join(parts))
+
+    def update_transfer_view(self, progress_bar, label, transfer):
+        """
+        진행 중인 요청의 단계별 전송 상황 표시 (바이트 수, 처리량, 남은 시간)
+
+        진행 막대는 업로드 중이면 업로드, 아니면 다운로드 진행률을 표시하고,
+        서버 처리만 기다리는 중이면 업로드가 끝났으므로 가득 찬 상태로 둡니다.
+        """
+        parts = []
+        fraction = None
+        for phase, name in (('upload', "업로드"), ('download', "다운로드")):
+            summary = transfer[phase]
+            if not summary['requests']:
+                continue
+            text = f"{name} {format_bytes(summary['bytes'])}"
+            if summary['total']:
+                text += f"/{format_bytes(summary['total'])}"
+                if fraction is None:
+                    fraction = summary['bytes'] / summary['total']
+            if summary['rate']:
+                text += f" · {format_bytes(summary['rate'])}/s"
+            if summary['total']:
+                text += f" · 남은 시간 {format_duration(summary['eta'])}"
+            if summary['requests'] > 1:
+                text += f" (요청 {summary['requests']}개)"
+            parts.append(text)
+        if transfer['waiting']:
+            parts.append(f"서버 처리 대기 {transfer['waiting']}개")
+            if fraction is None:
+                fraction = 1.0
+
+        progress_bar.set(min(1.0, fraction or 0.0))
+        label.configure(text=" | ".join(parts))
+
     def update_batch_listbox(self):
-        """배치 리스트박스 업데이트"""
-        self.batch_listbox.delete("1.0", "end")
-        for i, path in enumerate(self.batch_image_paths, 1):
-            filename = os.path.basename(path)
-            self.batch_listbox.insert("end", f"{i}. {filename}\n")
+        """배치 리스트박스 업데이트 (새로 추가된 경로만 반영)"""
+        self.batch_listbox.set_paths(self.batch_image_paths)
 
     def run_batch_inference(self):
         """배치 추론 실행"""
@@ -436,6 +863,12 @@ class VisionADTestApp:
             messagebox.showerror("오류", "이미지를 먼저 선택하세요")
             return
 
+        if not self.check_no_active_scan():
+            return
+
+        if not self.check_progress_channel_free('batch'):
+            return
+
         # 저장 경로 선택
         output_path = filedialog.asksaveasfilename(
             title="결과 저장 위치",
@@ -446,21 +879,134 @@ class VisionADTestApp:
         if not output_path:
             return
 
-        # 비동기 처리
-        def batch_task():
-            self.batch_status_label.configure(text=f"{len(self.batch_image_paths)}개 이미지 추론 중...")
+        # 같은 경로로 저장 중인 작업이 있으면 작업 폴더를 건드리기 전에 중단
+        job_key = ('batch', os.path.abspath(output_path))
+        if not self.check_job_not_active(job_key):
+            return
 
-            success, error = self.client.inference_batch(self.batch_image_paths, output_path)
+        image_paths = list(self.batch_image_paths)
+        client = self.client
+        post = self.scheduler.post
+        planner = None if self.batch_resumable_var.get() else self.create_chunk_planner()
+
+        job_dir = None
+        if self.batch_resumable_var.get():
+            job_dir = output_path + ".job"
+            if os.path.isdir(job_dir):
+                resume = messagebox.askyesnocancel(
+                    "이전 작업",
+                    f"중단된 작업이 남아 있습니다:\n{job_dir}\n\n"
+                    "이어서 진행할까요? (아니요를 누르면 기록을 지우고 새로 시작합니다)")
+                if resume is None:
+                    return
+                if not resume:
+                    shutil.rmtree(job_dir, ignore_errors=True)
+
+        progress = self.start_progress('batch', job_key, total=len(image_paths))
 
-            if error:
-                self.root.after(0, lambda: messagebox.showerror("오류", error))
-                self.root.after(0, lambda: self.batch_status_label.configure(text="추론 실패"))
+        # 비동기 처리
+        def batch_task(job):
+            post(self.batch_status_label.configure, text=f"{len(image_paths)}개 이미지 추론 중...")
+
+            if job_dir:
+                success, error = client.inference_batch_resumable(
+                    image_paths, output_path,
+                    job_dir=job_dir,
+                    chunk_size=self.BATCH_CHUNK_SIZE,
+                    max_workers=self.BATCH_MAX_WORKERS,
+                    chunk_callback=progress.update_chunks,
+                    scores_callback=progress.add_scores,
+                    stop_event=job.cancel_event,
+                    progress_callback=progress.add_transfer
+                )
             else:
-                self.root.after(0, lambda: messagebox.showinfo("성공", f"결과가 저장되었습니다:\n{output_path}"))
-                self.root.after(0, lambda: self.batch_status_label.configure(text="추론 완료!"))
+                success, error = client.inference_batch_chunked(
+                    image_paths, output_path,
+                    chunk_size=self.BATCH_CHUNK_SIZE,
+                    max_workers=self.BATCH_MAX_WORKERS,
+                    chunk_callback=progress.update_chunks,
+                    scores_callback=progress.add_scores,
+                    planner=planner,
+                    stop_event=job.cancel_event,
+                    progress_callback=progress.add_transfer
+                )
+
+            self.post_batch_result(job, error, output_path)
+
+        self.submit_job(job_key, f"배치 추론: {os.path.basename(output_path)}", batch_task,
+                        on_cancelled=lambda: self.batch_status_label.configure(text="추론 취소됨"))
+
+    def post_batch_result(self, job, error, output_path):
+        """배치 탭 추론 결과를 UI 큐로 전달 (작업 스레드에서 호출, 취소된 작업은 대화상자 없이 상태만 표시)"""
+        post = self.scheduler.post
+        if error and job.cancelled:
+            text = "추론 취소됨" if error == CANCELLED_ERROR else f"추론 취소됨: {error}"
+            post(self.batch_status_label.configure, text=text)
+        elif error:
+            post(messagebox.showerror, "오류", error)
+            post(self.batch_status_label.configure, text="추론 실패")
+        else:
+            post(setattr, self, 'last_result_zip', output_path)
+            post(messagebox.showinfo, "성공", f"결과가 저장되었습니다:\n{output_path}")
+            post(self.batch_status_label.configure, text="추론 완료!")
+
+    def create_chunk_planner(self):
+        """배치 추론 한 번에 사용할 청크 크기 플래너 (ADAPTIVE_CHUNKS가 False이면 None, 고정 크기 사용)"""
+        if not self.ADAPTIVE_CHUNKS:
+            return None
+        return ChunkPlanner(max_size=self.BATCH_CHUNK_SIZE * 10, target_seconds=self.BATCH_TARGET_SECONDS)
+
+    def run_folder_inference(self):
+        """폴더를 탐색하면서 찾은 이미지를 바로 배치 추론 (리스트에 추가하지 않음)"""
+        if not self.client:
+            messagebox.showerror("오류", "먼저 API 서버에 연결하세요")
+            return
+
+        if not self.check_progress_channel_free('batch'):
+            return
+
+        folder = filedialog.askdirectory(title="추론할 이미지 폴더 선택")
+        if not folder:
+            return
+
+        output_path = filedialog.asksaveasfilename(
+            title="결과 저장 위치",
+            defaultextension=".zip",
+            filetypes=[("ZIP files", "*.zip")]
+        )
+
+        if not output_path:
+            return
+
+        job_key = ('batch', os.path.abspath(output_path))
+        if not self.check_job_not_active(job_key):
+            return
+
+        client = self.client
+        post = self.scheduler.post
+        planner = self.create_chunk_planner()
+
+        # 탐색이 끝나기 전에는 전체 이미지 수를 모르므로 남은 시간은 표시하지 않음
+        progress = self.start_progress('batch', job_key)
+
+        def folder_task(job):
+            post(self.batch_status_label.configure, text=f"{folder} 탐색 및 추론 중...")
+
+            success, error = client.inference_folder(
+                folder, output_path,
+                chunk_size=self.BATCH_CHUNK_SIZE,
+                max_workers=self.BATCH_MAX_WORKERS,
+                chunk_callback=progress.update_chunks,
+                scores_callback=progress.add_scores,
+                planner=planner,
+                stop_event=job.cancel_event,
+                progress_callback=progress.add_transfer
+            )
+
+            self.post_batch_result(job, error, output_path)
 
-        thread = threading.Thread(target=batch_task)
-        thread.start()
+        self.submit_job(job_key, f"폴더 추론: {os.path.basename(folder) or folder}", folder_task,
+                        on_cancelled=lambda: self.batch_status_label.configure(text="추론 취소됨"))
 
     def select_normal_images(self):
         """정상 이미지 선택"""
@@ -494,21 +1040,81 @@ class VisionADTestApp:
         self.abnormal_image_paths = []
         self.update_abnormal_listbox()
 
+    def select_normal_folder(self):
+        """폴더의 이미지를 (하위 폴더 포함) 모두 정상 이미지로 추가"""
+        self.select_f1_folder('normal_image_paths', self.update_normal_listbox, "정상")
+
+    def select_abnormal_folder(self):
+        """폴더의 이미지를 (하위 폴더 포함) 모두 비정상 이미지로 추가"""
+        self.select_f1_folder('abnormal_image_paths', self.update_abnormal_listbox, "비정상")
+
+    def select_f1_folder(self, attr, update_listbox, kind):
+        """
+        폴더 탐색 결과를 F1 이미지 리스트에 추가
+
+        Args:
+            attr: 추가할 리스트 속성 이름 (탐색 중에 초기화되어도 새 리스트에 추가되도록 결과마다 다시 읽음)
+            update_listbox: 리스트박스 갱신 함수
+            kind: 표시용 이름 ("정상"/"비정상")
+        """
+        folder = filedialog.askdirectory(title=f"{kind} 이미지 폴더 선택")
+        if not folder:
+            return
+
+        def on_paths(paths):
+            getattr(self, attr).extend(paths)
+            update_listbox()
+
+        def on_done(count, error):
+            if error:
+                messagebox.showerror("오류", f"폴더를 탐색할 수 없습니다: {error}")
+            self.f1_scan_label.configure(text=f"{kind} 이미지 {count}개 추가됨")
+
+        self.f1_scan_label.configure(text=f"{kind} 이미지 폴더 탐색 중...")
+        self.scan_folder(('scan', kind, folder), iter_image_files(folder), on_paths, on_done)
+
+    def select_labeled_folder(self):
+        """하위 폴더 이름으로 정상/비정상을 구분해 이미지 추가 (라벨을 알 수 없는 이미지는 제외)"""
+        folder = filedialog.askdirectory(title="라벨 폴더 선택 (normal/abnormal 등의 하위 폴더 포함)")
+        if not folder:
+            return
+
+        counts = {NORMAL: 0, ABNORMAL: 0, None: 0}
+
+        def on_items(items):
+            normal = [path for path, label in items if label == NORMAL]
+            abnormal = [path for path, label in items if label == ABNORMAL]
+            counts[NORMAL] += len(normal)
+            counts[ABNORMAL] += len(abnormal)
+            counts[None] += len(items) - len(normal) - len(abnormal)
+
+            if normal:
+                self.normal_image_paths.extend(normal)
+                self.update_normal_listbox()
+            if abnormal:
+                self.abnormal_image_paths.extend(abnormal)
+                self.update_abnormal_listbox()
+            self.f1_scan_label.configure(
+                text=f"탐색 중... 정상 {counts[NORMAL]}개, 비정상 {counts[ABNORMAL]}개")
+
+        def on_done(count, error):
+            if error:
+                messagebox.showerror("오류", f"폴더를 탐색할 수 없습니다: {error}")
+            text = f"정상 {counts[NORMAL]}개, 비정상 {counts[ABNORMAL]}개 추가됨"
+            if counts[None]:
+                text += f" (라벨을 알 수 없는 {counts[None]}개 제외)"
+            self.f1_scan_label.configure(text=text)
+
+        self.f1_scan_label.configure(text="라벨 폴더 탐색 중...")
+        self.scan_folder(('scan', 'labeled', folder), iter_labeled_images(folder), on_items, on_done)
+
     def update_normal_listbox(self):
-        """정상 이미지 리스트박스 업데이트"""
-        self.normal_listbox.delete("1.0", "end")
-        self.normal_listbox.insert("end", f"총 {len(self.normal_image_paths)}개의 정상 이미지\n\n")
-        for i, path in enumerate(self.normal_image_paths, 1):
-            filename = os.path.basename(path)
-            self.normal_listbox.insert("end", f"{i}. {filename}\n")
+        """정상 이미지 리스트박스 업데이트 (새로 추가된 경로만 반영)"""
+        self.normal_listbox.set_paths(self.normal_image_paths)
 
     def update_abnormal_listbox(self):
-        """비정상 이미지 리스트박스 업데이트"""
-        self.abnormal_listbox.delete("1.0", "end")
-        self.abnormal_listbox.insert("end", f"총 {len(self.abnormal_image_paths)}개의 비정상 이미지\n\n")
-        for i, path in enumerate(self.abnormal_image_paths, 1):
-            filename = os.path.basename(path)
-            self.abnormal_listbox.insert("end", f"{i}. {filename}\n")
+        """비정상 이미지 리스트박스 업데이트 (새로 추가된 경로만 반영)"""
+        self.abnormal_listbox.set_paths(self.abnormal_image_paths)
 
     def run_f1_batch_inference(self):
         """F1 Score용 배치 추론 실행 (1단계)"""
@@ -524,6 +1130,12 @@ class VisionADTestApp:
             messagebox.showerror("오류", "비정상 이미지를 먼저 선택하세요")
             return
 
+        if not self.check_no_active_scan():
+            return
+
+        if not self.check_progress_channel_free('f1') or not self.check_progress_channel_free('export'):
+            return
+
         # 저장 경로 선택
         output_path = filedialog.asksaveasfilename(
             title="배치 추론 결과 저장 위치",
@@ -534,37 +1146,76 @@ class VisionADTestApp:
         if not output_path:
             return
 
+        job_key = ('batch', os.path.abspath(output_path))
+        if not self.check_job_not_active(job_key):
+            return
+
+        threshold = self.get_f1_threshold()
+        if threshold is None:
+            return
+
         # 모든 이미지 합치기
         all_images = self.normal_image_paths + self.abnormal_image_paths
+        client = self.client
+        post = self.scheduler.post
+        planner = self.create_chunk_planner()
+
+        # 청크 결과가 도착하는 대로 혼동 행렬/지표를 미리 집계해 진행 상황과 함께 게시
+        abnormal_set = set(self.abnormal_image_paths)
+        evaluator = IncrementalEvaluator(threshold)
+        progress = self.start_progress('f1', job_key, total=len(all_images),
+                                       extra=lambda: {'evaluation': evaluator.snapshot()})
+
+        def on_scores(items):
+            evaluator.add_many((score, path in abnormal_set) for path, score in items)
+            progress.add_scores(items)
+
+        def on_success():
+            # 성공 시 ZIP 경로 저장
+            self.f1_zip_path = output_path
+            self.last_result_zip = output_path
+            messagebox.showinfo("성공", f"배치 추론 완료!\n결과 저장: {output_path}")
+            self.f1_status_label.configure(text="✅ 배치 추론 완료! (2단계: F1 Score 계산 버튼을 눌러주세요)")
+            self.f1_zip_label.configure(text=f"추론 결과 ZIP: {os.path.basename(output_path)}", text_color="green")
+
+        def on_cancelled():
+            self.f1_status_label.configure(text="배치 추론 취소됨")
 
         # 비동기 처리
-        def batch_task():
+        def batch_task(job):
             try:
                 total_images = len(all_images)
-                self.f1_status_label.configure(text=f"1단계: {total_images}개 이미지 배치 추론 중...")
-
-                success, error = self.client.inference_batch(all_images, output_path)
+                post(self.f1_status_label.configure, text=f"1단계: {total_images}개 이미지 배치 추론 중...")
+
+                success, error = client.inference_batch_chunked(
+                    all_images, output_path,
+                    chunk_size=self.BATCH_CHUNK_SIZE,
+                    max_workers=self.BATCH_MAX_WORKERS,
+                    chunk_callback=progress.update_chunks,
+                    scores_callback=on_scores,
+                    planner=planner,
+                    stop_event=job.cancel_event,
+                    progress_callback=progress.add_transfer
+                )
 
-                if error:
+                if error and job.cancelled:
+                    post(on_cancelled)
+                elif error:
                     print(f"ERROR: {error}")
-                    self.root.after(0, lambda: messagebox.showerror("오류", error))
-                    self.root.after(0, lambda: self.f1_status_label.configure(text="❌ 배치 추론 실패"))
+                    post(messagebox.showerror, "오류", error)
+                    post(self.f1_status_label.configure, text="❌ 배치 추론 실패")
                 else:
-                    # 성공 시 ZIP 경로 저장
-                    self.f1_zip_path = output_path
-                    self.root.after(0, lambda: messagebox.showinfo("성공", f"배치 추론 완료!\n결과 저장: {output_path}"))
-                    self.root.after(0, lambda: self.f1_status_label.configure(text="✅ 배치 추론 완료! (2단계: F1 Score 계산 버튼을 눌러주세요)"))
-                    self.root.after(0, lambda: self.f1_zip_label.configure(text=f"추론 결과 ZIP: {os.path.basename(output_path)}", text_color="green"))
+                    post(on_success)
 
             except Exception as e:
                 import traceback
                 error_msg = traceback.format_exc()
                 print(f"EXCEPTION in batch_task:\n{error_msg}")
-                self.root.after(0, lambda: messagebox.showerror("예외 발생", f"예상치 못한 오류:\n{str(e)}"))
-                self.root.after(0, lambda: self.f1_status_label.configure(text="❌ 예외 발생"))
+                post(messagebox.showerror, "예외 발생", f"예상치 못한 오류:\n{str(e)}")
+                post(self.f1_status_label.configure, text="❌ 예외 발생")
 
-        thread = threading.Thread(target=batch_task)
-        thread.start()
+        self.submit_job(job_key, f"F1 배치 추론: {os.path.basename(output_path)}", batch_task,
+                        on_cancelled=on_cancelled)
 
     def run_f1_score_calculation(self):
         """저장된 ZIP에서 F1 Score 계산 (2단계)"""
@@ -580,84 +1231,534 @@ class VisionADTestApp:
             messagebox.showerror("오류", "정상/비정상 이미지를 선택하세요")
             return
 
+        if not self.check_no_active_scan():
+            return
+
+        threshold = self.get_f1_threshold()
+        if threshold is None:
+            return
+
+        normal_images = list(self.normal_image_paths)
+        abnormal_images = list(self.abnormal_image_paths)
+        zip_path = self.f1_zip_path
+        client = self.client
+        post = self.scheduler.post
+
         # 비동기 처리
-        def f1_task():
+        def f1_task(job):
             try:
-                self.f1_status_label.configure(text="2단계: F1 Score 계산 중...")
+                post(self.f1_status_label.configure, text="2단계: F1 Score 계산 중...")
 
-                result, error = self.client.calculate_f1_from_zip(
-                    self.f1_zip_path,
-                    self.normal_image_paths,
-                    self.abnormal_image_paths,
-                    self.THRESHOLD  # 고정된 Threshold 값 사용
+                result, error = client.calculate_f1_from_zip(
+                    zip_path,
+                    normal_images,
+                    abnormal_images,
+                    threshold
                 )
 
-                if error:
+                if job.cancelled:
+                    post(self.f1_status_label.configure, text="F1 Score 계산 취소됨")
+                elif error:
                     print(f"ERROR: {error}")
-                    self.root.after(0, lambda: messagebox.showerror("오류", error))
-                    self.root.after(0, lambda: self.f1_status_label.configure(text="❌ F1 Score 계산 실패"))
+                    post(messagebox.showerror, "오류", error)
+                    post(self.f1_status_label.configure, text="❌ F1 Score 계산 실패")
                 else:
-                    # 결과 출력
-                    def display_result():
-                        # 통계 계산
-                        normal_avg = sum(result['normal_scores'])/len(result['normal_scores'])
-                        abnormal_avg = sum(result['abnormal_scores'])/len(result['abnormal_scores'])
-                        normal_std = (sum((x - normal_avg)**2 for x in result['normal_scores']) / len(result['normal_scores']))**0.5
-                        abnormal_std = (sum((x - abnormal_avg)**2 for x in result['abnormal_scores']) / len(result['abnormal_scores']))**0.5
-
-                        # 1. 데이터셋 정보 업데이트
-                        info_text = f"""✓ 정상 이미지: {len(result['normal_scores'])}개
-                                        ✓ 비정상 이미지: {len(result['abnormal_scores'])}개
-                                        ✓ 전체 이미지: {len(result['normal_scores']) + len(result['abnormal_scores'])}개"""
-                        self.f1_info_label.configure(text=info_text)
-
-                        # 2. Confusion Matrix 업데이트
-                        self.cm_tp_label.configure(text=f"TP\n{result['tp']}")
-                        self.cm_fn_label.configure(text=f"FN\n{result['fn']}")
-                        self.cm_fp_label.configure(text=f"FP\n{result['fp']}")
-                        self.cm_tn_label.configure(text=f"TN\n{result['tn']}")
-
-                        cm_desc_text = f"""TP (True Positive):  {result['tp']:3d}개 - 비정상을 비정상으로 올바르게 판정
-                                        TN (True Negative):  {result['tn']:3d}개 - 정상을 정상으로 올바르게 판정
-                                        FP (False Positive): {result['fp']:3d}개 - 정상을 비정상으로 잘못 판정
-                                        FN (False Negative): {result['fn']:3d}개 - 비정상을 정상으로 잘못 판정"""
-                        self.cm_desc_label.configure(text=cm_desc_text)
-
-                        # 3. 성능 지표 업데이트
-                        self.f1_score_label.configure(text=f"F1 Score: {result['f1_score']:.4f} ({result['f1_score']*100:.2f}%)")
-                        self.precision_label.configure(text=f"Precision: {result['precision']:.4f} ({result['precision']*100:.2f}%)")
-                        self.recall_label.configure(text=f"Recall: {result['recall']:.4f} ({result['recall']*100:.2f}%)")
-                        self.accuracy_label.configure(text=f"Accuracy: {result['accuracy']:.4f} ({result['accuracy']*100:.2f}%)")
-
-                        # 4. Anomaly Score 분포 업데이트
-                        dist_text = f"""✅ 정상 이미지 (Normal):
-   • 최소값: {min(result['normal_scores']):.6f}
-   • 최대값: {max(result['normal_scores']):.6f}
-   • 평균값: {normal_avg:.6f}
-   • 표준편차: {normal_std:.6f}
+                    post(self.show_f1_result, result)
+
+            except Exception as e:
+                import traceback
+                error_msg = traceback.format_exc()
+                print(f"EXCEPTION in f1_task:\n{error_msg}")
+                post(messagebox.showerror, "예외 발생", f"예상치 못한 오류:\n{str(e)}")
+                post(self.f1_status_label.configure, text="❌ 예외 발생")
+
+        self.submit_job(('f1', os.path.abspath(zip_path)), "F1 Score 계산", f1_task,
+                        on_cancelled=lambda: self.f1_status_label.configure(text="F1 Score 계산 취소됨"))
+
+    def run_f1_overlay_export(self):
+        """저장된 ZIP의 overlay를 threshold 초과/이하와 정상/비정상 라벨별 폴더로 추출"""
+        if not self.client:
+            messagebox.showerror("오류", "먼저 API 서버에 연결하세요")
+            return
+
+        if not self.f1_zip_path or not os.path.exists(self.f1_zip_path):
+            messagebox.showerror("오류", "먼저 1단계 '배치 추론 실행'을 완료하세요")
+            return
+
+        if not self.check_no_active_scan():
+            return
+
+        # F1 배치 추론과 같은 진행 막대를 쓰므로 둘 중 하나라도 실행 중이면 시작하지 않음
+        if not self.check_progress_channel_free('f1') or not self.check_progress_channel_free('export'):
+            return
+
+        threshold = self.get_f1_threshold()
+        if threshold is None:
+            return
+
+        output_dir = filedialog.askdirectory(title="overlay를 저장할 폴더 선택")
+        if not output_dir:
+            return
+
+        job_key = ('export', os.path.abspath(output_dir))
+        if not self.check_job_not_active(job_key):
+            return
+
+        normal_images = list(self.normal_image_paths)
+        abnormal_images = list(self.abnormal_image_paths)
+        zip_path = self.f1_zip_path
+        client = self.client
+        post = self.scheduler.post
+        progress = self.start_progress('export', job_key)
+
+        def export_task(job):
+            post(self.f1_status_label.configure, text="overlay 내보내는 중...")
+            result, error = client.export_overlays_from_zip(
+                zip_path, output_dir, threshold,
+                normal_images=normal_images,
+                abnormal_images=abnormal_images,
+                max_workers=self.EXPORT_MAX_WORKERS,
+                progress_callback=progress.update_done,
+                stop_event=job.cancel_event
+            )
+
+            if job.cancelled or error == CANCELLED_ERROR:
+                post(self.f1_status_label.configure, text="overlay 내보내기 취소됨")
+            elif error:
+                post(messagebox.showerror, "오류", error)
+                post(self.f1_status_label.configure, text="❌ overlay 내보내기 실패")
+            else:
+                folders = "\n".join(f"  {folder}: {count}개" for folder, count in sorted(result['folders'].items()))
+                message = f"{result['exported']}개 overlay를 저장했습니다:\n{result['output_dir']}\n\n{folders}"
+                if result['failed']:
+                    message += f"\n\n실패 {result['failed']}개:\n" + "\n".join(result['errors'][:5])
+                post(messagebox.showinfo, "완료", message)
+                post(self.f1_status_label.configure, text=f"✅ overlay {result['exported']}개 내보내기 완료")
+
+        self.submit_job(job_key, f"overlay 내보내기: {os.path.basename(output_dir)}", export_task,
+                        on_cancelled=lambda: self.f1_status_label.configure(text="overlay 내보내기 취소됨"))
+
+    def get_f1_threshold(self):
+        """Threshold 입력값 (잘못된 값이면 오류 표시 후 None)"""
+        try:
+            return float(self.threshold_entry.get().strip())
+        except ValueError:
+            messagebox.showerror("오류", "Threshold는 숫자로 입력하세요")
+            return None
+
+    def apply_f1_threshold(self):
+        """입력한 Threshold로 저장된 점수에서 결과 다시 계산 (재추론 없음)"""
+        if not self.f1_result:
+            messagebox.showerror("오류", "먼저 2단계 'F1 Score 계산'을 완료하세요")
+            return
+
+        threshold = self.get_f1_threshold()
+        if threshold is None:
+            return
+
+        result = dict(self.f1_result)
+        result.update(evaluate_threshold(result['normal_scores'], result['abnormal_scores'], threshold))
+        self.show_f1_result(result)
+
+    def apply_best_f1_threshold(self):
+        """F1 최적 Threshold 적용"""
+        if not self.f1_result or self.f1_result.get('best_threshold') is None:
+            messagebox.showerror("오류", "먼저 2단계 'F1 Score 계산'을 완료하세요")
+            return
+
+        self.threshold_entry.delete(0, "end")
+        self.threshold_entry.insert(0, f"{self.f1_result['best_threshold']:.6f}")
+        self.apply_f1_threshold()
+
+    def show_f1_result(self, result):
+        """F1 Score 계산 결과 표시"""
+        self.f1_result = result
+
+        # 1. 데이터셋 정보 업데이트
+        self.update_f1_info_view(len(result['normal_scores']), len(result['abnormal_scores']))
+
+        # 2. Confusion Matrix / 3. 성능 지표 업데이트
+        self.update_f1_metrics_view(result)
+
+        if result.get('auroc') is not None:
+            self.auroc_label.configure(text=f"AUROC: {result['auroc']:.4f}")
+            self.ap_label.configure(text=f"AP (PR-AUC): {result['average_precision']:.4f}")
+            self.fpr_at_tpr_label.configure(
+                text=f"FPR @ {result['target_tpr']*100:.0f}% Recall: {result['fpr_at_tpr']:.4f} ({result['fpr_at_tpr']*100:.2f}%)")
+
+        # 4. Anomaly Score 분포 업데이트
+        self.update_f1_dist_view(score_stats(result['normal_scores']), score_stats(result['abnormal_scores']))
+
+        # 5. Threshold 탐색 결과
+        sweep = result.get('sweep')
+        if sweep and sweep['best_index'] is not None:
+            best = sweep['best_index']
+            sweep_text = f"""⭐ F1 최적 Threshold: {sweep['best_threshold']:.6f}
+   • F1 Score: {sweep['f1_score'][best]:.4f}   • Precision: {sweep['precision'][best]:.4f}
+   • Recall: {sweep['recall'][best]:.4f}   • Accuracy: {sweep['accuracy'][best]:.4f}
+   • 현재 Threshold: {result['threshold']:.6f} (F1 {result['f1_score']:.4f})
+   • 탐색한 Threshold 후보: {len(sweep['thresholds'])}개"""
+            self.f1_sweep_label.configure(text=sweep_text)
+            self.draw_f1_curve(sweep, result['threshold'])
+
+        self.f1_status_label.configure(text="✅ F1 Score 계산 완료!")
+
+    def update_f1_info_view(self, normal_count, abnormal_count, suffix=""):
+        """데이터셋 정보 표시"""
+        info_text = f"""✓ 정상 이미지: {normal_count}개
+                                        ✓ 비정상 이미지: {abnormal_count}개
+                                        ✓ 전체 이미지: {normal_count + abnormal_count}개{suffix}"""
+        self.f1_info_label.configure(text=info_text)
+
+    def update_f1_metrics_view(self, metrics):
+        """Confusion Matrix와 성능 지표 표시 (tp/fp/tn/fn, precision, recall, f1_score, accuracy)"""
+        self.cm_tp_label.configure(text=f"TP\n{metrics['tp']}")
+        self.cm_fn_label.configure(text=f"FN\n{metrics['fn']}")
+        self.cm_fp_label.configure(text=f"FP\n{metrics['fp']}")
+        self.cm_tn_label.configure(text=f"TN\n{metrics['tn']}")
+
+        cm_desc_text = f"""TP (True Positive):  {metrics['tp']:3d}개 - 비정상을 비정상으로 올바르게 판정
+                                        TN (True Negative):  {metrics['tn']:3d}개 - 정상을 정상으로 올바르게 판정
+                                        FP (False Positive): {metrics['fp']:3d}개 - 정상을 비정상으로 잘못 판정
+                                        FN (False Negative): {metrics['fn']:3d}개 - 비정상을 정상으로 잘못 판정"""
+        self.cm_desc_label.configure(text=cm_desc_text)
+
+        self.f1_score_label.configure(text=f"F1 Score: {metrics['f1_score']:.4f} ({metrics['f1_score']*100:.2f}%)")
+        self.precision_label.configure(text=f"Precision: {metrics['precision']:.4f} ({metrics['precision']*100:.2f}%)")
+        self.recall_label.configure(text=f"Recall: {metrics['recall']:.4f} ({metrics['recall']*100:.2f}%)")
+        self.accuracy_label.configure(text=f"Accuracy: {metrics['accuracy']:.4f} ({metrics['accuracy']*100:.2f}%)")
+
+    def update_f1_dist_view(self, normal_stats, abnormal_stats):
+        """Anomaly Score 분포 표시 (metrics.score_stats 형식)"""
+        def format_stats(stats):
+            if not stats['count']:
+                return "   • (아직 결과 없음)"
+            return f"""   • 최소값: {stats['min']:.6f}
+   • 최대값: {stats['max']:.6f}
+   • 평균값: {stats['mean']:.6f}
+   • 표준편차: {stats['std']:.6f}"""
+
+        dist_text = f"""✅ 정상 이미지 (Normal):
+{format_stats(normal_stats)}
 
 🔴 비정상 이미지 (Abnormal):
-   • 최소값: {min(result['abnormal_scores']):.6f}
-   • 최대값: {max(result['abnormal_scores']):.6f}
-   • 평균값: {abnormal_avg:.6f}
-   • 표준편차: {abnormal_std:.6f}
+{format_stats(abnormal_stats)}"""
+        if normal_stats['count'] and abnormal_stats['count']:
+            dist_text += f"\n\n📊 평균 점수 차이: {abs(abnormal_stats['mean'] - normal_stats['mean']):.6f}"
+        self.f1_dist_label.configure(text=dist_text)
+
+    def render_f1_progress(self, state):
+        """F1 배치 추론 진행 상황과 도착한 점수로 집계한 지표 표시 (progress bus 표시 함수)"""
+        self.update_progress_view(self.f1_progress_bar, self.f1_progress_label, state)
+        self.update_transfer_view(self.f1_transfer_bar, self.f1_transfer_label, state['transfer'])
+
+        snapshot = state['evaluation']
+        if snapshot['count'] > 0:
+            normal_stats, abnormal_stats = snapshot['normal_stats'], snapshot['abnormal_stats']
+            self.update_f1_info_view(normal_stats['count'], abnormal_stats['count'],
+                                     f" (진행 중: {snapshot['count']}/{state['total']})")
+            self.update_f1_metrics_view(snapshot)
+            self.update_f1_dist_view(normal_stats, abnormal_stats)
+
+    def render_export_progress(self, state):
+        """overlay 내보내기 진행 상황 표시 (progress bus 표시 함수, F1 배치 추론과 같은 진행 막대 사용)"""
+        self.update_progress_view(self.f1_progress_bar, self.f1_progress_label, state)
+
+    def draw_f1_curve(self, sweep, threshold):
+        """Threshold별 F1/Precision/Recall 곡선 그리기"""
+        canvas = self.f1_curve_canvas
+        canvas.delete("all")
+
+        thresholds = sweep['thresholds']
+        if not thresholds:
+            return
 
-📊 평균 점수 차이: {abs(abnormal_avg - normal_avg):.6f}"""
-                        self.f1_dist_label.configure(text=dist_text)
+        width, height, pad = int(canvas.cget("width")), int(canvas.cget("height")), 20
+        t_min, t_max = thresholds[0], thresholds[-1]
+        span = (t_max - t_min) or 1.0
+
+        def to_xy(t, v):
+            x = pad + (t - t_min) / span * (width - 2 * pad)
+            y = height - pad - v * (height - 2 * pad)
+            return x, y
+
+        # 점이 많으면 화면 폭에 맞춰 간격을 두고 그림
+        step = max(1, len(thresholds) // (width - 2 * pad))
+        indices = list(range(0, len(thresholds), step))
+        if indices[-1] != len(thresholds) - 1:
+            indices.append(len(thresholds) - 1)
+
+        for key, color in (('precision', "#2196F3"), ('recall', "#4CAF50"), ('f1_score', "#FF9800")):
+            points = []
+            for i in indices:
+                points.extend(to_xy(thresholds[i], sweep[key][i]))
+            if len(points) >= 4:
+                canvas.create_line(*points, fill=color, width=2)
+
+        # 최적/현재 threshold 표시
+        best_x, _ = to_xy(sweep['best_threshold'], 0)
+        canvas.create_line(best_x, pad, best_x, height - pad, fill="#FFEB3B", dash=(4, 2))
+        if t_min <= threshold <= t_max:
+            cur_x, _ = to_xy(threshold, 0)
+            canvas.create_line(cur_x, pad, cur_x, height - pad, fill="#FFFFFF", dash=(2, 2))
+
+        canvas.create_text(pad, height - 5, text=f"{t_min:.3f}", fill="gray", anchor="w", font=("Arial", 8))
+        canvas.create_text(width - pad, height - 5, text=f"{t_max:.3f}", fill="gray", anchor="e", font=("Arial", 8))
+        canvas.create_text(width - pad, 8, text="F1 / Precision / Recall", fill="gray", anchor="e", font=("Arial", 8))
+
+    def setup_stats_tab(self):
+        """호출 통계 탭 구성 (단계별 지연 시간, 전송량, 히스토그램)"""
+        top_frame = ctk.CTkFrame(self.tab_stats)
+        top_frame.pack(fill="x", padx=10, pady=10)
 
-                        self.f1_status_label.configure(text="✅ F1 Score 계산 완료!")
+        self.stats_enabled_var = ctk.BooleanVar(value=True)
+        ctk.CTkCheckBox(top_frame, text="계측 사용", variable=self.stats_enabled_var,
+                        command=self.toggle_instrumentation).pack(side="left", padx=5)
 
-                    self.root.after(0, display_result)
+        self.stats_range = ctk.CTkSegmentedButton(top_frame, values=["전체", "최근 5분"],
+                                                  command=lambda value: self.refresh_stats(reschedule=False))
+        self.stats_range.set("전체")
+        self.stats_range.pack(side="left", padx=10)
 
-            except Exception as e:
-                import traceback
-                error_msg = traceback.format_exc()
-                print(f"EXCEPTION in f1_task:\n{error_msg}")
-                self.root.after(0, lambda: messagebox.showerror("예외 발생", f"예상치 못한 오류:\n{str(e)}"))
-                self.root.after(0, lambda: self.f1_status_label.configure(text="❌ 예외 발생"))
+        ctk.CTkButton(top_frame, text="초기화", command=self.reset_stats, width=80).pack(side="right", padx=5)
+        ctk.CTkButton(top_frame, text="CSV 내보내기", command=lambda: self.export_stats("csv"),
+                      width=110).pack(side="right", padx=5)
+        ctk.CTkButton(top_frame, text="JSON 내보내기", command=lambda: self.export_stats("json"),
+                      width=110).pack(side="right", padx=5)
+
+        self.stats_textbox = ctk.CTkTextbox(self.tab_stats, height=260, font=("Courier New", 12))
+        self.stats_textbox.pack(fill="both", expand=True, padx=10, pady=5)
+
+        hist_frame = ctk.CTkFrame(self.tab_stats)
+        hist_frame.pack(fill="x", padx=10, pady=10)
+
+        ctk.CTkLabel(hist_frame, text="전체 소요 시간 분포", font=("Arial", 14, "bold")).pack(side="left", padx=5)
+        self.stats_kind_menu = ctk.CTkOptionMenu(hist_frame, values=["single", "batch", "chunked", "job"],
+                                                 command=lambda value: self.refresh_stats(reschedule=False))
+        self.stats_kind_menu.set("batch")
+        self.stats_kind_menu.pack(side="left", padx=10)
 
-        thread = threading.Thread(target=f1_task)
-        thread.start()
+        self.stats_hist_canvas = ctk.CTkCanvas(self.tab_stats, width=900, height=160, bg="#2B2B2B",
+                                               highlightthickness=0)
+        self.stats_hist_canvas.pack(padx=10, pady=(0, 10))
+
+        self.root.after(self.STATS_REFRESH_MS, self.refresh_stats)
+
+    def toggle_instrumentation(self):
+        """계측 사용 여부를 현재 클라이언트에 바로 적용"""
+        if self.client:
+            self.client.instrumentation = self.instrumentation if self.stats_enabled_var.get() else None
+
+    def reset_stats(self):
+        self.instrumentation.reset()
+        self.refresh_stats(reschedule=False)
+
+    def export_stats(self, file_format):
+        """통계를 JSON(요약 + 최근 호출 기록) 또는 CSV(종류/단계별 요약)로 저장"""
+        output_path = filedialog.asksaveasfilename(
+            title="통계 저장 위치",
+            defaultextension=f".{file_format}",
+            filetypes=[(f"{file_format.upper()} files", f"*.{file_format}")]
+        )
+        if not output_path:
+            return
+
+        try:
+            if file_format == "json":
+                extra = {'endpoints': self.client.endpoints.stats()} if self.client else None
+                self.instrumentation.export_json(output_path, extra)
+            else:
+                self.instrumentation.export_csv(output_path)
+        except OSError as e:
+            messagebox.showerror("오류", f"통계를 저장할 수 없습니다: {str(e)}")
+
+    def refresh_stats(self, reschedule=True):
+        """통계 탭 갱신 (탭이 보일 때만 다시 그림)"""
+        if reschedule:
+            self.root.after(self.STATS_REFRESH_MS, self.refresh_stats)
+            if self.tabview.get() != "통계":
+                return
+
+        recent = self.stats_range.get() == "최근 5분"
+
+        def fmt(value):
+            return "-" if value is None else f"{value:.1f}"
+
+        lines = [f"{'종류':<8} {'단계':<10} {'횟수':>7} {'평균ms':>9} {'p50ms':>9} {'p95ms':>9} {'p99ms':>9} {'최대ms':>9}"]
+        for kind, stats in sorted(self.instrumentation.summary(recent).items()):
+            for phase, phase_stats in stats['phases'].items():
+                lines.append(f"{kind:<8} {phase:<10} {phase_stats['count']:>7} {fmt(phase_stats['mean_ms']):>9} "
+                             f"{fmt(phase_stats['p50_ms']):>9} {fmt(phase_stats['p95_ms']):>9} "
+                             f"{fmt(phase_stats['p99_ms']):>9} {fmt(phase_stats['max_ms']):>9}")
+            lines.append(f"{'':<8} 호출 {stats['calls']}회 (실패 {stats['errors']}), 이미지 {stats['images']}장, "
+                         f"업로드 {stats['bytes_up'] / 1024 / 1024:.1f} MB, "
+                         f"다운로드 {stats['bytes_down'] / 1024 / 1024:.1f} MB")
+            lines.append("")
+
+        if len(lines) == 1:
+            lines.append("기록된 호출이 없습니다")
+
+        # 서버별 처리량/상태 (여러 서버에 연결한 경우)
+        if self.client and len(self.client.endpoints.endpoints) > 1:
+            lines.append("")
+            lines.append(f"{'서버':<32} {'상태':<6} {'진행':>5} {'요청':>7} {'이미지':>8} {'실패':>5} "
+                         f"{'ms/장':>8} {'확인ms':>8} {'장/초':>7}")
+            for row in self.client.endpoints.stats():
+                state = "사용" if row['available'] else f"제외 {row['ejected_for_s']:.0f}s"
+                lines.append(f"{row['url'][:32]:<32} {state:<6} {row['outstanding']:>5} {row['requests']:>7} "
+                             f"{row['images']:>8} {row['errors']:>5} {fmt(row['ms_per_image']):>8} "
+                             f"{fmt(row['probe_ms']):>8} {row['images_per_s']:>7.1f}")
+                if row['eject_reason']:
+                    lines.append(f"{'':<32} └ {row['eject_reason']}")
+
+        self.stats_textbox.delete("1.0", "end")
+        self.stats_textbox.insert("end", "\n".join(lines))
+
+        self.draw_stats_histogram(self.instrumentation.histogram(self.stats_kind_menu.get(), TOTAL, recent))
+
+    def draw_stats_histogram(self, histogram):
+        """지연 시간 히스토그램 막대 그래프 (기록이 있는 구간만)"""
+        canvas = self.stats_hist_canvas
+        canvas.delete("all")
+        if histogram is None or not histogram.count:
+            return
+
+        used = [i for i, n in enumerate(histogram.counts) if n]
+        first, last = used[0], used[-1]
+        width, height, pad = int(canvas.cget("width")), int(canvas.cget("height")), 20
+        bar_width = (width - 2 * pad) / (last - first + 1)
+        peak = max(histogram.counts)
+
+        for i in range(first, last + 1):
+            n = histogram.counts[i]
+            if not n:
+                continue
+            x0 = pad + (i - first) * bar_width
+            y0 = height - pad - n / peak * (height - 2 * pad)
+            canvas.create_rectangle(x0, y0, x0 + max(1, bar_width - 1), height - pad, fill="#2196F3", outline="")
+
+        def bound_ms(i):
+            return BUCKET_BOUNDS[min(i, len(BUCKET_BOUNDS) - 1)] * 1000
+
+        canvas.create_text(pad, height - 5, text=f"{bound_ms(first - 1) if first else 0:.1f} ms",
+                           fill="gray", anchor="w", font=("Arial", 8))
+        canvas.create_text(width - pad, height - 5, text=f"{bound_ms(last):.1f} ms",
+                           fill="gray", anchor="e", font=("Arial", 8))
+        canvas.create_text(width - pad, 8, text=f"{histogram.count}회, 최대 {peak}회/구간",
+                           fill="gray", anchor="e", font=("Arial", 8))
+
+    def setup_results_tab(self):
+        """결과 보기 탭 구성 (결과 ZIP의 overlay를 압축 해제 없이 점수순 썸네일로 표시)"""
+        top_frame = ctk.CTkFrame(self.tab_results)
+        top_frame.pack(fill="x", padx=10, pady=10)
+
+        ctk.CTkButton(top_frame, text="ZIP 열기", command=self.select_result_zip, width=100).pack(side="left", padx=5)
+        ctk.CTkButton(top_frame, text="최근 결과 열기", command=self.open_last_result_zip,
+                      width=120).pack(side="left", padx=5)
+        self.result_zip_label = ctk.CTkLabel(top_frame, text="열린 결과 ZIP 없음", text_color="gray")
+        self.result_zip_label.pack(side="left", padx=10)
+
+        body = ctk.CTkFrame(self.tab_results, fg_color="transparent")
+        body.pack(fill="both", expand=True, padx=10, pady=5)
+
+        self.overlay_grid = OverlayGrid(body, self.thumbnail_loader, self.scheduler.post,
+                                        on_select=self.show_result_overlay)
+        self.overlay_grid.pack(side="left", fill="both", expand=True, padx=(0, 5))
+
+        preview_frame = ctk.CTkFrame(body)
+        preview_frame.pack(side="right", fill="y")
+
+        ctk.CTkLabel(preview_frame, text="Overlay", font=("Arial", 16, "bold")).pack(pady=5)
+        self.result_preview_label = ctk.CTkLabel(preview_frame, text="썸네일을 클릭하세요", width=400, height=400)
+        self.result_preview_label.pack(padx=10, pady=5)
+        self.result_info_label = ctk.CTkLabel(preview_frame, text="", font=("Arial", 12), justify="left")
+        self.result_info_label.pack(padx=10, pady=5)
+
+    def select_result_zip(self):
+        """결과 ZIP 선택"""
+        zip_path = filedialog.askopenfilename(
+            title="결과 ZIP 선택",
+            filetypes=[("ZIP files", "*.zip"), ("All files", "*.*")]
+        )
+        if zip_path:
+            self.open_result_zip(zip_path)
+
+    def open_last_result_zip(self):
+        """배치/F1 탭에서 마지막으로 저장한 결과 ZIP 열기"""
+        if not self.last_result_zip or not os.path.exists(self.last_result_zip):
+            messagebox.showerror("오류", "저장된 배치 추론 결과가 없습니다")
+            return
+        self.open_result_zip(self.last_result_zip)
+
+    def open_result_zip(self, zip_path):
+        """결과 ZIP의 점수/overlay 인덱스를 백그라운드에서 만든 뒤 썸네일 격자에 표시"""
+        self.result_zip_label.configure(text=f"인덱스 생성 중: {os.path.basename(zip_path)}", text_color="gray")
+
+        def index_task(job):
+            index, error = None, None
+            try:
+                index = ResultIndex(zip_path)
+            except KeyError:
+                error = "scores.csv가 없습니다. 배치 추론 결과 ZIP을 선택하세요."
+            except (OSError, zipfile.BadZipFile) as e:
+                error = f"ZIP을 열 수 없습니다: {e}"
+            self.scheduler.post(self.show_result_index, job, index, error)
+
+        self.submit_job(('results', os.path.abspath(zip_path)), f"결과 인덱스: {os.path.basename(zip_path)}",
+                        index_task)
+
+    def show_result_index(self, job, index, error):
+        """만들어진 결과 인덱스를 격자에 표시 (메인 스레드에서 호출)"""
+        if error:
+            self.result_zip_label.configure(text="열린 결과 ZIP 없음", text_color="gray")
+            messagebox.showerror("오류", error)
+            return
+        if job.cancelled:
+            index.close()
+            self.result_zip_label.configure(text="결과 ZIP 열기 취소됨", text_color="gray")
+            return
+
+        if self.result_index is not None:
+            self.result_index.close()
+        self.result_index = index
+        self.overlay_grid.set_index(index)
+        self.next_display_request(self.result_preview_label)
+        self.result_preview_label.configure(image="", text="썸네일을 클릭하세요")
+        self.result_info_label.configure(text="")
+
+        missing = sum(1 for member in index.members if member is None)
+        summary = f"{os.path.basename(index.zip_path)} ({index.total}개"
+        summary += f", overlay 없음 {missing}개)" if missing else ")"
+        self.result_zip_label.configure(text=summary, text_color="green")
+
+    def show_result_overlay(self, row):
+        """선택한 결과의 overlay를 크게 표시"""
+        number, name, score, member = row
+        self.result_info_label.configure(
+            text=f"파일명: {name}\n이상 점수: {score:.4f}\nscores.csv 행: {number}\nOverlay: {member or '없음'}"
+        )
+
+        token = self.next_display_request(self.result_preview_label)
+        if member is None:
+            self.result_preview_label.configure(image="", text="overlay 없음")
+            return
+        self.result_index.load_overlay(
+            self.thumbnail_loader, member, (400, 400),
+            lambda thumbnail, error: self.scheduler.post(self.show_thumbnail, self.result_preview_label, token,
+                                                         thumbnail, error)
+        )
+
+    def on_close(self):
+        """애플리케이션 종료 (작업 취소, 커넥션 풀 정리 후 창 닫기)"""
+        self.scheduler.shutdown()
+        if self.client:
+            self.client.close()
+            if self.client.cache:
+                self.client.cache.close()
+        self.thumbnail_loader.close()
+        if self.result_index is not None:
+            self.result_index.close()
+        self.root.destroy()
 
     def run(self):
         """애플리케이션 실행"""
@@ -665,5 +1766,8 @@ class VisionADTestApp:
 
 
 if __name__ == "__main__":
+    # PyInstaller로 빌드한 EXE에서 전처리 프로세스 풀을 사용하기 위해 필요
+    multiprocessing.freeze_support()
+
     app = VisionADTestApp()
     app.run()
@@ -0,0 +1,250 @@
+"""
+FastAPI 이상 탐지 API 비동기(asyncio) 클라이언트
+"""
+import asyncio
+import io
+import os
+import tempfile
+from typing import AsyncIterator, Dict, Iterable, List, Optional, Tuple
+
+import aiohttp
+from PIL import Image
+
+from preprocess import content_type_for
+from streaming import MultipartFileStream, ProgressCallback
+
+
+def _read_file(path: str) -> bytes:
+    with open(path, 'rb') as f:
+        return f.read()
+
+
+class AsyncVisionADClient:
+    """
+    Vision Anomaly Detection API 비동기 클라이언트
+
+    요청마다 스레드를 만들지 않고 하나의 이벤트 루프에서 많은 요청을 동시에 처리합니다.
+    동시에 진행되는 요청 수는 max_concurrency로 제한됩니다.
+
+    사용 예:
+        async with AsyncVisionADClient(url, max_concurrency=200) as client:
+            async for path, score, overlay in client.iter_inference(paths):
+                ...
+    """
+
+    def __init__(self, base_url: str = "http://bigsoft.iptime.org:55630",
+                 max_concurrency: int = 64, limit_per_host: int = 0,
+                 single_timeout: float = 60, batch_timeout: float = 300):
+        """
+        Args:
+            base_url: FastAPI 서버 주소
+            max_concurrency: 동시에 진행할 최대 요청 수 (커넥션 풀 크기도 동일)
+            limit_per_host: 호스트 하나당 최대 커넥션 수 (0이면 제한 없음)
+            single_timeout: 단일 이미지 요청 기본 타임아웃 (초)
+            batch_timeout: 배치 요청 기본 타임아웃 (초)
+        """
+        self.base_url = base_url.rstrip('/')
+        self.max_concurrency = max_concurrency
+        self.limit_per_host = limit_per_host
+        self.single_timeout = single_timeout
+        self.batch_timeout = batch_timeout
+
+        # 이벤트 루프에 묶이는 객체들은 루프 안에서 처음 사용할 때 생성
+        self._session = None
+        self._semaphore = None
+
+    async def _get_session(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(limit=self.max_concurrency, limit_per_host=self.limit_per_host)
+            self._session = aiohttp.ClientSession(connector=connector)
+        return self._session
+
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._semaphore
+
+    async def close(self):
+        """세션과 커넥션 풀 정리"""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
+
+    async def inference_single(self, image_path: str,
+                               timeout: Optional[float] = None) -> Tuple[Optional[Image.Image], Optional[float], Optional[str]]:
+        """
+        단일 이미지 이상 탐지 추론
+
+        Args:
+            image_path: 이미지 파일 경로
+            timeout: 요청 타임아웃 (초, None이면 single_timeout)
+
+        Returns:
+            (결과 이미지, anomaly_score, 에러 메시지)
+        """
+        try:
+            url = f"{self.base_url}/InferenceVisionAD_Single"
+            loop = asyncio.get_running_loop()
+
+            async with self._get_semaphore():
+                # 파일 읽기는 기본 executor에서 수행해 이벤트 루프를 막지 않음
+                content = await loop.run_in_executor(None, _read_file, image_path)
+
+                data = aiohttp.FormData()
+                data.add_field('file', content, filename=os.path.basename(image_path),
+                               content_type=content_type_for(image_path))
+
+                session = await self._get_session()
+                client_timeout = aiohttp.ClientTimeout(total=timeout if timeout is not None else self.single_timeout)
+                async with session.post(url, data=data, timeout=client_timeout) as response:
+                    if response.status != 200:
+                        return None, None, f"API Error: {response.status}"
+
+                    # 헤더에서 anomaly score 추출
+                    anomaly_score = float(response.headers.get('X-Anomaly-Score', 0.0))
+                    body = await response.read()
+
+            # 이미지 데이터를 PIL Image로 변환
+            result_image = Image.open(io.BytesIO(body))
+
+            return result_image, anomaly_score, None
+
+        except aiohttp.ClientConnectionError:
+            return None, None, "서버에 연결할 수 없습니다. 서버가 실행 중인지 확인하세요."
+        except asyncio.TimeoutError:
+            return None, None, "요청 시간이 초과되었습니다."
+        except Exception as e:
+            return None, None, f"Error: {str(e)}"
+
+    async def inference_batch(self, image_paths: List[str], output_path: str,
+                              timeout: Optional[float] = None,
+                              upload_callback: Optional[ProgressCallback] = None,
+                              download_callback: Optional[ProgressCallback] = None) -> Tuple[bool, Optional[str]]:
+        """
+        배치 이미지 이상 탐지 추론
+
+        VisionADClient.inference_batch와 같이 이미지를 디스크에서 스트리밍 업로드하고,
+        결과 ZIP은 임시 파일에 받은 뒤 output_path로 원자적으로 교체합니다.
+
+        Args:
+            image_paths: 이미지 파일 경로 리스트
+            output_path: 결과 ZIP 파일을 저장할 경로
+            timeout: 요청 타임아웃 (초, None이면 batch_timeout)
+            upload_callback: 업로드 진행 콜백 (전송한 바이트 수, 전체 바이트 수)
+            download_callback: 다운로드 진행 콜백 (받은 바이트 수, 전체 바이트 수 또는 None)
+
+        Returns:
+            (성공 여부, 에러 메시지)
+        """
+        temp_path = None
+
+        try:
+            url = f"{self.base_url}/InferenceVisionAD_Batch"
+            loop = asyncio.get_running_loop()
+
+            fields = []
+            for img_path in image_paths:
+                filename = img_path.split('\\')[-1].split('/')[-1]
+                fields.append(('files', filename, img_path, content_type_for(img_path)))
+
+            stream = MultipartFileStream(fields, progress_callback=upload_callback)
+
+            async def body():
+                with stream:
+                    while True:
+                        chunk = await loop.run_in_executor(None, stream.read, stream.chunk_size)
+                        if not chunk:
+                            return
+                        yield chunk
+
+            headers = {'Content-Type': stream.content_type, 'Content-Length': str(len(stream))}
+
+            async with self._get_semaphore():
+                session = await self._get_session()
+                client_timeout = aiohttp.ClientTimeout(total=timeout if timeout is not None else self.batch_timeout)
+                async with session.post(url, data=body(), headers=headers, timeout=client_timeout) as response:
+                    if response.status != 200:
+                        return False, f"API Error: {response.status}"
+
+                    total = response.content_length
+                    output_dir = os.path.dirname(os.path.abspath(output_path))
+                    fd, temp_path = tempfile.mkstemp(prefix='.download-', suffix='.part', dir=output_dir)
+
+                    # ZIP 파일로 저장 (청크 단위 스트리밍)
+                    received = 0
+                    with os.fdopen(fd, 'wb') as f:
+                        async for chunk in response.content.iter_chunked(1024 * 1024):
+                            f.write(chunk)
+                            received += len(chunk)
+                            if download_callback:
+                                download_callback(received, total)
+
+            os.replace(temp_path, output_path)
+            temp_path = None
+            return True, None
+
+        except aiohttp.ClientConnectionError:
+            return False, "서버에 연결할 수 없습니다. 서버가 실행 중인지 확인하세요."
+        except asyncio.TimeoutError:
+            return False, "요청 시간이 초과되었습니다."
+        except Exception as e:
+            return False, f"Error: {str(e)}"
+
+        finally:
+            if temp_path and os.path.exists(temp_path):
+                try:
+                    os.remove(temp_path)
+                except OSError:
+                    pass
+
+    async def iter_inference(self, image_paths: Iterable[str], timeout: Optional[float] = None,
+                             errors: Optional[Dict[str, str]] = None
+                             ) -> AsyncIterator[Tuple[str, Optional[float], Optional[Image.Image]]]:
+        """
+        여러 이미지를 단일 추론으로 동시에 요청하고, 끝나는 순서대로 결과를 반환하는 비동기 반복자
+
+        동시에 진행되는 요청 수는 max_concurrency로 제한되며, 대기 중인 작업도
+        max_concurrency의 두 배까지만 만들어 입력이 아무리 많아도 메모리 사용량이 일정합니다.
+
+        Args:
+            image_paths: 이미지 파일 경로들 (리스트 또는 제너레이터)
+            timeout: 요청별 타임아웃 (초, None이면 single_timeout)
+            errors: 주어지면 실패한 이미지의 {경로: 에러 메시지}를 기록
+
+        Yields:
+            (이미지 경로, anomaly_score, 결과 이미지) - 실패한 경우 score와 이미지는 None
+        """
+        async def run(path):
+            result_image, anomaly_score, error = await self.inference_single(path, timeout=timeout)
+            return path, result_image, anomaly_score, error
+
+        paths = iter(image_paths)
+        pending = set()
+        max_pending = self.max_concurrency * 2
+
+        try:
+            while True:
+                for path in paths:
+                    pending.add(asyncio.ensure_future(run(path)))
+                    if len(pending) >= max_pending:
+                        break
+
+                if not pending:
+                    return
+
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    path, result_image, anomaly_score, error = task.result()
+                    if error and errors is not None:
+                        errors[path] = error
+                    yield path, anomaly_score, result_image
+        finally:
+            # 반복이 중간에 중단되면 남은 요청 취소
+            for task in pending:
+                task.cancel()
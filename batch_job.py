@@ -0,0 +1,210 @@
+"""
+중단 후 이어서 실행할 수 있는 배치 작업의 진행 기록 (체크포인트 매니페스트)과 재시도 정책
+"""
+import os
+import random
+import re
+import sqlite3
+import threading
+import time
+import zipfile
+from typing import Iterable, Iterator, List, Optional, Sequence, Tuple
+
+# 4xx 응답 중 다시 보내면 성공할 수 있는 상태 코드 (요청 시간 초과, 요청 과다)
+RETRYABLE_CLIENT_STATUS = (408, 429)
+
+_API_ERROR_PATTERN = re.compile(r'API Error: (\d{3})')
+
+
+def backoff_delay(attempt: int, base: float = 1.0, cap: float = 60.0, rng=random) -> float:
+    """
+    재시도 전 대기 시간 (지수 백오프 + full jitter)
+
+    0 ~ min(cap, base * 2^attempt) 사이에서 무작위로 골라, 여러 청크가 동시에 실패해도
+    재시도 요청이 한꺼번에 몰리지 않도록 합니다.
+
+    Args:
+        attempt: 지금까지 실패한 횟수 - 1 (첫 재시도는 0)
+        base: 첫 재시도의 최대 대기 시간 (초)
+        cap: 대기 시간 상한 (초)
+    """
+    return rng.uniform(0, min(cap, base * (2 ** attempt)))
+
+
+def is_retryable_error(error: Optional[str]) -> bool:
+    """
+    클라이언트 에러 메시지로 재시도할 가치가 있는지 판단
+
+    연결 실패, 시간 초과, 5xx 등은 재시도하고, 요청 자체가 잘못된 4xx 응답(408/429 제외)은 재시도하지 않습니다.
+    """
+    if not error:
+        return False
+    match = _API_ERROR_PATTERN.search(error)
+    if match:
+        status = int(match.group(1))
+        return status >= 500 or status in RETRYABLE_CLIENT_STATUS
+    return True
+
+
+class JobManifest:
+    """
+    배치 작업의 이미지 목록과 완료된 청크/점수를 기록하는 매니페스트
+
+    작업 폴더에 SQLite 파일(manifest.sqlite3)과 청크별 결과 ZIP(chunk_00000.zip ...)을 저장합니다.
+    청크 결과 ZIP을 저장한 뒤에 점수를 한 트랜잭션으로 기록하므로, 어느 시점에 중단되어도
+    완료로 기록된 청크는 결과 ZIP과 점수가 모두 남아 있습니다.
+    이미지는 작업을 만들 때의 순서대로 chunk_size개씩 청크로 나누므로 이어서 실행해도 청크 구성이 같습니다.
+    여러 스레드에서 동시에 사용할 수 있습니다.
+
+    사용 예:
+        manifest = JobManifest('result.zip.job')
+        if not manifest.initialized:
+            manifest.initialize(image_paths, chunk_size=100)
+        for index in manifest.pending_chunks():
+            ...
+            manifest.record_chunk(index, [(image_index, score), ...])
+    """
+
+    FILENAME = 'manifest.sqlite3'
+
+    def __init__(self, job_dir: str):
+        """
+        Args:
+            job_dir: 작업 폴더 (없으면 생성)
+        """
+        self.job_dir = job_dir
+        os.makedirs(job_dir, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(os.path.join(job_dir, self.FILENAME), check_same_thread=False)
+        self._db.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+        self._db.execute("CREATE TABLE IF NOT EXISTS images (idx INTEGER PRIMARY KEY, path TEXT NOT NULL)")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS chunks ("
+            "idx INTEGER PRIMARY KEY, attempts INTEGER NOT NULL DEFAULT 0, "
+            "completed_at REAL, last_error TEXT)"
+        )
+        self._db.execute("CREATE TABLE IF NOT EXISTS scores (idx INTEGER PRIMARY KEY, score REAL NOT NULL)")
+        self._db.commit()
+
+        self.chunk_size = 0
+        self.image_count = 0
+        self._load_meta()
+
+    def _load_meta(self):
+        meta = dict(self._db.execute("SELECT key, value FROM meta"))
+        self.chunk_size = int(meta.get('chunk_size', 0))
+        self.image_count = int(meta.get('image_count', 0))
+
+    @property
+    def initialized(self) -> bool:
+        """이미지 목록이 기록된 작업인지 여부"""
+        return self.chunk_size > 0
+
+    @property
+    def chunk_count(self) -> int:
+        if not self.chunk_size:
+            return 0
+        return (self.image_count + self.chunk_size - 1) // self.chunk_size
+
+    def initialize(self, image_paths: Iterable[str], chunk_size: int):
+        """
+        새 작업의 이미지 목록 기록 (입력은 모두 읽어 순서대로 저장)
+
+        Args:
+            image_paths: 이미지 파일 경로 리스트 또는 이터러블
+            chunk_size: 요청 하나에 담을 이미지 수
+        """
+        if chunk_size < 1:
+            raise ValueError("chunk_size는 1 이상이어야 합니다")
+
+        with self._lock:
+            if self.initialized:
+                raise ValueError(f"이미 작업이 기록된 폴더입니다: {self.job_dir}")
+
+            with self._db:
+                self._db.executemany("INSERT INTO images (idx, path) VALUES (?, ?)", enumerate(image_paths))
+                count = self._db.execute("SELECT COUNT(*) FROM images").fetchone()[0]
+                self._db.executemany("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", [
+                    ('chunk_size', str(chunk_size)),
+                    ('image_count', str(count)),
+                    ('created_at', str(time.time())),
+                ])
+            self._load_meta()
+
+    def matches(self, image_paths: Sequence[str]) -> bool:
+        """기록된 이미지 목록이 image_paths와 (순서까지) 같은지 여부"""
+        if len(image_paths) != self.image_count:
+            return False
+        with self._lock:
+            rows = self._db.execute("SELECT path FROM images ORDER BY idx")
+            return all(path == row[0] for path, row in zip(image_paths, rows))
+
+    def image_paths(self) -> List[str]:
+        """기록된 전체 이미지 경로 (작업을 만들 때의 순서)"""
+        with self._lock:
+            return [row[0] for row in self._db.execute("SELECT path FROM images ORDER BY idx")]
+
+    def chunk_images(self, index: int) -> List[str]:
+        """청크 index에 속한 이미지 경로"""
+        start = index * self.chunk_size
+        with self._lock:
+            return [row[0] for row in self._db.execute(
+                "SELECT path FROM images WHERE idx >= ? AND idx < ? ORDER BY idx",
+                (start, start + self.chunk_size))]
+
+    def chunk_zip_path(self, index: int) -> str:
+        return os.path.join(self.job_dir, f"chunk_{index:05d}.zip")
+
+    def completed_chunks(self) -> List[int]:
+        """완료로 기록되고 결과 ZIP이 온전히 남아 있는 청크 번호 (오름차순)"""
+        with self._lock:
+            indices = [row[0] for row in self._db.execute(
+                "SELECT idx FROM chunks WHERE completed_at IS NOT NULL ORDER BY idx")]
+        return [i for i in indices if zipfile.is_zipfile(self.chunk_zip_path(i))]
+
+    def pending_chunks(self) -> List[int]:
+        """아직 완료되지 않은 청크 번호 (오름차순)"""
+        completed = set(self.completed_chunks())
+        return [i for i in range(self.chunk_count) if i not in completed]
+
+    def record_attempt(self, index: int, error: Optional[str] = None):
+        """청크 요청 시도 한 번 기록 (실패한 경우 에러 메시지 포함)"""
+        with self._lock, self._db:
+            self._db.execute(
+                "INSERT INTO chunks (idx, attempts, last_error) VALUES (?, 1, ?) "
+                "ON CONFLICT(idx) DO UPDATE SET attempts = attempts + 1, last_error = excluded.last_error",
+                (index, error))
+
+    def record_chunk(self, index: int, scores: Iterable[Tuple[int, float]]):
+        """
+        청크 완료 기록 (결과 ZIP을 chunk_zip_path(index)에 저장한 뒤 호출)
+
+        Args:
+            index: 청크 번호
+            scores: (이미지 번호, 점수) 목록
+        """
+        with self._lock, self._db:
+            self._db.executemany("INSERT OR REPLACE INTO scores (idx, score) VALUES (?, ?)", scores)
+            self._db.execute(
+                "INSERT INTO chunks (idx, completed_at) VALUES (?, ?) "
+                "ON CONFLICT(idx) DO UPDATE SET completed_at = excluded.completed_at, last_error = NULL",
+                (index, time.time()))
+
+    def chunk_scores(self, index: int) -> List[Tuple[str, float]]:
+        """청크 index의 [(이미지 경로, 점수), ...] (점수가 없는 이미지는 제외)"""
+        start = index * self.chunk_size
+        with self._lock:
+            return list(self._db.execute(
+                "SELECT images.path, scores.score FROM images JOIN scores ON images.idx = scores.idx "
+                "WHERE images.idx >= ? AND images.idx < ? ORDER BY images.idx",
+                (start, start + self.chunk_size)))
+
+    def iter_scores(self) -> Iterator[Tuple[str, float]]:
+        """기록된 전체 (이미지 경로, 점수) (작업을 만들 때의 순서)"""
+        for index in range(self.chunk_count):
+            yield from self.chunk_scores(index)
+
+    def close(self):
+        with self._lock:
+            self._db.close()
@@ -0,0 +1,528 @@
+"""
+VisionADClient 성능 측정 도구 (로컬 대체 서버 사용)
+
+실제 서버 없이 /InferenceVisionAD_Single, /InferenceVisionAD_Batch를 흉내 내는 로컬 서버를 띄우고,
+클라이언트 모드와 이미지 크기별로 처리량(images/s), 요청 지연 시간(p50/p95/p99),
+최대 메모리(peak RSS), 전송량을 측정합니다.
+각 측정은 별도 프로세스에서 실행하므로 peak RSS가 측정 단위별로 분리됩니다.
+
+사용 예:
+    python benchmark.py run --sizes 256,1024,2048 --count 100 --latency 0.02
+    python benchmark.py run --modes chunked,chunked_preprocess --json result.json
+    python benchmark.py serve --port 8000 --latency 0.05      # 대체 서버만 실행 (GUI 테스트용)
+"""
+import argparse
+import csv
+import hashlib
+import io
+import json
+import os
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from PIL import Image
+
+SINGLE_ENDPOINT = '/InferenceVisionAD_Single'
+BATCH_ENDPOINT = '/InferenceVisionAD_Batch'
+
+MODES = ('single', 'single_parallel', 'batch', 'chunked', 'chunked_adaptive', 'chunked_preprocess', 'chunked_cached')
+
+
+# ---------------------------------------------------------------------------
+# 대체 서버
+# ---------------------------------------------------------------------------
+
+def parse_multipart(body: bytes, content_type: str) -> List[Tuple[str, bytes]]:
+    """multipart/form-data 본문에서 [(파일명, 내용), ...] 추출"""
+    match = re.search(r'boundary="?([^";]+)"?', content_type)
+    if not match:
+        return []
+
+    delimiter = b'--' + match.group(1).encode('latin-1')
+    files = []
+    for part in body.split(delimiter)[1:]:
+        if part.startswith(b'--'):
+            break
+        header_end = part.find(b'\r\n\r\n')
+        if header_end < 0:
+            continue
+        headers = part[:header_end].decode('utf-8', 'replace')
+        filename = re.search(r'filename="((?:[^"\\]|\\.)*)"', headers)
+        if filename:
+            files.append((filename.group(1).replace('\\"', '"'), part[header_end + 4:-2]))
+    return files
+
+
+def score_for(content: bytes) -> float:
+    """이미지 내용으로 정해지는 0~1 사이의 점수 (같은 이미지는 항상 같은 점수)"""
+    return int(hashlib.md5(content).hexdigest()[:8], 16) / 0xFFFFFFFF
+
+
+class ServerStats:
+    """대체 서버가 주고받은 요청/바이트 수"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.requests = 0
+            self.images = 0
+            self.bytes_in = 0
+            self.bytes_out = 0
+
+    def add(self, images: int, bytes_in: int, bytes_out: int):
+        with self._lock:
+            self.requests += 1
+            self.images += images
+            self.bytes_in += bytes_in
+            self.bytes_out += bytes_out
+
+    def as_dict(self) -> Dict[str, int]:
+        with self._lock:
+            return {'requests': self.requests, 'images_uploaded': self.images,
+                    'bytes_in': self.bytes_in, 'bytes_out': self.bytes_out}
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'   # keep-alive (커넥션 재사용 측정)
+
+    def log_message(self, format, *args):
+        pass
+
+    def read_body(self) -> bytes:
+        if self.headers.get('Transfer-Encoding', '').lower() == 'chunked':
+            chunks = []
+            while True:
+                size = int(self.rfile.readline().split(b';')[0].strip(), 16)
+                if size == 0:
+                    self.rfile.readline()
+                    return b''.join(chunks)
+                chunks.append(self.rfile.read(size))
+                self.rfile.readline()
+        return self.rfile.read(int(self.headers.get('Content-Length', 0)))
+
+    def send_payload(self, content_type: str, payload: bytes, headers: Optional[Dict[str, str]] = None):
+        self.send_response(200)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(payload)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def do_POST(self):
+        server = self.server
+        body = self.read_body()
+        files = parse_multipart(body, self.headers.get('Content-Type', ''))
+
+        delay = server.latency + server.per_image_latency * len(files)
+        if delay > 0:
+            time.sleep(delay)
+
+        if self.path == SINGLE_ENDPOINT and files:
+            _, content = files[0]
+            payload = server.overlay_png
+            self.send_payload('image/png', payload, {'X-Anomaly-Score': repr(score_for(content))})
+        elif self.path == BATCH_ENDPOINT and files:
+            payload = self.build_batch_zip(files)
+            self.send_payload('application/zip', payload)
+        else:
+            payload = b'{"detail": "Not Found"}'
+            self.send_response(404)
+            self.send_header('Content-Length', str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        server.stats.add(len(files), len(body), len(payload))
+
+    def do_GET(self):
+        # 상태 확인 요청 (EndpointPool.probe)
+        status, payload = (200, b'{"status": "ok"}') if self.path == '/' else (404, b'{"detail": "Not Found"}')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def build_batch_zip(self, files: List[Tuple[str, bytes]]) -> bytes:
+        """실제 서버와 같은 형식 (overlays/<stem>.png + scores.csv)의 결과 ZIP"""
+        buffer = io.BytesIO()
+        text = io.StringIO()
+        writer = csv.writer(text)
+        writer.writerow(('img_path', 'anomaly_score'))
+
+        with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_STORED) as zip_ref:
+            for filename, content in files:
+                stem = os.path.splitext(filename)[0]
+                zip_ref.writestr(f"overlays/{stem}.png", self.server.overlay_png)
+                writer.writerow((f"/data/input/{filename}", repr(score_for(content))))
+            zip_ref.writestr('scores.csv', text.getvalue())
+
+        return buffer.getvalue()
+
+
+class StandInServer(ThreadingHTTPServer):
+    """
+    추론 API 대체 서버 (백그라운드 스레드에서 실행)
+
+    사용 예:
+        with StandInServer(latency=0.02) as server:
+            client = VisionADClient(server.url)
+    """
+
+    daemon_threads = True
+
+    def __init__(self, host: str = '127.0.0.1', port: int = 0, latency: float = 0.0,
+                 per_image_latency: float = 0.0, overlay_size: Tuple[int, int] = (256, 256)):
+        """
+        Args:
+            host: 바인딩 주소
+            port: 포트 (0이면 빈 포트 자동 선택)
+            latency: 요청마다 추가하는 지연 시간 (초, 모델 추론 시간 흉내)
+            per_image_latency: 이미지 한 장당 추가하는 지연 시간 (초)
+            overlay_size: 응답 overlay 이미지 크기 (응답 크기 조절용)
+        """
+        super().__init__((host, port), StandInHandler)
+        self.latency = latency
+        self.per_image_latency = per_image_latency
+        self.stats = ServerStats()
+        self._thread = None
+
+        # 압축이 잘 되지 않는 노이즈 이미지로 응답 크기를 실제 overlay와 비슷하게 유지
+        buffer = io.BytesIO()
+        Image.effect_noise(overlay_size, 64).convert('RGB').save(buffer, 'PNG')
+        self.overlay_png = buffer.getvalue()
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def handle_error(self, request, client_address):
+        # 클라이언트가 제한 시간 초과 등으로 먼저 연결을 끊은 경우는 기록하지 않음
+        if isinstance(sys.exc_info()[1], ConnectionError):
+            return
+        super().handle_error(request, client_address)
+
+    def start(self):
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+
+
+# ---------------------------------------------------------------------------
+# 측정
+# ---------------------------------------------------------------------------
+
+def percentile(sorted_values: Sequence[float], q: float) -> Optional[float]:
+    """정렬된 값의 q 백분위수 (nearest-rank)"""
+    if not sorted_values:
+        return None
+    rank = max(1, -(-len(sorted_values) * q // 100))
+    return sorted_values[int(rank) - 1]
+
+
+def peak_rss_bytes() -> Optional[int]:
+    """
+    현재 프로세스의 최대 RSS (측정할 수 없으면 None)
+
+    Linux의 ru_maxrss는 fork/exec 후에도 부모 프로세스 값이 남으므로 exec 시 초기화되는 VmHWM을 우선 사용합니다.
+    """
+    try:
+        with open('/proc/self/status', encoding='ascii') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def generate_images(directory: str, size: int, count: int) -> List[str]:
+    """size x size 크기의 서로 다른 노이즈 PNG 이미지 count개 생성"""
+    os.makedirs(directory, exist_ok=True)
+    base = Image.merge('RGB', [Image.effect_noise((size, size), sigma) for sigma in (32, 48, 64)])
+    paths = []
+    for i in range(count):
+        path = os.path.join(directory, f"bench_{size}_{i:05d}.png")
+        image = base.copy()
+        image.putpixel((i % size, (i // size) % size), (i % 256, 0, 0))   # 이미지마다 내용(캐시 키)이 다르도록
+        image.save(path, 'PNG', compress_level=1)
+        paths.append(path)
+    return paths
+
+
+def run_case(url: str, mode: str, image_paths: List[str], workers: int, chunk_size: int,
+             preprocess_size: int, cache_dir: Optional[str] = None) -> Dict:
+    """
+    한 가지 클라이언트 모드로 이미지들을 추론하고 측정 결과 반환 (측정 프로세스 안에서 실행)
+
+    지연 시간은 inference_single / inference_batch 호출 단위(청크 모드에서는 청크 단위)로 측정합니다.
+    chunked_cached는 cache_dir에 미리 채워 둔 캐시(warm_cache)를 사용합니다.
+    """
+    from api_client import VisionADClient
+
+    latencies = []
+    lock = threading.Lock()
+
+    class TimedClient(VisionADClient):
+        def inference_single(self, image_path):
+            start = time.perf_counter()
+            result = super().inference_single(image_path)
+            with lock:
+                latencies.append(time.perf_counter() - start)
+            return result
+
+        def inference_batch(self, *args, **kwargs):
+            start = time.perf_counter()
+            result = super().inference_batch(*args, **kwargs)
+            with lock:
+                latencies.append(time.perf_counter() - start)
+            return result
+
+    work_dir = tempfile.mkdtemp(prefix='visionad_bench_')
+    output_path = os.path.join(work_dir, 'result.zip')
+    kwargs = {'pool_maxsize': max(16, workers)}
+
+    if mode == 'chunked_preprocess':
+        from preprocess import Preprocessor
+        kwargs['preprocessor'] = Preprocessor(target_size=(preprocess_size, preprocess_size))
+    elif mode == 'chunked_cached':
+        from result_cache import ResultCache
+        kwargs['cache'] = ResultCache(cache_dir or os.path.join(work_dir, 'cache'))
+
+    client = TimedClient(url, **kwargs)
+    error = None
+
+    try:
+        start = time.perf_counter()
+        if mode == 'single':
+            for path in image_paths:
+                error = client.inference_single(path)[2] or error
+        elif mode == 'single_parallel':
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                for _, _, single_error in executor.map(client.inference_single, image_paths):
+                    error = single_error or error
+        elif mode == 'batch':
+            _, error = client.inference_batch(image_paths, output_path)
+        elif mode in ('chunked', 'chunked_preprocess', 'chunked_cached'):
+            _, error = client.inference_batch_chunked(image_paths, output_path, chunk_size, workers)
+        elif mode == 'chunked_adaptive':
+            from chunk_planner import ChunkPlanner
+            _, error = client.inference_batch_chunked(image_paths, output_path, max_workers=workers,
+                                                      planner=ChunkPlanner())
+        else:
+            raise ValueError(f"알 수 없는 모드입니다: {mode}")
+        elapsed = time.perf_counter() - start
+    finally:
+        client.close()
+        if client.cache:
+            client.cache.close()
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    latencies.sort()
+    return {
+        'mode': mode,
+        'images': len(image_paths),
+        'seconds': elapsed,
+        'images_per_s': len(image_paths) / elapsed if elapsed > 0 else None,
+        'calls': len(latencies),
+        'p50_ms': _ms(percentile(latencies, 50)),
+        'p95_ms': _ms(percentile(latencies, 95)),
+        'p99_ms': _ms(percentile(latencies, 99)),
+        'peak_rss': peak_rss_bytes(),
+        'error': error,
+    }
+
+
+def _ms(seconds: Optional[float]) -> Optional[float]:
+    return None if seconds is None else seconds * 1000
+
+
+def warm_cache(url: str, image_paths: List[str], cache_dir: str, args):
+    """chunked_cached 측정 전에 같은 이미지로 한 번 추론해 캐시를 채움 (측정에서 제외)"""
+    from api_client import VisionADClient
+    from result_cache import ResultCache
+
+    cache = ResultCache(cache_dir)
+    client = VisionADClient(url, cache=cache)
+    output_path = os.path.join(cache_dir, 'warmup.zip')
+    try:
+        client.inference_batch_chunked(image_paths, output_path, args.chunk_size, args.workers)
+    finally:
+        client.close()
+        cache.close()
+        if os.path.exists(output_path):
+            os.remove(output_path)
+
+
+def run_case_subprocess(url: str, mode: str, image_dir: str, args, cache_dir: Optional[str] = None) -> Dict:
+    """run_case를 새 프로세스에서 실행 (peak RSS를 측정 단위별로 분리)"""
+    command = [sys.executable, os.path.abspath(__file__), '_case', '--url', url, '--mode', mode,
+               '--image-dir', image_dir, '--workers', str(args.workers),
+               '--chunk-size', str(args.chunk_size), '--preprocess-size', str(args.preprocess_size)]
+    if cache_dir:
+        command += ['--cache-dir', cache_dir]
+    completed = subprocess.run(command, capture_output=True, text=True)
+    if completed.returncode != 0:
+        return {'mode': mode, 'error': completed.stderr.strip().splitlines()[-1] if completed.stderr else 'failed'}
+    return json.loads(completed.stdout)
+
+
+def format_table(results: List[Dict]) -> str:
+    columns = [('size', 'size', '{}'), ('mode', 'mode', '{}'), ('images', 'images', '{}'),
+               ('img/s', 'images_per_s', '{:.1f}'), ('p50 ms', 'p50_ms', '{:.1f}'),
+               ('p95 ms', 'p95_ms', '{:.1f}'), ('p99 ms', 'p99_ms', '{:.1f}'),
+               ('RSS MB', 'peak_rss', '{:.0f}'), ('up MB', 'bytes_in', '{:.1f}'),
+               ('down MB', 'bytes_out', '{:.1f}'), ('requests', 'requests', '{}')]
+    megabytes = ('peak_rss', 'bytes_in', 'bytes_out')
+
+    rows = [[title for title, _, _ in columns]]
+    for result in results:
+        row = []
+        for _, key, fmt in columns:
+            value = result.get(key)
+            if value is None:
+                row.append('-')
+            else:
+                row.append(fmt.format(value / (1024 * 1024) if key in megabytes else value))
+        if result.get('error'):
+            row.append(f"error: {result['error']}")
+        rows.append(row)
+
+    widths = [max(len(row[i]) for row in rows) for i in range(len(columns))]
+    return '\n'.join('  '.join(cell.rjust(widths[i]) if i < len(widths) else cell for i, cell in enumerate(row))
+                     for row in rows)
+
+
+def run_benchmark(args) -> List[Dict]:
+    sizes = [int(size) for size in args.sizes.split(',')]
+    modes = args.modes.split(',')
+    for mode in modes:
+        if mode not in MODES:
+            raise SystemExit(f"알 수 없는 모드입니다: {mode} (사용 가능: {', '.join(MODES)})")
+
+    results = []
+    work_dir = tempfile.mkdtemp(prefix='visionad_bench_images_')
+    overlay_size = (args.overlay_size, args.overlay_size)
+
+    try:
+        with StandInServer(latency=args.latency, per_image_latency=args.per_image_latency,
+                           overlay_size=overlay_size) as server:
+            for size in sizes:
+                image_dir = os.path.join(work_dir, str(size))
+                image_paths = generate_images(image_dir, size, args.count)
+
+                for mode in modes:
+                    cache_dir = None
+                    if mode == 'chunked_cached':
+                        cache_dir = os.path.join(work_dir, f"cache_{size}")
+                        warm_cache(server.url, image_paths, cache_dir, args)
+
+                    server.stats.reset()
+                    result = run_case_subprocess(server.url, mode, image_dir, args, cache_dir)
+                    result.update(server.stats.as_dict())
+                    result['size'] = size
+                    results.append(result)
+                    print(f"{size}px {mode}: {result.get('images_per_s') or 0:.1f} img/s", file=sys.stderr)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    return results
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog='benchmark.py', description='VisionADClient 성능 측정')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    def add_server_arguments(sub):
+        sub.add_argument('--latency', type=float, default=0.0, help='요청당 서버 지연 시간 (초)')
+        sub.add_argument('--per-image-latency', type=float, default=0.0, help='이미지당 서버 지연 시간 (초)')
+        sub.add_argument('--overlay-size', type=int, default=256, help='응답 overlay 이미지 크기 (px)')
+
+    run = subparsers.add_parser('run', help='측정 실행')
+    add_server_arguments(run)
+    run.add_argument('--sizes', default='256,1024,2048', help='이미지 크기 목록 (px, 쉼표 구분)')
+    run.add_argument('--count', type=int, default=100, help='크기별 이미지 수')
+    run.add_argument('--modes', default=','.join(MODES), help=f"측정할 모드 (쉼표 구분, {', '.join(MODES)})")
+    run.add_argument('--workers', type=int, default=4, help='동시 요청 수 (single_parallel, chunked*)')
+    run.add_argument('--chunk-size', type=int, default=20, help='청크 크기 (chunked*)')
+    run.add_argument('--preprocess-size', type=int, default=512, help='전처리 크기 (chunked_preprocess)')
+    run.add_argument('--json', help='결과를 JSON 파일로 저장')
+
+    serve = subparsers.add_parser('serve', help='대체 서버만 실행')
+    add_server_arguments(serve)
+    serve.add_argument('--host', default='127.0.0.1')
+    serve.add_argument('--port', type=int, default=8000)
+
+    case = subparsers.add_parser('_case')   # 내부용: 측정 프로세스
+    case.add_argument('--url', required=True)
+    case.add_argument('--mode', required=True)
+    case.add_argument('--image-dir', required=True)
+    case.add_argument('--workers', type=int, default=4)
+    case.add_argument('--chunk-size', type=int, default=20)
+    case.add_argument('--preprocess-size', type=int, default=512)
+    case.add_argument('--cache-dir')
+
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+
+    if args.command == '_case':
+        image_paths = sorted(os.path.join(args.image_dir, name) for name in os.listdir(args.image_dir))
+        result = run_case(args.url, args.mode, image_paths, args.workers, args.chunk_size,
+                          args.preprocess_size, args.cache_dir)
+        json.dump(result, sys.stdout)
+        return 0
+
+    if args.command == 'serve':
+        server = StandInServer(args.host, args.port, args.latency, args.per_image_latency,
+                               (args.overlay_size, args.overlay_size))
+        print(f"대체 서버 실행 중: {server.url} (Ctrl+C로 종료)")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
+        return 0
+
+    results = run_benchmark(args)
+    print(format_table(results))
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,236 @@
+"""
+측정한 서버 지연 시간과 요청 크기 예산에 맞춰 배치 청크 크기를 정하는 적응형 플래너
+"""
+import math
+import os
+import threading
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+
+def _file_size(path: str) -> int:
+    try:
+        return os.path.getsize(path)
+    except OSError:
+        # 없는 파일은 업로드할 때 에러로 보고되므로 여기서는 크기 0으로 취급
+        return 0
+
+
+class ChunkPlanner:
+    """
+    배치 추론 청크 크기를 요청 결과에 따라 조절하는 플래너
+
+    - 이미지당 서버 처리 시간(지수 이동 평균)으로 요청 하나가 target_seconds 안에 끝나는 크기까지만 키웁니다.
+    - 요청 본문(원본 파일 크기 합)이 max_request_bytes를 넘지 않도록 청크를 자릅니다.
+    - 같은 크기의 청크를 samples_per_step개 처리할 때마다 처리량(이미지/초)을 비교해,
+      직전 크기보다 min_gain 이상 좋아지면 growth배로 키우고, 그렇지 않으면 직전 크기로 돌아가 고정합니다.
+      고정된 뒤에도 probe_interval번마다 다시 키워 보며 서버 상태 변화에 따라갑니다.
+    - 요청 시간이 초과되면 그 청크 크기의 절반으로 줄이고, 이후에는 실패한 크기보다 작게만 키웁니다.
+    - 요청별 제한 시간은 예상 처리 시간의 timeout_factor배 (min_timeout ~ max_timeout)입니다.
+
+    한 번의 배치 실행에 하나씩 만들어 사용합니다. 여러 스레드에서 동시에 사용할 수 있습니다.
+
+    사용 예:
+        planner = ChunkPlanner(target_seconds=30)
+        client.inference_batch_chunked(image_paths, 'result.zip', planner=planner)
+    """
+
+    def __init__(self, initial_size: int = 16, min_size: int = 1, max_size: int = 1000,
+                 target_seconds: float = 30.0, max_request_bytes: int = 256 * 1024 * 1024,
+                 min_timeout: float = 30.0, max_timeout: float = 300.0, timeout_factor: float = 4.0,
+                 growth: float = 1.5, min_gain: float = 0.05, samples_per_step: int = 2,
+                 probe_interval: int = 10, smoothing: float = 0.3):
+        """
+        Args:
+            initial_size: 처음 보낼 청크 크기 (이미지 수)
+            min_size: 최소 청크 크기
+            max_size: 최대 청크 크기
+            target_seconds: 요청 하나의 목표 처리 시간 (초)
+            max_request_bytes: 요청 하나에 담을 이미지 파일 크기 합 상한 (바이트, 이미지 한 장은 항상 허용)
+            min_timeout: 요청별 제한 시간 하한 (초)
+            max_timeout: 요청별 제한 시간 상한 (초)
+            timeout_factor: 예상 처리 시간 대비 제한 시간 배수
+            growth: 청크를 키울 때의 배수
+            min_gain: 키운 크기를 유지하기 위한 최소 처리량 개선 비율
+            samples_per_step: 크기를 바꾸기 전에 같은 크기로 처리할 청크 수
+            probe_interval: 크기가 고정된 뒤 다시 키워 보기까지 처리할 청크 수
+            smoothing: 이미지당 처리 시간/크기 이동 평균의 새 값 가중치 (0~1)
+        """
+        if not 1 <= min_size <= max_size:
+            raise ValueError("1 <= min_size <= max_size 이어야 합니다")
+
+        self.min_size = min_size
+        self.max_size = max_size
+        self.target_seconds = target_seconds
+        self.max_request_bytes = max_request_bytes
+        self.min_timeout = min_timeout
+        self.max_timeout = max_timeout
+        self.timeout_factor = timeout_factor
+        self.growth = growth
+        self.min_gain = min_gain
+        self.samples_per_step = samples_per_step
+        self.probe_interval = probe_interval
+        self.smoothing = smoothing
+
+        self._lock = threading.Lock()
+        self.size = self._clamp(initial_size)
+        self.seconds_per_image: Optional[float] = None
+        self.bytes_per_image: Optional[float] = None
+        self.timeouts = 0
+
+        self._ceiling = max_size        # 시간 초과가 난 크기보다 작은 상한
+        self._growing = True
+        self._previous_size = None      # 마지막으로 키우기 전 크기
+        self._previous_throughput = None
+        self._stable_samples = 0
+        self._reset_level()
+
+    def _clamp(self, size: int) -> int:
+        return max(self.min_size, min(int(size), self.max_size))
+
+    def _reset_level(self):
+        # 현재 크기로 처리한 청크의 누적 이미지 수/시간 (처리량 비교용)
+        self._level_images = 0
+        self._level_seconds = 0.0
+        self._level_samples = 0
+
+    def _set_size(self, size: int):
+        self.size = self._clamp(min(size, self._ceiling))
+        self._reset_level()
+
+    def chunk_size(self) -> int:
+        """다음 청크에 담을 최대 이미지 수 (목표 처리 시간 기준 상한 적용)"""
+        with self._lock:
+            size = self.size
+            if self.seconds_per_image:
+                size = min(size, int(self.target_seconds / self.seconds_per_image))
+            return self._clamp(size)
+
+    def request_timeout(self, images: int) -> float:
+        """이미지 images장을 담은 요청의 제한 시간 (초, 측정값이 없으면 max_timeout)"""
+        with self._lock:
+            if self.seconds_per_image is None:
+                return self.max_timeout
+            expected = self.seconds_per_image * images
+        return max(self.min_timeout, min(expected * self.timeout_factor, self.max_timeout))
+
+    def iter_chunks(self, image_paths: Iterable[str]) -> Iterator[Tuple[List[str], int]]:
+        """
+        이미지 경로를 현재 계획에 맞는 청크로 묶어 반환
+
+        청크 크기는 청크를 만들 때마다 다시 정하므로 앞선 요청의 결과가 다음 청크에 바로 반영됩니다.
+        입력은 필요한 만큼만 소비합니다.
+
+        Yields:
+            (청크 이미지 경로 리스트, 이미지 파일 크기 합)
+        """
+        it = iter(image_paths)
+        carry = None
+
+        while True:
+            limit = self.chunk_size()
+            chunk = []
+            payload = 0
+
+            while len(chunk) < limit:
+                if carry is not None:
+                    path, size = carry
+                    carry = None
+                else:
+                    path = next(it, None)
+                    if path is None:
+                        break
+                    size = _file_size(path)
+
+                if chunk and payload + size > self.max_request_bytes:
+                    carry = (path, size)
+                    break
+                chunk.append(path)
+                payload += size
+
+            if not chunk:
+                return
+            yield chunk, payload
+
+    def record_success(self, images: int, seconds: float, payload_bytes: Optional[int] = None):
+        """
+        성공한 요청 결과 반영
+
+        Args:
+            images: 요청에 담은 이미지 수
+            seconds: 요청 시작부터 결과 저장까지 걸린 시간 (초)
+            payload_bytes: 요청에 담은 이미지 파일 크기 합 (모르면 None)
+        """
+        if images <= 0 or seconds <= 0:
+            return
+
+        with self._lock:
+            alpha = self.smoothing
+            sample = seconds / images
+            self.seconds_per_image = sample if self.seconds_per_image is None else (
+                alpha * sample + (1 - alpha) * self.seconds_per_image)
+            if payload_bytes is not None:
+                sample = payload_bytes / images
+                self.bytes_per_image = sample if self.bytes_per_image is None else (
+                    alpha * sample + (1 - alpha) * self.bytes_per_image)
+
+            # 크기를 바꾸기 전에 보낸 청크나 마지막 남은 작은 청크는 처리량 비교에서 제외
+            if images != self.size:
+                return
+
+            self._level_images += images
+            self._level_seconds += seconds
+            self._level_samples += 1
+            if self._level_samples < self.samples_per_step:
+                return
+
+            throughput = self._level_images / self._level_seconds
+
+            if not self._growing:
+                self._stable_samples += self._level_samples
+                self._reset_level()
+                if self._stable_samples >= self.probe_interval:
+                    self._grow(throughput)
+                return
+
+            if self._previous_throughput is None or throughput >= self._previous_throughput * (1 + self.min_gain):
+                self._grow(throughput)
+            else:
+                # 키워도 처리량이 좋아지지 않으면 직전 크기로 돌아가 고정
+                self._growing = False
+                self._stable_samples = 0
+                self._set_size(self._previous_size or self.size)
+
+    def _grow(self, throughput: float):
+        next_size = self._clamp(math.ceil(self.size * self.growth))
+        if next_size <= self.size or next_size > self._ceiling:
+            self._growing = False
+            self._stable_samples = 0
+            self._reset_level()
+            return
+
+        self._growing = True
+        self._previous_size = self.size
+        self._previous_throughput = throughput
+        self._set_size(next_size)
+
+    def record_timeout(self, images: int):
+        """요청 시간 초과 반영 (청크를 절반으로 줄이고 그 크기 이상으로는 키우지 않음)"""
+        with self._lock:
+            self.timeouts += 1
+            self._ceiling = max(self.min_size, min(self._ceiling, images - 1))
+            self._growing = False
+            self._stable_samples = 0
+            self._previous_size = None
+            self._previous_throughput = None
+            self._set_size(min(self.size, max(1, images // 2)))
+
+    def state(self) -> dict:
+        """현재 계획 상태 (로그/표시용)"""
+        with self._lock:
+            return {
+                'chunk_size': self.size,
+                'seconds_per_image': self.seconds_per_image,
+                'bytes_per_image': self.bytes_per_image,
+                'timeouts': self.timeouts,
+                'growing': self._growing,
+            }
@@ -0,0 +1,391 @@
+"""
+Vision AD API 명령줄 도구 (GUI 없이 단일/배치 추론과 F1 평가 실행)
+
+customtkinter/Tk를 import하지 않으므로 디스플레이가 없는 서버, cron, 컨테이너에서도 실행할 수 있습니다.
+
+사용 예:
+    python cli.py --url http://localhost:8000 single image.png --overlay result.png
+    python cli.py --url http://localhost:8000 batch --folder ./images --output result.zip --format csv
+    python cli.py batch --folder ./images --output result.zip --job-dir result.job   (중단 후 다시 실행하면 이어서 진행)
+    python cli.py f1 result.zip --labeled-folder ./dataset --threshold 0.68 --min-f1 0.9
+    python cli.py export result.zip --output-dir ./qa --labeled-folder ./dataset --threshold 0.68 --thumbnail-size 256
+"""
+import argparse
+import csv
+import json
+import os
+import sys
+from typing import Dict, List, Optional, Tuple
+
+from api_client import VisionADClient
+from batch_job import JobManifest
+from chunk_planner import ChunkPlanner
+from folder_scan import ABNORMAL, NORMAL, iter_image_files, iter_labeled_images
+
+# 종료 코드
+EXIT_OK = 0
+EXIT_ERROR = 1
+EXIT_CHECK_FAILED = 3   # --min-f1 / --min-auroc 기준 미달
+
+# F1 결과 중 --full이 아니면 출력하지 않는 (이미지 수에 비례해 커지는) 항목
+LARGE_RESULT_KEYS = ('normal_scores', 'abnormal_scores', 'sweep')
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog='cli.py', description='Vision AD API 명령줄 도구')
+    add_common_arguments(parser)
+
+    # 공통 옵션은 하위 명령 뒤에 써도 되도록 하위 명령에도 추가 (지정하지 않으면 앞쪽 값 유지)
+    common = argparse.ArgumentParser(add_help=False, argument_default=argparse.SUPPRESS)
+    add_common_arguments(common, with_defaults=False)
+
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    single = subparsers.add_parser('single', parents=[common], help='단일 이미지 추론')
+    single.add_argument('image', help='이미지 파일 경로')
+    single.add_argument('--overlay', help='결과 overlay 이미지를 저장할 경로')
+
+    batch = subparsers.add_parser('batch', parents=[common], help='배치 추론 (결과 ZIP 저장, 이미지별 점수 출력)')
+    add_image_source_arguments(batch)
+    batch.add_argument('--output', required=True, help='결과 ZIP 파일을 저장할 경로')
+    batch.add_argument('--chunk-size', type=int, default=100, help='요청 하나에 담을 이미지 수 (기본값: 100)')
+    batch.add_argument('--workers', type=int, default=4, help='동시에 보낼 요청 수 (기본값: 4)')
+    batch.add_argument('--adaptive', action='store_true',
+                       help='측정한 서버 처리 시간에 맞춰 청크 크기와 요청 제한 시간을 자동 조절 (--chunk-size는 시작 크기)')
+    batch.add_argument('--target-seconds', type=float, default=30.0,
+                       help='--adaptive 사용 시 요청 하나의 목표 처리 시간 (기본값: 30)')
+    batch.add_argument('--job-dir', help='진행 상황을 기록할 작업 폴더 (중단 후 같은 명령으로 다시 실행하면 이어서 진행, '
+                                         '이미지를 지정하지 않으면 기록된 목록 사용)')
+    batch.add_argument('--retries', type=int, default=5, help='--job-dir 사용 시 청크별 최대 재시도 횟수 (기본값: 5)')
+
+    f1 = subparsers.add_parser('f1', parents=[common], help='배치 추론 결과 ZIP에서 F1 Score 등 성능 지표 계산')
+    f1.add_argument('zip', help='배치 추론 결과 ZIP 파일 경로')
+    add_label_arguments(f1)
+    f1.add_argument('--threshold', type=float, default=0.5, help='이상 판정 임계값 (기본값: 0.5)')
+    f1.add_argument('--full', action='store_true', help='이미지별 점수와 전체 threshold 곡선도 출력 (json)')
+    f1.add_argument('--min-f1', type=float, help='F1 Score가 이 값보다 낮으면 종료 코드 3')
+    f1.add_argument('--min-auroc', type=float, help='AUROC가 이 값보다 낮으면 종료 코드 3')
+
+    export = subparsers.add_parser('export', parents=[common],
+                                   help='배치 추론 결과 ZIP의 overlay를 판정(threshold 초과/이하)과 라벨별 폴더로 추출')
+    export.add_argument('zip', help='배치 추론 결과 ZIP 파일 경로')
+    export.add_argument('--output-dir', required=True,
+                        help='출력 폴더 (above/, below/ 아래에 저장, 라벨을 지정하면 normal/abnormal/unlabeled로도 나눔)')
+    add_label_arguments(export)
+    export.add_argument('--threshold', type=float, default=0.5, help='이상 판정 임계값 (기본값: 0.5)')
+    export.add_argument('--workers', type=int, default=4, help='추출 작업자 수 (기본값: 4)')
+    export.add_argument('--processes', action='store_true',
+                        help='스레드 대신 프로세스로 추출 (--thumbnail-size와 함께 사용하면 유리)')
+    export.add_argument('--thumbnail-size', type=int, metavar='SIZE',
+                        help='thumbnails/ 폴더에 한 변이 SIZE 이하인 JPEG 썸네일도 저장')
+
+    return parser
+
+
+def add_label_arguments(parser: argparse.ArgumentParser):
+    """정상/비정상 이미지 지정 옵션 (collect_labeled_images에서 사용)"""
+    parser.add_argument('--normal', nargs='+', default=[], metavar='IMAGE', help='정상 이미지 경로')
+    parser.add_argument('--abnormal', nargs='+', default=[], metavar='IMAGE', help='비정상 이미지 경로')
+    parser.add_argument('--normal-folder', action='append', default=[], help='정상 이미지 폴더 (하위 폴더 포함)')
+    parser.add_argument('--abnormal-folder', action='append', default=[], help='비정상 이미지 폴더 (하위 폴더 포함)')
+    parser.add_argument('--labeled-folder', action='append', default=[],
+                        help='하위 폴더 이름(normal/abnormal 등)으로 정상/비정상을 구분할 폴더')
+
+
+def add_common_arguments(parser: argparse.ArgumentParser, with_defaults: bool = True):
+    def default(value):
+        return value if with_defaults else argparse.SUPPRESS
+
+    parser.add_argument('--url', default=default(os.environ.get('VISIONAD_URL')),
+                        help='API 서버 주소, 여러 서버는 쉼표로 구분해 나누어 전송 '
+                             '(기본값: 환경 변수 VISIONAD_URL 또는 클라이언트 기본값)')
+    parser.add_argument('--format', choices=('json', 'csv'), default=default('json'), help='출력 형식 (기본값: json)')
+    parser.add_argument('-o', '--out', default=default('-'), help='결과를 저장할 파일 (기본값: 표준 출력)')
+    parser.add_argument('-v', '--verbose', action='store_true', default=default(False),
+                        help='진행 상황을 표준 에러로 출력')
+    parser.add_argument('--cache-dir', default=default(None), help='추론 결과 캐시 디렉터리 (지정하면 캐시 사용)')
+    parser.add_argument('--model-version', default=default('default'), help='결과 캐시의 모델 버전 태그')
+    parser.add_argument('--preprocess', type=int, metavar='SIZE', default=default(None),
+                        help='업로드 전 이미지를 SIZE x SIZE 안으로 축소 후 JPEG로 재인코딩')
+    parser.add_argument('--stats', metavar='FILE', default=default(None),
+                        help='호출 단계별 시간/전송량 통계 저장 (.csv이면 CSV, 그 외 JSON)')
+
+
+def add_image_source_arguments(parser: argparse.ArgumentParser):
+    parser.add_argument('images', nargs='*', help='이미지 파일 경로')
+    parser.add_argument('--folder', action='append', default=[], help='이미지 폴더 (하위 폴더 포함, 여러 번 지정 가능)')
+    parser.add_argument('--list', dest='list_file',
+                        help='이미지 경로 목록 파일 (한 줄에 하나, "-"이면 표준 입력)')
+
+
+def collect_images(args) -> List[str]:
+    """위치 인자, --list, --folder 순서로 이미지 경로 수집"""
+    paths = list(args.images)
+
+    if args.list_file:
+        stream = sys.stdin if args.list_file == '-' else open(args.list_file, encoding='utf-8')
+        try:
+            paths.extend(line.strip() for line in stream if line.strip())
+        finally:
+            if stream is not sys.stdin:
+                stream.close()
+
+    for folder in args.folder:
+        paths.extend(iter_image_files(folder))
+
+    return paths
+
+
+def collect_labeled_images(args) -> Tuple[List[str], List[str], int]:
+    """
+    F1 평가용 정상/비정상 이미지 경로 수집
+
+    Returns:
+        (정상 이미지 리스트, 비정상 이미지 리스트, 라벨을 알 수 없어 제외한 이미지 수)
+    """
+    normal = list(args.normal)
+    abnormal = list(args.abnormal)
+    unlabeled = 0
+
+    for folder in args.normal_folder:
+        normal.extend(iter_image_files(folder))
+    for folder in args.abnormal_folder:
+        abnormal.extend(iter_image_files(folder))
+    for folder in args.labeled_folder:
+        for path, label in iter_labeled_images(folder):
+            if label == NORMAL:
+                normal.append(path)
+            elif label == ABNORMAL:
+                abnormal.append(path)
+            else:
+                unlabeled += 1
+
+    return normal, abnormal, unlabeled
+
+
+def create_client(args) -> VisionADClient:
+    kwargs = {}
+    if args.url:
+        kwargs['base_url'] = args.url
+
+    if args.cache_dir:
+        from result_cache import ResultCache
+        kwargs['cache'] = ResultCache(args.cache_dir, model_version=args.model_version)
+
+    if args.preprocess:
+        from preprocess import Preprocessor
+        kwargs['preprocessor'] = Preprocessor(target_size=(args.preprocess, args.preprocess))
+
+    if args.stats:
+        from instrumentation import Instrumentation
+        kwargs['instrumentation'] = Instrumentation()
+
+    return VisionADClient(**kwargs)
+
+
+def log(args, message: str):
+    if args.verbose:
+        print(message, file=sys.stderr, flush=True)
+
+
+def run_single(client: VisionADClient, args) -> Tuple[Optional[List[Dict]], Optional[str]]:
+    result_image, anomaly_score, error = client.inference_single(args.image)
+    if error:
+        return None, error
+
+    if args.overlay:
+        result_image.save(args.overlay)
+
+    return [{'img_path': args.image, 'anomaly_score': anomaly_score}], None
+
+
+def run_batch(client: VisionADClient, args) -> Tuple[Optional[List[Dict]], Optional[str]]:
+    if args.adaptive and args.job_dir:
+        return None, "--adaptive는 --job-dir과 함께 사용할 수 없습니다 (이어서 실행하려면 청크 구성이 고정되어야 함)"
+
+    image_paths = collect_images(args)
+    if not image_paths and args.job_dir and os.path.isfile(os.path.join(args.job_dir, JobManifest.FILENAME)):
+        manifest = JobManifest(args.job_dir)
+        try:
+            image_paths = manifest.image_paths()
+        finally:
+            manifest.close()
+    if not image_paths:
+        return None, "추론할 이미지가 없습니다"
+    log(args, f"{len(image_paths)}개 이미지 추론 시작")
+
+    # 청크가 끝나는 대로 점수를 모아 전송 순서대로 출력
+    order = {path: i for i, path in enumerate(image_paths)}
+    rows = []
+
+    def on_scores(items):
+        rows.extend(items)
+
+    def on_chunk(done, total):
+        log(args, f"{done}/{total} 청크 완료")
+
+    planner = None
+    if args.adaptive:
+        planner = ChunkPlanner(initial_size=args.chunk_size, target_seconds=args.target_seconds)
+
+    if args.job_dir:
+        success, error = client.inference_batch_resumable(
+            image_paths, args.output,
+            job_dir=args.job_dir,
+            chunk_size=args.chunk_size,
+            max_workers=args.workers,
+            max_retries=args.retries,
+            chunk_callback=on_chunk,
+            scores_callback=on_scores
+        )
+    else:
+        success, error = client.inference_batch_chunked(
+            image_paths, args.output,
+            chunk_size=args.chunk_size,
+            max_workers=args.workers,
+            chunk_callback=on_chunk,
+            scores_callback=on_scores,
+            planner=planner
+        )
+    if planner:
+        state = planner.state()
+        log(args, f"청크 크기 {state['chunk_size']}, 이미지당 처리 시간 {(state['seconds_per_image'] or 0) * 1000:.1f}ms, "
+                  f"시간 초과 {state['timeouts']}회")
+    if not success:
+        return None, error
+
+    rows.sort(key=lambda item: order.get(item[0], len(order)))
+    return [{'img_path': path, 'anomaly_score': score} for path, score in rows], None
+
+
+def run_f1(client: VisionADClient, args) -> Tuple[Optional[Dict], Optional[str]]:
+    normal_images, abnormal_images, unlabeled = collect_labeled_images(args)
+    if not normal_images or not abnormal_images:
+        return None, "정상/비정상 이미지가 각각 하나 이상 필요합니다"
+    log(args, f"정상 {len(normal_images)}개, 비정상 {len(abnormal_images)}개 (라벨 없음 {unlabeled}개 제외)")
+
+    result, error = client.calculate_f1_from_zip(args.zip, normal_images, abnormal_images, args.threshold)
+    if error:
+        return None, error
+
+    result['normal_count'] = len(normal_images)
+    result['abnormal_count'] = len(abnormal_images)
+    result['unlabeled_count'] = unlabeled
+    if not args.full:
+        for key in LARGE_RESULT_KEYS:
+            result.pop(key, None)
+    return result, None
+
+
+def run_export(client: VisionADClient, args) -> Tuple[Optional[Dict], Optional[str]]:
+    normal_images, abnormal_images, unlabeled = collect_labeled_images(args)
+    if normal_images or abnormal_images:
+        log(args, f"정상 {len(normal_images)}개, 비정상 {len(abnormal_images)}개 (라벨 없음 {unlabeled}개 제외)")
+
+    def on_progress(done, total):
+        log(args, f"{done}/{total} overlay 추출")
+
+    result, error = client.export_overlays_from_zip(
+        args.zip, args.output_dir, args.threshold,
+        normal_images=normal_images,
+        abnormal_images=abnormal_images,
+        max_workers=args.workers,
+        use_processes=args.processes,
+        thumbnail_size=args.thumbnail_size,
+        progress_callback=on_progress
+    )
+    if error:
+        return None, error
+
+    for folder, count in sorted(result['folders'].items()):
+        log(args, f"{folder}: {count}개")
+    for message in result['errors']:
+        log(args, f"실패: {message}")
+    if result['failed']:
+        return None, f"overlay {result['failed']}개를 추출하지 못했습니다 (-v로 실패 목록 확인)"
+    return result, None
+
+
+def check_f1_result(result: Dict, args) -> List[str]:
+    """--min-f1 / --min-auroc 기준을 확인해 실패 메시지 리스트 반환"""
+    failures = []
+    if args.min_f1 is not None and result['f1_score'] < args.min_f1:
+        failures.append(f"F1 Score {result['f1_score']:.4f} < {args.min_f1}")
+    if args.min_auroc is not None and result['auroc'] < args.min_auroc:
+        failures.append(f"AUROC {result['auroc']:.4f} < {args.min_auroc}")
+    return failures
+
+
+def write_output(result, args, stream):
+    """결과를 json 또는 csv로 출력 (점수 목록은 행 단위, F1 결과는 항목/값 행)"""
+    if args.format == 'json':
+        json.dump(result, stream, ensure_ascii=False, indent=2)
+        stream.write('\n')
+        return
+
+    writer = csv.writer(stream)
+    if isinstance(result, list):
+        writer.writerow(('img_path', 'anomaly_score'))
+        writer.writerows((row['img_path'], row['anomaly_score']) for row in result)
+    else:
+        writer.writerow(('metric', 'value'))
+        writer.writerows((key, value) for key, value in result.items() if not isinstance(value, (list, dict)))
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+
+    commands = {'single': run_single, 'batch': run_batch, 'f1': run_f1, 'export': run_export}
+
+    client = create_client(args)
+    try:
+        result, error = commands[args.command](client, args)
+    except (OSError, ValueError) as e:
+        result, error = None, str(e)
+    except KeyboardInterrupt:
+        # --job-dir 작업은 완료된 청크까지 기록되어 있으므로 같은 명령으로 이어서 실행 가능
+        result, error = None, "사용자가 중단했습니다"
+    finally:
+        client.close()
+        if client.cache:
+            client.cache.close()
+
+    if len(client.endpoints.endpoints) > 1:
+        for row in client.endpoints.stats():
+            ms = '-' if row['ms_per_image'] is None else f"{row['ms_per_image']:.1f}"
+            log(args, f"{row['url']}: 요청 {row['requests']}, 이미지 {row['images']}, 실패 {row['errors']}, "
+                      f"이미지당 {ms}ms" + (f", 제외됨 ({row['eject_reason']})" if row['eject_reason'] else ""))
+
+    if client.instrumentation:
+        if args.stats.lower().endswith('.csv'):
+            client.instrumentation.export_csv(args.stats)
+        else:
+            client.instrumentation.export_json(args.stats, {'endpoints': client.endpoints.stats()})
+
+    if error:
+        print(f"오류: {error}", file=sys.stderr)
+        return EXIT_ERROR
+
+    if args.out == '-':
+        try:
+            write_output(result, args, sys.stdout)
+            sys.stdout.flush()
+        except BrokenPipeError:
+            # head 등으로 출력을 일부만 읽은 경우
+            sys.stdout = None
+    else:
+        with open(args.out, 'w', encoding='utf-8', newline='') as f:
+            write_output(result, args, f)
+
+    if args.command == 'f1':
+        failures = check_f1_result(result, args)
+        if failures:
+            for failure in failures:
+                print(f"기준 미달: {failure}", file=sys.stderr)
+            return EXIT_CHECK_FAILED
+
+    return EXIT_OK
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,326 @@
+"""
+여러 추론 서버 사이의 요청 분산 (남은 작업량 기준 선택, 상태 확인, 느리거나 실패하는 서버 일시 제외)
+"""
+import statistics
+import threading
+import time
+from collections import deque
+from typing import Dict, List, Optional, Sequence, Union
+
+import requests
+
+
+def parse_endpoints(urls: Union[str, Sequence[str]]) -> List[str]:
+    """
+    서버 주소 목록 정리
+
+    문자열이면 쉼표/공백으로 구분된 여러 주소로 보고 나눕니다. 끝의 '/'는 제거하고 중복은 한 번만 남깁니다.
+    """
+    if isinstance(urls, str):
+        urls = urls.replace(',', ' ').split()
+    result = []
+    for url in urls:
+        url = url.strip().rstrip('/')
+        if url and url not in result:
+            result.append(url)
+    return result
+
+
+class Endpoint:
+    """서버 하나의 진행 중 작업량과 지연 시간/처리량 통계"""
+
+    def __init__(self, url: str):
+        self.url = url
+        self.outstanding = 0              # 진행 중인 요청에 담긴 이미지 수
+        self.outstanding_requests = 0
+        self.seconds_per_image: Optional[float] = None   # 요청 시간/이미지 수의 이동 평균
+        self.probe_seconds: Optional[float] = None       # 상태 확인 응답 시간의 이동 평균
+        self.consecutive_failures = 0
+        self.ejected_until = 0.0
+        self.ejections = 0
+        self.eject_reason: Optional[str] = None
+
+        self.requests = 0
+        self.images = 0
+        self.errors = 0
+        self._recent = deque()            # 최근 완료 (시각, 이미지 수), 처리량 계산용
+
+    def available(self, now: float) -> bool:
+        return now >= self.ejected_until
+
+
+class EndpointLease:
+    """
+    EndpointPool.acquire()로 받은 서버 사용권
+
+    with 블록을 벗어날 때 걸린 시간과 성공 여부를 풀에 기록합니다.
+    블록 안에서 요청 예외(requests.exceptions.RequestException)가 나거나 mark_failed()를 호출하면 실패로 기록합니다.
+    그 밖의 예외(파일 읽기 오류, 중단 요청 등)는 서버 문제가 아니므로 실패로 세지 않습니다.
+    """
+
+    __slots__ = ('_pool', 'endpoint', 'work', '_started', '_failed')
+
+    def __init__(self, pool: 'EndpointPool', endpoint: Endpoint, work: int):
+        self._pool = pool
+        self.endpoint = endpoint
+        self.work = work
+        self._started = time.perf_counter()
+        self._failed = False
+
+    @property
+    def url(self) -> str:
+        return self.endpoint.url
+
+    def mark_failed(self):
+        """서버 문제(5xx 등)로 실패한 요청으로 기록"""
+        self._failed = True
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        failed = self._failed or (exc_type is not None and issubclass(exc_type, requests.exceptions.RequestException))
+        self._pool.release(self, time.perf_counter() - self._started, failed=failed)
+
+
+class EndpointPool:
+    """
+    여러 추론 서버에 요청을 나누어 보내는 풀
+
+    - 요청마다 사용 가능한 서버 중 (진행 중인 이미지 수 + 이번 요청 이미지 수) x 이미지당 처리 시간이
+      가장 작은 서버, 즉 지금 보내면 가장 먼저 끝날 것으로 예상되는 서버를 고릅니다.
+    - 연속 failure_threshold번 실패한 서버는 eject_seconds 동안 제외하고, 다시 제외될 때마다 제외 시간을 두 배로 늘립니다.
+    - 이미지당 처리 시간이 다른 서버들의 중앙값보다 slow_factor배 이상 느린 서버도 같은 방식으로 제외합니다.
+    - 서버가 둘 이상이면 probe_interval초마다 백그라운드에서 health_path로 상태 확인 요청을 보내
+      응답 시간을 기록하고, 연결되지 않는 서버는 실패로 처리합니다 (5xx 외의 HTTP 응답은 정상으로 간주).
+    - 모든 서버가 제외된 경우에는 제외가 가장 먼저 끝나는 서버를 사용합니다.
+    - 연결하지 못한 요청은 acquire(exclude=...)로 아직 시도하지 않은 서버를 받아 다시 보낼 수 있습니다.
+
+    여러 스레드에서 동시에 사용할 수 있습니다.
+
+    사용 예:
+        pool = EndpointPool(['http://gpu1:8000', 'http://gpu2:8000'])
+        with pool.acquire(work=len(image_paths)) as lease:
+            response = session.post(f"{lease.url}/InferenceVisionAD_Batch", ...)
+            if response.status_code >= 500:
+                lease.mark_failed()
+    """
+
+    def __init__(self, urls: Union[str, Sequence[str]], failure_threshold: int = 3,
+                 eject_seconds: float = 30.0, max_eject_seconds: float = 300.0,
+                 slow_factor: float = 3.0, probe_interval: float = 10.0, probe_timeout: float = 5.0,
+                 health_path: str = '/', smoothing: float = 0.3, throughput_window: float = 60.0):
+        """
+        Args:
+            urls: 서버 주소 리스트 또는 쉼표로 구분한 문자열
+            failure_threshold: 제외하기까지의 연속 실패 횟수
+            eject_seconds: 처음 제외할 때의 제외 시간 (초)
+            max_eject_seconds: 제외 시간 상한 (초)
+            slow_factor: 느린 서버로 판단하는 이미지당 처리 시간 배수 (다른 서버 중앙값 기준, 0이면 사용 안 함)
+            probe_interval: 상태 확인 주기 (초, 0이면 상태 확인 안 함)
+            probe_timeout: 상태 확인 요청 제한 시간 (초)
+            health_path: 상태 확인 요청 경로
+            smoothing: 처리 시간 이동 평균의 새 값 가중치 (0~1)
+            throughput_window: 처리량(이미지/초)을 계산할 최근 기간 (초)
+        """
+        self.endpoints = [Endpoint(url) for url in parse_endpoints(urls)]
+        if not self.endpoints:
+            raise ValueError("서버 주소가 하나 이상 필요합니다")
+
+        self.failure_threshold = failure_threshold
+        self.eject_seconds = eject_seconds
+        self.max_eject_seconds = max_eject_seconds
+        self.slow_factor = slow_factor
+        self.probe_interval = probe_interval
+        self.probe_timeout = probe_timeout
+        self.health_path = health_path
+        self.smoothing = smoothing
+        self.throughput_window = throughput_window
+
+        self._lock = threading.Lock()
+        # 상태 확인 스레드와 그 스레드 전용 중지 이벤트 (스레드마다 새로 만들어 이전 스레드의 중지 요청이 지워지지 않게 함)
+        self._probe_thread = None
+        self._probe_stop: Optional[threading.Event] = None
+
+    @property
+    def primary_url(self) -> str:
+        """첫 번째 서버 주소"""
+        return self.endpoints[0].url
+
+    def acquire(self, work: int = 1, exclude: Sequence[Endpoint] = ()) -> EndpointLease:
+        """
+        요청을 보낼 서버 선택 (with 블록으로 사용)
+
+        Args:
+            work: 요청에 담을 이미지 수
+            exclude: 이번 요청에서 이미 실패한 서버 (다른 서버가 남아 있으면 고르지 않음)
+        """
+        self._ensure_probing()
+        now = time.monotonic()
+
+        with self._lock:
+            remaining = [e for e in self.endpoints if e not in exclude] or self.endpoints
+            candidates = [e for e in remaining if e.available(now)]
+            if not candidates:
+                candidates = [min(remaining, key=lambda e: e.ejected_until)]
+
+            known = [e.seconds_per_image for e in candidates if e.seconds_per_image]
+            default = statistics.median(known) if known else 1.0
+
+            def expected_finish(endpoint):
+                return (endpoint.outstanding + work) * (endpoint.seconds_per_image or default)
+
+            endpoint = min(candidates, key=expected_finish)
+            endpoint.outstanding += work
+            endpoint.outstanding_requests += 1
+
+        return EndpointLease(self, endpoint, work)
+
+    def has_alternative(self, tried: Sequence[Endpoint]) -> bool:
+        """tried 외에 요청을 보내 볼 서버가 남아 있는지 여부"""
+        return len(tried) < len(self.endpoints)
+
+    def release(self, lease: EndpointLease, seconds: float, failed: bool = False):
+        """acquire()로 받은 서버의 요청 결과 기록 (EndpointLease가 호출)"""
+        endpoint = lease.endpoint
+        now = time.monotonic()
+
+        with self._lock:
+            endpoint.outstanding -= lease.work
+            endpoint.outstanding_requests -= 1
+            endpoint.requests += 1
+
+            if failed:
+                endpoint.errors += 1
+                self._record_failure(endpoint, now, "요청 실패")
+                return
+
+            endpoint.consecutive_failures = 0
+            endpoint.images += lease.work
+            endpoint._recent.append((now, lease.work))
+            self._prune_recent(endpoint, now)
+
+            if lease.work > 0 and seconds > 0:
+                sample = seconds / lease.work
+                if endpoint.seconds_per_image is None:
+                    endpoint.seconds_per_image = sample
+                else:
+                    endpoint.seconds_per_image = (self.smoothing * sample
+                                                  + (1 - self.smoothing) * endpoint.seconds_per_image)
+                self._check_slow(endpoint, now)
+
+    def _prune_recent(self, endpoint: Endpoint, now: float):
+        recent = endpoint._recent
+        while recent and recent[0][0] < now - self.throughput_window:
+            recent.popleft()
+
+    def _record_failure(self, endpoint: Endpoint, now: float, reason: str):
+        endpoint.consecutive_failures += 1
+        if endpoint.consecutive_failures >= self.failure_threshold:
+            self._eject(endpoint, now, f"{reason} {endpoint.consecutive_failures}회 연속")
+
+    def _check_slow(self, endpoint: Endpoint, now: float):
+        if not self.slow_factor:
+            return
+        others = [e.seconds_per_image for e in self.endpoints
+                  if e is not endpoint and e.seconds_per_image and e.available(now)]
+        if not others:
+            return
+        median = statistics.median(others)
+        if endpoint.seconds_per_image > median * self.slow_factor:
+            self._eject(endpoint, now, f"느림 (이미지당 {endpoint.seconds_per_image * 1000:.0f}ms, "
+                                       f"다른 서버 {median * 1000:.0f}ms)")
+            # 돌아왔을 때 이전의 느린 측정값으로 바로 다시 제외되지 않도록 초기화
+            endpoint.seconds_per_image = None
+
+    def _eject(self, endpoint: Endpoint, now: float, reason: str):
+        if not endpoint.available(now):
+            return
+        # 사용 가능한 마지막 서버는 제외하지 않음
+        if not any(e.available(now) for e in self.endpoints if e is not endpoint):
+            return
+        duration = min(self.eject_seconds * (2 ** endpoint.ejections), self.max_eject_seconds)
+        endpoint.ejected_until = now + duration
+        endpoint.ejections += 1
+        endpoint.consecutive_failures = 0
+        endpoint.eject_reason = reason
+
+    def probe(self, stop_event: Optional[threading.Event] = None):
+        """모든 서버에 상태 확인 요청을 한 번씩 보내고 결과 기록 (stop_event가 set되면 남은 서버는 건너뜀)"""
+        for endpoint in self.endpoints:
+            if stop_event is not None and stop_event.is_set():
+                return
+            start = time.perf_counter()
+            try:
+                response = requests.get(endpoint.url + self.health_path, timeout=self.probe_timeout)
+                response.close()
+                healthy = response.status_code < 500
+            except requests.exceptions.RequestException:
+                healthy = False
+            seconds = time.perf_counter() - start
+            now = time.monotonic()
+
+            with self._lock:
+                if not healthy:
+                    self._record_failure(endpoint, now, "상태 확인 실패")
+                    continue
+                endpoint.consecutive_failures = 0
+                if endpoint.probe_seconds is None:
+                    endpoint.probe_seconds = seconds
+                else:
+                    endpoint.probe_seconds = self.smoothing * seconds + (1 - self.smoothing) * endpoint.probe_seconds
+
+    def _ensure_probing(self):
+        if self._probe_thread is not None or len(self.endpoints) < 2 or not self.probe_interval:
+            return
+        with self._lock:
+            if self._probe_thread is None:
+                self._probe_stop = threading.Event()
+                self._probe_thread = threading.Thread(target=self._probe_loop, args=(self._probe_stop,), daemon=True)
+                self._probe_thread.start()
+
+    def _probe_loop(self, stop_event: threading.Event):
+        while not stop_event.wait(self.probe_interval):
+            self.probe(stop_event)
+
+    def close(self):
+        """
+        상태 확인 스레드 중지 (다시 acquire하면 새로 시작)
+
+        진행 중인 상태 확인 요청은 최대 probe_timeout초까지 기다립니다.
+        """
+        with self._lock:
+            thread, self._probe_thread = self._probe_thread, None
+            stop_event, self._probe_stop = self._probe_stop, None
+        if thread is not None:
+            stop_event.set()
+            thread.join(timeout=self.probe_timeout)
+
+    def stats(self) -> List[Dict]:
+        """
+        서버별 통계
+
+        Returns:
+            [{'url', 'available', 'eject_reason', 'ejected_for_s', 'outstanding', 'requests', 'images',
+              'errors', 'ms_per_image', 'probe_ms', 'images_per_s'}, ...]
+        """
+        now = time.monotonic()
+        rows = []
+        with self._lock:
+            for endpoint in self.endpoints:
+                self._prune_recent(endpoint, now)
+                available = endpoint.available(now)
+                rows.append({
+                    'url': endpoint.url,
+                    'available': available,
+                    'eject_reason': None if available else endpoint.eject_reason,
+                    'ejected_for_s': 0.0 if available else endpoint.ejected_until - now,
+                    'outstanding': endpoint.outstanding,
+                    'requests': endpoint.requests,
+                    'images': endpoint.images,
+                    'errors': endpoint.errors,
+                    'ms_per_image': None if endpoint.seconds_per_image is None else endpoint.seconds_per_image * 1000,
+                    'probe_ms': None if endpoint.probe_seconds is None else endpoint.probe_seconds * 1000,
+                    'images_per_s': sum(n for _, n in endpoint._recent) / self.throughput_window,
+                })
+        return rows
@@ -0,0 +1,105 @@
+"""
+폴더 단위 이미지 수집 (하위 폴더를 지연 탐색하는 제너레이터)
+"""
+import os
+from itertools import islice
+from typing import Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from preprocess import CONTENT_TYPES
+
+# 기본으로 수집하는 이미지 확장자
+IMAGE_EXTENSIONS = tuple(CONTENT_TYPES)
+
+# 하위 폴더 이름으로 라벨을 정할 때 사용하는 기본 이름 (대소문자 무시)
+NORMAL_DIR_NAMES = ('normal', 'good', 'ok', '정상')
+ABNORMAL_DIR_NAMES = ('abnormal', 'anomaly', 'defect', 'bad', 'ng', '비정상')
+
+NORMAL = 'normal'
+ABNORMAL = 'abnormal'
+
+
+def iter_image_files(root: str, extensions: Sequence[str] = IMAGE_EXTENSIONS,
+                     recursive: bool = True) -> Iterator[str]:
+    """
+    폴더 아래의 이미지 파일 경로를 찾는 대로 하나씩 반환
+
+    os.scandir로 폴더를 하나씩 읽으므로 전체 트리를 미리 나열하지 않고,
+    첫 번째 파일은 탐색을 시작하자마자 받을 수 있습니다.
+    폴더 안에서는 이름순으로, 하위 폴더는 파일 다음에 이름순으로 탐색합니다.
+    읽을 수 없는 폴더와 심볼릭 링크 폴더는 건너뜁니다.
+
+    Args:
+        root: 탐색할 폴더
+        extensions: 수집할 확장자 (소문자, 점 포함)
+        recursive: False이면 root 바로 아래 파일만 수집
+
+    Yields:
+        이미지 파일 경로
+    """
+    extensions = tuple(ext.lower() for ext in extensions)
+    stack = [root]
+
+    while stack:
+        directory = stack.pop()
+        try:
+            with os.scandir(directory) as it:
+                entries = sorted(it, key=lambda e: e.name)
+        except OSError:
+            continue
+
+        subdirs = []
+        for entry in entries:
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    if recursive:
+                        subdirs.append(entry.path)
+                elif entry.name.lower().endswith(extensions) and entry.is_file():
+                    yield entry.path
+            except OSError:
+                continue
+
+        # 스택이므로 역순으로 넣어야 이름순으로 탐색
+        stack.extend(reversed(subdirs))
+
+
+def label_for_path(path: str, root: str, normal_names: Sequence[str] = NORMAL_DIR_NAMES,
+                   abnormal_names: Sequence[str] = ABNORMAL_DIR_NAMES) -> Optional[str]:
+    """
+    root 기준 상위 폴더 이름으로 정상/비정상 라벨 결정
+
+    파일에 가장 가까운 폴더부터 확인하므로 'lot1/abnormal/scratch/a.png'는 비정상이 됩니다.
+
+    Returns:
+        NORMAL, ABNORMAL 또는 None (일치하는 폴더 이름이 없는 경우)
+    """
+    normal_names = {name.lower() for name in normal_names}
+    abnormal_names = {name.lower() for name in abnormal_names}
+
+    relative_dir = os.path.dirname(os.path.relpath(path, root))
+    for part in reversed(relative_dir.replace('\\', '/').split('/')):
+        part = part.lower()
+        if part in abnormal_names:
+            return ABNORMAL
+        if part in normal_names:
+            return NORMAL
+    return None
+
+
+def iter_labeled_images(root: str, extensions: Sequence[str] = IMAGE_EXTENSIONS,
+                        normal_names: Sequence[str] = NORMAL_DIR_NAMES,
+                        abnormal_names: Sequence[str] = ABNORMAL_DIR_NAMES) -> Iterator[Tuple[str, Optional[str]]]:
+    """
+    폴더 아래 이미지를 (경로, 라벨)로 반환 (라벨은 label_for_path 참고)
+    """
+    for path in iter_image_files(root, extensions):
+        yield path, label_for_path(path, root, normal_names, abnormal_names)
+
+
+def iter_chunks(items: Iterable, size: int) -> Iterator[List]:
+    """이터러블을 최대 size개씩 리스트로 묶어 반환 (입력은 필요한 만큼만 소비)"""
+    it = iter(items)
+    while True:
+        chunk = list(islice(it, size))
+        if not chunk:
+            return
+        yield chunk
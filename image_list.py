@@ -0,0 +1,188 @@
+"""
+대량의 이미지 경로를 표시하는 가상화 리스트 (보이는 행만 그림)
+"""
+import os
+import tkinter as tk
+from array import array
+from typing import List, Optional, Sequence, Tuple
+
+import customtkinter as ctk
+
+
+class ImageListModel:
+    """
+    이미지 경로 리스트의 표시용 인덱스
+
+    화면에 표시할 파일명을 미리 계산해 두고, 필터가 있으면 일치하는 행 번호만 array('l')에 보관합니다.
+    sync()는 같은 리스트에 경로가 추가된 경우 새로 추가된 부분만 인덱싱하므로
+    선택을 여러 번 반복해도 전체를 다시 만들지 않습니다.
+    """
+
+    def __init__(self):
+        self._paths: Sequence[str] = []
+        self._names: List[str] = []
+        self._filter = ''
+        self._visible: Optional[array] = None   # 필터 일치 행 번호 (필터가 없으면 None)
+
+    def sync(self, paths: Sequence[str]):
+        """
+        경로 리스트와 인덱스 동기화
+
+        같은 리스트 객체에 뒤쪽으로만 추가되었으면 추가된 행만 처리하고,
+        다른 리스트이거나 줄어든 경우에는 처음부터 다시 만듭니다.
+        """
+        if paths is not self._paths or len(paths) < len(self._names):
+            self._paths = paths
+            self._names = []
+            self._visible = array('l') if self._filter else None
+
+        start = len(self._names)
+        new_names = [os.path.basename(p) for p in paths[start:]]
+        self._names.extend(new_names)
+
+        if self._visible is not None:
+            needle = self._filter
+            self._visible.extend(i for i, name in enumerate(new_names, start) if needle in name.lower())
+
+    def set_filter(self, text: str):
+        """파일명 필터 설정 (대소문자 무시, 빈 문자열이면 해제)"""
+        text = text.strip().lower()
+        if text == self._filter:
+            return
+        self._filter = text
+        if not text:
+            self._visible = None
+        else:
+            self._visible = array('l', (i for i, name in enumerate(self._names) if text in name.lower()))
+
+    @property
+    def total(self) -> int:
+        """전체 행 수"""
+        return len(self._names)
+
+    def __len__(self) -> int:
+        """표시되는 (필터 일치) 행 수"""
+        return len(self._names) if self._visible is None else len(self._visible)
+
+    def row(self, index: int) -> Tuple[int, str, str]:
+        """표시 순서 index의 (1부터 시작하는 원래 번호, 파일명, 경로)"""
+        i = index if self._visible is None else self._visible[index]
+        return i + 1, self._names[i], self._paths[i]
+
+
+class VirtualImageList(ctk.CTkFrame):
+    """
+    ImageListModel을 표시하는 가상화 리스트 위젯
+
+    Canvas에 화면에 보이는 행 수만큼의 텍스트 항목만 만들어 두고,
+    스크롤하면 그 항목들의 내용만 바꿉니다. 경로가 10만 개 이상이어도 그리기 비용이 일정합니다.
+    """
+
+    ROW_HEIGHT = 20
+
+    def __init__(self, master, summary_format: Optional[str] = None, height: int = 200, **kwargs):
+        """
+        Args:
+            master: 부모 위젯
+            summary_format: 상단 요약 문구 ({total} 치환, 예: "총 {total}개의 정상 이미지", None이면 생략)
+            height: 리스트 높이 (px)
+        """
+        super().__init__(master, **kwargs)
+        self.model = ImageListModel()
+        self.summary_format = summary_format
+        self._top = 0
+        self._items = []
+
+        header = ctk.CTkFrame(self, fg_color="transparent")
+        header.pack(fill="x", padx=5, pady=(5, 0))
+
+        self.summary_label = ctk.CTkLabel(header, text="", font=("Arial", 12))
+        self.summary_label.pack(side="left")
+
+        self.filter_entry = ctk.CTkEntry(header, width=160, placeholder_text="파일명 필터")
+        self.filter_entry.pack(side="right")
+        self.filter_entry.bind("<KeyRelease>", lambda e: self.apply_filter())
+
+        body = ctk.CTkFrame(self, fg_color="transparent")
+        body.pack(fill="both", expand=True, padx=5, pady=5)
+
+        self.scrollbar = ctk.CTkScrollbar(body, command=self._on_scrollbar)
+        self.scrollbar.pack(side="right", fill="y")
+
+        self.canvas = tk.Canvas(body, height=height, highlightthickness=0, borderwidth=0,
+                                bg=self._apply_appearance_mode(ctk.ThemeManager.theme["CTkTextbox"]["fg_color"]))
+        self.canvas.pack(side="left", fill="both", expand=True)
+        self._text_color = self._apply_appearance_mode(ctk.ThemeManager.theme["CTkTextbox"]["text_color"])
+
+        self.canvas.bind("<Configure>", lambda e: self.render())
+        for widget in (self.canvas, body):
+            widget.bind("<MouseWheel>", self._on_mousewheel)
+            widget.bind("<Button-4>", lambda e: self.scroll_rows(-3))
+            widget.bind("<Button-5>", lambda e: self.scroll_rows(3))
+
+        self.render()
+
+    def set_paths(self, paths: Sequence[str]):
+        """표시할 경로 리스트 지정 (같은 리스트에 추가된 경우 추가분만 반영)"""
+        self.model.sync(paths)
+        self.render()
+
+    def apply_filter(self):
+        self.model.set_filter(self.filter_entry.get())
+        self._top = 0
+        self.render()
+
+    def visible_rows(self) -> int:
+        return max(1, self.canvas.winfo_height() // self.ROW_HEIGHT)
+
+    def scroll_rows(self, delta: int):
+        self._top += delta
+        self.render()
+
+    def _on_mousewheel(self, event):
+        # Windows는 한 칸에 120, macOS는 1 단위
+        step = event.delta // 120 if abs(event.delta) >= 120 else event.delta
+        self.scroll_rows(-3 * step)
+
+    def _on_scrollbar(self, action, value, unit=None):
+        if action == "moveto":
+            self._top = int(float(value) * len(self.model))
+        elif action == "scroll":
+            rows = self.visible_rows() if unit == "pages" else 1
+            self._top += int(value) * rows
+        self.render()
+
+    def render(self):
+        """현재 스크롤 위치에서 보이는 행만 다시 그림"""
+        count = len(self.model)
+        rows = self.visible_rows()
+        self._top = max(0, min(self._top, count - rows))
+
+        # 창 크기에 맞게 텍스트 항목 수 조정
+        while len(self._items) < rows:
+            y = len(self._items) * self.ROW_HEIGHT + 2
+            self._items.append(self.canvas.create_text(6, y, anchor="nw", fill=self._text_color,
+                                                       font=("Arial", 12)))
+        while len(self._items) > rows:
+            self.canvas.delete(self._items.pop())
+
+        for offset, item in enumerate(self._items):
+            index = self._top + offset
+            if index < count:
+                number, name, _ = self.model.row(index)
+                self.canvas.itemconfigure(item, text=f"{number}. {name}")
+            else:
+                self.canvas.itemconfigure(item, text="")
+
+        if count:
+            self.scrollbar.set(self._top / count, min(1.0, (self._top + rows) / count))
+        else:
+            self.scrollbar.set(0.0, 1.0)
+
+        if self.summary_format:
+            summary = self.summary_format.format(total=self.model.total)
+        else:
+            summary = f"{self.model.total}개"
+        if count != self.model.total:
+            summary += f" (필터: {count}개)"
+        self.summary_label.configure(text=summary)
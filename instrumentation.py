@@ -0,0 +1,321 @@
+"""
+클라이언트 호출의 단계별 시간/전송량 계측과 지연 시간 히스토그램
+"""
+import bisect
+import csv
+import json
+import threading
+import time
+from array import array
+from collections import deque
+from typing import Dict, List, Optional
+
+# 히스토그램 구간 경계 (초): 0.1ms부터 25%씩 증가해 약 20분까지 (백분위수 상대 오차 약 12% 이내)
+BUCKET_BOUNDS = []
+_bound = 0.0001
+while _bound < 1200:
+    BUCKET_BOUNDS.append(_bound)
+    _bound *= 1.25
+del _bound
+
+TOTAL = 'total'   # 호출 전체 시간을 기록하는 단계 이름
+
+
+class LatencyHistogram:
+    """
+    로그 간격 구간으로 지연 시간을 세는 히스토그램
+
+    값 하나를 기록할 때 구간 카운트 하나만 늘리므로 메모리 사용량이 기록 수와 무관합니다.
+    백분위수는 해당 구간의 기하 중간값(관측 최솟값~최댓값 범위 안)으로 근사합니다.
+    """
+
+    def __init__(self):
+        self.counts = array('l', [0] * (len(BUCKET_BOUNDS) + 1))
+        self.count = 0
+        self.total = 0.0
+        self.min = None
+        self.max = None
+
+    def record(self, seconds: float):
+        self.counts[bisect.bisect_left(BUCKET_BOUNDS, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        if self.min is None or seconds < self.min:
+            self.min = seconds
+        if self.max is None or seconds > self.max:
+            self.max = seconds
+
+    def merge(self, other: 'LatencyHistogram'):
+        for i, n in enumerate(other.counts):
+            if n:
+                self.counts[i] += n
+        self.count += other.count
+        self.total += other.total
+        if other.min is not None and (self.min is None or other.min < self.min):
+            self.min = other.min
+        if other.max is not None and (self.max is None or other.max > self.max):
+            self.max = other.max
+
+    def percentile(self, q: float) -> Optional[float]:
+        """q 백분위수 근사값 (초, 기록이 없으면 None)"""
+        if not self.count:
+            return None
+        rank = max(1, -(-self.count * q // 100))
+        seen = 0
+        for i, n in enumerate(self.counts):
+            seen += n
+            if seen >= rank:
+                lower = BUCKET_BOUNDS[i - 1] if i > 0 else self.min
+                upper = BUCKET_BOUNDS[i] if i < len(BUCKET_BOUNDS) else self.max
+                return min(max((lower * upper) ** 0.5, self.min), self.max)
+        return self.max
+
+    def summary(self) -> Dict[str, Optional[float]]:
+        """count, mean/p50/p95/p99/max (ms)"""
+        def ms(value):
+            return None if value is None else value * 1000
+
+        return {
+            'count': self.count,
+            'mean_ms': ms(self.total / self.count) if self.count else None,
+            'p50_ms': ms(self.percentile(50)),
+            'p95_ms': ms(self.percentile(95)),
+            'p99_ms': ms(self.percentile(99)),
+            'max_ms': ms(self.max),
+        }
+
+
+class RollingHistogram:
+    """
+    최근 window초 동안의 기록만 반영하는 히스토그램
+
+    window를 slots개의 시간 구간으로 나누어 구간별 히스토그램을 두고,
+    오래된 구간은 다시 사용할 때 비웁니다.
+    """
+
+    def __init__(self, window: float = 300.0, slots: int = 10):
+        self.slot_seconds = window / slots
+        self._histograms = [LatencyHistogram() for _ in range(slots)]
+        self._slot_ids = [-1] * slots
+
+    def record(self, seconds: float, now: float):
+        slot_id = int(now // self.slot_seconds)
+        index = slot_id % len(self._histograms)
+        if self._slot_ids[index] != slot_id:
+            self._histograms[index] = LatencyHistogram()
+            self._slot_ids[index] = slot_id
+        self._histograms[index].record(seconds)
+
+    def snapshot(self, now: float) -> LatencyHistogram:
+        """현재 window 안의 구간을 합친 히스토그램"""
+        current = int(now // self.slot_seconds)
+        merged = LatencyHistogram()
+        for slot_id, histogram in zip(self._slot_ids, self._histograms):
+            if current - len(self._histograms) < slot_id <= current:
+                merged.merge(histogram)
+        return merged
+
+
+class CallTimer:
+    """
+    호출 한 번의 단계별 시간 측정
+
+    mark(단계)를 호출하면 이전 mark(또는 시작) 이후 지난 시간을 그 단계에 더합니다.
+    finish()로 끝내면 Instrumentation에 기록됩니다.
+    """
+
+    __slots__ = ('_recorder', 'kind', 'started', '_last', 'phases', 'bytes_up', 'bytes_down', 'images')
+
+    def __init__(self, recorder: 'Instrumentation', kind: str, images: int = 1):
+        self._recorder = recorder
+        self.kind = kind
+        self.started = time.perf_counter()
+        self._last = self.started
+        self.phases: Dict[str, float] = {}
+        self.bytes_up = 0
+        self.bytes_down = 0
+        self.images = images
+
+    def mark(self, phase: str):
+        now = time.perf_counter()
+        self.phases[phase] = self.phases.get(phase, 0.0) + (now - self._last)
+        self._last = now
+
+    def add_bytes(self, up: int = 0, down: int = 0):
+        self.bytes_up += up
+        self.bytes_down += down
+
+    def add_images(self, count: int):
+        self.images += count
+
+    def finish(self, error: Optional[str] = None):
+        self._recorder.record_call(self, time.perf_counter() - self.started, error)
+
+
+class _NullTimer:
+    """계측을 사용하지 않을 때의 타이머 (아무것도 기록하지 않음)"""
+
+    __slots__ = ()
+
+    def mark(self, phase: str):
+        pass
+
+    def add_bytes(self, up: int = 0, down: int = 0):
+        pass
+
+    def add_images(self, count: int):
+        pass
+
+    def finish(self, error: Optional[str] = None):
+        pass
+
+
+NULL_TIMER = _NullTimer()
+
+
+class Instrumentation:
+    """
+    클라이언트 호출 계측 기록기
+
+    호출 종류(single, batch, chunked 등)와 단계(prepare, upload, server, download, decode 등)별로
+    전체 누적 히스토그램과 최근 window초 히스토그램을 유지하고, 최근 호출 기록은 max_records개까지 보관합니다.
+    여러 스레드에서 동시에 사용할 수 있습니다.
+
+    사용 예:
+        instrumentation = Instrumentation()
+        client = VisionADClient(url, instrumentation=instrumentation)
+        ...
+        print(instrumentation.summary())
+        instrumentation.export_json('stats.json')
+    """
+
+    def __init__(self, window: float = 300.0, max_records: int = 1000):
+        """
+        Args:
+            window: 최근 지연 시간 히스토그램의 기간 (초)
+            max_records: 보관할 최근 호출 기록 수
+        """
+        self.window = window
+        self.max_records = max_records
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """모든 기록 삭제"""
+        with self._lock:
+            self._totals: Dict[tuple, LatencyHistogram] = {}
+            self._rolling: Dict[tuple, RollingHistogram] = {}
+            self._counters: Dict[str, Dict[str, int]] = {}
+            self._records = deque(maxlen=self.max_records)
+
+    def start(self, kind: str, images: int = 1) -> CallTimer:
+        """호출 측정 시작"""
+        return CallTimer(self, kind, images)
+
+    def record_call(self, timer: CallTimer, elapsed: float, error: Optional[str] = None):
+        now = time.time()
+        phases = dict(timer.phases)
+        phases[TOTAL] = elapsed
+
+        with self._lock:
+            for phase, seconds in phases.items():
+                key = (timer.kind, phase)
+                if key not in self._totals:
+                    self._totals[key] = LatencyHistogram()
+                    self._rolling[key] = RollingHistogram(self.window)
+                self._totals[key].record(seconds)
+                self._rolling[key].record(seconds, now)
+
+            counters = self._counters.setdefault(
+                timer.kind, {'calls': 0, 'errors': 0, 'images': 0, 'bytes_up': 0, 'bytes_down': 0})
+            counters['calls'] += 1
+            counters['errors'] += 1 if error else 0
+            counters['images'] += timer.images
+            counters['bytes_up'] += timer.bytes_up
+            counters['bytes_down'] += timer.bytes_down
+
+            self._records.append({
+                'time': now,
+                'kind': timer.kind,
+                'images': timer.images,
+                'bytes_up': timer.bytes_up,
+                'bytes_down': timer.bytes_down,
+                'error': error,
+                'phases_ms': {phase: seconds * 1000 for phase, seconds in phases.items()},
+            })
+
+    def summary(self, recent: bool = False) -> Dict[str, Dict]:
+        """
+        호출 종류별 통계
+
+        Args:
+            recent: True이면 최근 window초 기록만으로 지연 시간 통계 계산
+
+        Returns:
+            {종류: {'calls', 'errors', 'images', 'bytes_up', 'bytes_down',
+                    'phases': {단계: {'count', 'mean_ms', 'p50_ms', 'p95_ms', 'p99_ms', 'max_ms'}}}}
+        """
+        now = time.time()
+        with self._lock:
+            result = {kind: dict(counters, phases={}) for kind, counters in self._counters.items()}
+            for (kind, phase), histogram in self._totals.items():
+                if recent:
+                    histogram = self._rolling[(kind, phase)].snapshot(now)
+                result[kind]['phases'][phase] = histogram.summary()
+        return result
+
+    def histogram(self, kind: str, phase: str = TOTAL, recent: bool = False) -> Optional[LatencyHistogram]:
+        """(종류, 단계)의 히스토그램 복사본 (기록이 없으면 None)"""
+        with self._lock:
+            if (kind, phase) not in self._totals:
+                return None
+            if recent:
+                return self._rolling[(kind, phase)].snapshot(time.time())
+            histogram = LatencyHistogram()
+            histogram.merge(self._totals[(kind, phase)])
+            return histogram
+
+    def records(self) -> List[Dict]:
+        """최근 호출 기록 (오래된 순)"""
+        with self._lock:
+            return list(self._records)
+
+    def summary_rows(self, recent: bool = False) -> List[Dict]:
+        """summary()를 (종류, 단계) 한 행씩 펼친 리스트 (CSV/표 출력용)"""
+        rows = []
+        for kind, stats in sorted(self.summary(recent).items()):
+            for phase, phase_stats in stats['phases'].items():
+                row = {'kind': kind, 'phase': phase}
+                row.update(phase_stats)
+                if phase == TOTAL:
+                    row.update(calls=stats['calls'], errors=stats['errors'], images=stats['images'],
+                               bytes_up=stats['bytes_up'], bytes_down=stats['bytes_down'])
+                rows.append(row)
+        return rows
+
+    def export_json(self, path: str, extra: Optional[Dict] = None):
+        """
+        전체/최근 통계와 최근 호출 기록을 JSON으로 저장
+
+        Args:
+            path: 저장할 파일 경로
+            extra: 함께 저장할 항목 (예: {'endpoints': EndpointPool.stats()})
+        """
+        data = {
+            'window_seconds': self.window,
+            'summary': self.summary(),
+            'recent_summary': self.summary(recent=True),
+            'records': self.records(),
+        }
+        data.update(extra or {})
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+
+    def export_csv(self, path: str):
+        """(종류, 단계)별 통계를 CSV로 저장"""
+        fieldnames = ['kind', 'phase', 'count', 'mean_ms', 'p50_ms', 'p95_ms', 'p99_ms', 'max_ms',
+                      'calls', 'errors', 'images', 'bytes_up', 'bytes_down']
+        with open(path, 'w', encoding='utf-8', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=fieldnames)
+            writer.writeheader()
+            writer.writerows(self.summary_rows())
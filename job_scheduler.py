@@ -0,0 +1,208 @@
+"""
+GUI 백그라운드 작업 스케줄러 (작업 스레드 수 제한, 같은 작업 중복 실행 방지, 협력적 취소, 메인 스레드 UI 큐)
+"""
+import queue
+import threading
+import traceback
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Hashable, List, Optional
+
+# 작업 상태
+QUEUED = 'queued'
+RUNNING = 'running'
+
+
+class Job:
+    """
+    스케줄러에 등록된 작업 하나 (작업 함수의 첫 번째 인자로 전달)
+
+    취소는 협력적입니다. 작업 함수가 cancelled를 확인하거나 cancel_event를
+    클라이언트의 stop_event로 넘겨 스스로 멈춰야 합니다.
+    """
+
+    def __init__(self, key: Hashable, name: str, on_cancelled: Optional[Callable[[], Any]] = None):
+        """
+        Args:
+            key: 중복 실행을 판단하는 작업 키 (같은 키의 작업은 동시에 하나만 실행)
+            name: 화면에 표시할 작업 이름
+            on_cancelled: 시작하기 전에 취소되어 작업 함수가 호출되지 않았을 때의 콜백 (메인 스레드에서 호출)
+        """
+        self.key = key
+        self.name = name
+        self.on_cancelled = on_cancelled
+        self.cancel_event = threading.Event()
+        self.state = QUEUED
+        self.future: Optional[Future] = None
+
+    @property
+    def cancelled(self) -> bool:
+        """취소 요청 여부"""
+        return self.cancel_event.is_set()
+
+    def cancel(self):
+        """취소 요청 (아직 시작하지 않은 작업은 실행하지 않음)"""
+        self.cancel_event.set()
+
+
+class JobScheduler:
+    """
+    GUI의 백그라운드 작업을 한곳에서 실행하는 스케줄러
+
+    - 작업은 max_workers개의 스레드 풀에서 실행되고, 나머지는 등록 순서대로 대기합니다.
+    - 같은 키의 작업이 대기 중이거나 실행 중이면 새로 등록하지 않습니다 (더블 클릭 등).
+    - 작업 스레드는 위젯을 직접 건드리지 않고 post()로 콜백을 큐에 넣으며,
+      메인 스레드가 drain()을 주기적으로 호출해 순서대로 실행합니다.
+    - 작업 목록이 바뀌면 on_change 콜백을 메인 스레드에서 호출합니다 (대기/실행 중 작업 표시용).
+
+    사용 예:
+        scheduler = JobScheduler(max_workers=3)
+
+        def task(job, path):
+            result = work(path, stop_event=job.cancel_event)
+            scheduler.post(label.configure, text=result)
+
+        scheduler.submit(('single', path), "단일 추론", task, path)
+        root.after(50, poll)  # poll()에서 scheduler.drain() 호출
+    """
+
+    def __init__(self, max_workers: int = 3, on_change: Optional[Callable[[], None]] = None):
+        """
+        Args:
+            max_workers: 동시에 실행할 작업 수
+            on_change: 작업이 등록/시작/종료될 때 호출할 콜백 (메인 스레드에서 호출)
+        """
+        if max_workers < 1:
+            raise ValueError("max_workers는 1 이상이어야 합니다")
+
+        self.on_change = on_change
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='visionad-job')
+        self._jobs: Dict[Hashable, Job] = {}
+        self._lock = threading.Lock()
+        self._ui_queue: 'queue.Queue[Callable[[], Any]]' = queue.Queue()
+        self._closed = False
+
+    def submit(self, key: Hashable, name: str, func: Callable[..., Any], *args,
+               on_cancelled: Optional[Callable[[], Any]] = None) -> Optional[Job]:
+        """
+        작업 등록
+
+        Args:
+            key: 작업 키 (같은 키의 작업이 대기/실행 중이면 등록하지 않음)
+            name: 화면에 표시할 작업 이름
+            func: 작업 스레드에서 func(job, *args)로 호출할 함수
+            on_cancelled: 시작하기 전에 취소되면 func 대신 호출할 콜백 (메인 스레드에서 호출)
+
+        Returns:
+            등록된 작업 (중복이거나 스케줄러가 닫혔으면 None)
+        """
+        with self._lock:
+            if self._closed or key in self._jobs:
+                return None
+            job = Job(key, name, on_cancelled)
+            self._jobs[key] = job
+            job.future = self._executor.submit(self._run, job, func, args)
+        self._notify()
+        return job
+
+    def _run(self, job: Job, func: Callable[..., Any], args: tuple):
+        try:
+            if job.cancelled:
+                self._skip(job)
+                return
+            job.state = RUNNING
+            self._notify()
+            func(job, *args)
+        except Exception:
+            # 작업 함수가 처리하지 못한 예외는 기록만 하고 다음 작업을 계속 실행
+            print(f"EXCEPTION in job '{job.name}':\n{traceback.format_exc()}")
+        finally:
+            self._remove(job)
+
+    def _skip(self, job: Job):
+        if job.on_cancelled:
+            self.post(job.on_cancelled)
+
+    def _remove(self, job: Job):
+        with self._lock:
+            if self._jobs.get(job.key) is job:
+                del self._jobs[job.key]
+        self._notify()
+
+    def _notify(self):
+        if self.on_change:
+            self.post(self.on_change)
+
+    def is_active(self, key: Hashable) -> bool:
+        """같은 키의 작업이 대기 중이거나 실행 중인지 여부"""
+        with self._lock:
+            return key in self._jobs
+
+    def jobs(self) -> List[Job]:
+        """대기/실행 중인 작업 (등록 순서)"""
+        with self._lock:
+            return list(self._jobs.values())
+
+    def cancel(self, key: Hashable) -> bool:
+        """
+        작업 취소 요청
+
+        Returns:
+            취소를 요청한 작업이 있었는지 여부
+        """
+        with self._lock:
+            job = self._jobs.get(key)
+        if job is None:
+            return False
+        self._cancel(job)
+        return True
+
+    def cancel_all(self) -> int:
+        """대기/실행 중인 모든 작업 취소 요청 (요청한 작업 수 반환)"""
+        jobs = self.jobs()
+        for job in jobs:
+            self._cancel(job)
+        return len(jobs)
+
+    def _cancel(self, job: Job):
+        job.cancel()
+        # 아직 시작하지 않은 작업은 풀에서 바로 빼서 다른 작업이 기다리지 않도록 함
+        if job.future is not None and job.future.cancel():
+            self._skip(job)
+            self._remove(job)
+
+    def post(self, callback: Callable[..., Any], *args, **kwargs):
+        """메인 스레드에서 실행할 콜백을 UI 큐에 추가 (어느 스레드에서나 호출 가능, 닫힌 뒤에는 무시)"""
+        if self._closed:
+            return
+        self._ui_queue.put(lambda: callback(*args, **kwargs))
+
+    def drain(self, max_items: Optional[int] = None) -> int:
+        """
+        UI 큐에 쌓인 콜백을 순서대로 실행 (메인 스레드에서 호출)
+
+        Args:
+            max_items: 한 번에 실행할 최대 콜백 수 (None이면 큐가 빌 때까지)
+
+        Returns:
+            실행한 콜백 수
+        """
+        count = 0
+        while max_items is None or count < max_items:
+            try:
+                callback = self._ui_queue.get_nowait()
+            except queue.Empty:
+                break
+            count += 1
+            try:
+                callback()
+            except Exception:
+                # 콜백 하나의 오류로 나머지 UI 갱신이 멈추지 않도록 기록만 함
+                traceback.print_exc()
+        return count
+
+    def shutdown(self):
+        """모든 작업을 취소하고 스케줄러 종료 (실행 중인 작업은 스스로 멈출 때까지 백그라운드에서 계속됨)"""
+        with self._lock:
+            self._closed = True
+        self.cancel_all()
+        self._executor.shutdown(wait=False)
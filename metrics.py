@@ -0,0 +1,305 @@
+"""
+이상 탐지 성능 지표 계산 (혼동 행렬, Threshold 탐색, 순위 기반 지표, 실시간 평가)
+
+판정 규칙은 anomaly_score > threshold이면 비정상(positive)입니다.
+"""
+import threading
+from bisect import bisect_right
+from typing import Dict, Iterable, List, Sequence, Tuple
+
+
+def confusion_metrics(tp: int, fp: int, tn: int, fn: int) -> Dict[str, float]:
+    """혼동 행렬로부터 precision, recall, f1_score, accuracy 계산"""
+    precision = tp / (tp + fp) if (tp + fp) > 0 else 0.0
+    recall = tp / (tp + fn) if (tp + fn) > 0 else 0.0
+    f1_score = 2 * (precision * recall) / (precision + recall) if (precision + recall) > 0 else 0.0
+    accuracy = (tp + tn) / (tp + tn + fp + fn) if (tp + tn + fp + fn) > 0 else 0.0
+    return {'precision': precision, 'recall': recall, 'f1_score': f1_score, 'accuracy': accuracy}
+
+
+def evaluate_threshold(normal_scores: Sequence[float], abnormal_scores: Sequence[float],
+                       threshold: float, presorted: bool = False) -> Dict:
+    """
+    하나의 threshold에 대한 혼동 행렬과 성능 지표
+
+    Args:
+        normal_scores: 정상 이미지 점수
+        abnormal_scores: 비정상 이미지 점수
+        threshold: 이상 판정 임계값
+        presorted: 두 점수 리스트가 이미 오름차순 정렬되어 있으면 True (정렬 생략)
+
+    Returns:
+        {'threshold', 'tp', 'fp', 'tn', 'fn', 'precision', 'recall', 'f1_score', 'accuracy'}
+    """
+    normal_sorted = normal_scores if presorted else sorted(normal_scores)
+    abnormal_sorted = abnormal_scores if presorted else sorted(abnormal_scores)
+
+    # threshold 이하인 점수 개수 = 정상 판정 개수
+    tn = bisect_right(normal_sorted, threshold)
+    fn = bisect_right(abnormal_sorted, threshold)
+    fp = len(normal_sorted) - tn
+    tp = len(abnormal_sorted) - fn
+
+    result = {'threshold': threshold, 'tp': tp, 'fp': fp, 'tn': tn, 'fn': fn}
+    result.update(confusion_metrics(tp, fp, tn, fn))
+    return result
+
+
+def _score_groups(normal_sorted: Sequence[float], abnormal_sorted: Sequence[float]) -> List[Tuple[float, int, int]]:
+    """정렬된 두 점수 리스트를 병합해 고유 점수별 (점수, 정상 개수, 비정상 개수)를 오름차순으로 반환"""
+    groups = []
+    i = j = 0
+    n_normal, n_abnormal = len(normal_sorted), len(abnormal_sorted)
+
+    while i < n_normal or j < n_abnormal:
+        if j >= n_abnormal or (i < n_normal and normal_sorted[i] <= abnormal_sorted[j]):
+            value = normal_sorted[i]
+        else:
+            value = abnormal_sorted[j]
+
+        start_i, start_j = i, j
+        while i < n_normal and normal_sorted[i] == value:
+            i += 1
+        while j < n_abnormal and abnormal_sorted[j] == value:
+            j += 1
+        groups.append((value, i - start_i, j - start_j))
+
+    return groups
+
+
+def threshold_sweep(normal_scores: Sequence[float], abnormal_scores: Sequence[float],
+                    presorted: bool = False) -> Dict:
+    """
+    관측된 모든 고유 점수와 최저 점수보다 조금 낮은 값(모두 이상 판정)을 threshold 후보로 하는 성능 곡선 계산
+
+    정상/비정상 점수를 한 번씩 정렬한 뒤, 오름차순으로 병합하면서 threshold 이하 개수를
+    누적하는 방식으로 모든 후보의 TP/FP/TN/FN을 구합니다 (전체 O(n log n)).
+
+    Args:
+        normal_scores: 정상 이미지 점수
+        abnormal_scores: 비정상 이미지 점수
+        presorted: 두 점수 리스트가 이미 오름차순 정렬되어 있으면 True (정렬 생략)
+
+    Returns:
+        {
+            'thresholds': List[float],  # 최저 점수보다 낮은 값 하나 + 오름차순 고유 점수
+            'tp', 'fp', 'tn', 'fn': List[int],
+            'precision', 'recall', 'f1_score', 'accuracy': List[float],
+            'best_index': int,          # F1 최대 지점 (동률이면 accuracy가 높은 쪽, 그다음 낮은 threshold)
+            'best_threshold': float,
+            'best_f1': float
+        }
+        점수가 하나도 없으면 리스트는 비어 있고 best_* 는 None
+    """
+    normal_sorted = normal_scores if presorted else sorted(normal_scores)
+    abnormal_sorted = abnormal_scores if presorted else sorted(abnormal_scores)
+    n_normal = len(normal_sorted)
+    n_abnormal = len(abnormal_sorted)
+
+    curve: Dict[str, List] = {key: [] for key in (
+        'thresholds', 'tp', 'fp', 'tn', 'fn', 'precision', 'recall', 'f1_score', 'accuracy')}
+
+    tn = fn = 0   # 지금까지 누적한 정상/비정상 점수 개수 (= threshold 이하 개수)
+    best_index = None
+    best_key = None
+
+    groups = _score_groups(normal_sorted, abnormal_sorted)
+    if groups:
+        # 모든 이미지를 이상으로 판정하는 지점 (threshold를 소수점 6자리로 표시/입력해도 최저 점수보다 낮게 유지)
+        lowest = groups[0][0]
+        groups.insert(0, (lowest - max(abs(lowest), 1.0) * 1e-6, 0, 0))
+
+    for value, count_normal, count_abnormal in groups:
+        tn += count_normal
+        fn += count_abnormal
+        fp, tp = n_normal - tn, n_abnormal - fn
+
+        precision = tp / (tp + fp) if (tp + fp) > 0 else 0.0
+        recall = tp / n_abnormal if n_abnormal > 0 else 0.0
+        f1_score = 2 * (precision * recall) / (precision + recall) if (precision + recall) > 0 else 0.0
+        accuracy = (tp + tn) / (n_normal + n_abnormal)
+
+        index = len(curve['thresholds'])
+        curve['thresholds'].append(value)
+        curve['tp'].append(tp)
+        curve['fp'].append(fp)
+        curve['tn'].append(tn)
+        curve['fn'].append(fn)
+        curve['precision'].append(precision)
+        curve['recall'].append(recall)
+        curve['f1_score'].append(f1_score)
+        curve['accuracy'].append(accuracy)
+
+        key = (f1_score, accuracy)
+        if best_key is None or key > best_key:
+            best_key = key
+            best_index = index
+
+    curve['best_index'] = best_index
+    curve['best_threshold'] = curve['thresholds'][best_index] if best_index is not None else None
+    curve['best_f1'] = curve['f1_score'][best_index] if best_index is not None else None
+    return curve
+
+
+def ranking_metrics(normal_scores: Sequence[float], abnormal_scores: Sequence[float],
+                    target_tpr: float = 0.99, presorted: bool = False) -> Dict:
+    """
+    Threshold와 무관한 순위 기반 지표 계산
+
+    두 점수 리스트를 정렬·병합해 고유 점수 그룹을 한 번 만든 뒤 (O(n log n)),
+    그룹을 한 번씩 순회하며 모든 지표를 구합니다. 동점은 sklearn과 같은 방식으로 처리합니다.
+
+    - AUROC: Mann-Whitney U 통계량 (동점은 0.5로 계산)
+    - average_precision: 높은 점수부터 recall 증가분 × precision의 합 (PR-AUC)
+    - fpr_at_tpr: TPR(recall)이 target_tpr 이상이 되는 가장 높은 threshold에서의 FPR
+
+    Args:
+        normal_scores: 정상 이미지 점수
+        abnormal_scores: 비정상 이미지 점수
+        target_tpr: fpr_at_tpr 계산에 사용할 목표 TPR (기본 0.99)
+        presorted: 두 점수 리스트가 이미 오름차순 정렬되어 있으면 True (정렬 생략)
+
+    Returns:
+        {'auroc', 'average_precision', 'fpr_at_tpr', 'target_tpr'}
+        정상 또는 비정상 점수가 없으면 지표 값은 None
+    """
+    normal_sorted = normal_scores if presorted else sorted(normal_scores)
+    abnormal_sorted = abnormal_scores if presorted else sorted(abnormal_scores)
+    n_normal, n_abnormal = len(normal_sorted), len(abnormal_sorted)
+
+    result = {'auroc': None, 'average_precision': None, 'fpr_at_tpr': None, 'target_tpr': target_tpr}
+    if n_normal == 0 or n_abnormal == 0:
+        return result
+
+    groups = _score_groups(normal_sorted, abnormal_sorted)
+
+    # AUROC: 비정상 점수가 정상 점수보다 큰 쌍의 비율 (오름차순 누적)
+    normal_below = 0
+    u = 0.0
+    for _, count_normal, count_abnormal in groups:
+        u += count_abnormal * (normal_below + count_normal * 0.5)
+        normal_below += count_normal
+    result['auroc'] = u / (n_normal * n_abnormal)
+
+    # AP, FPR@TPR: 높은 점수부터 내려가며 누적 (threshold를 각 고유 점수 바로 아래로 내리는 것과 동일)
+    tp = fp = 0
+    prev_recall = 0.0
+    ap = 0.0
+    for _, count_normal, count_abnormal in reversed(groups):
+        tp += count_abnormal
+        fp += count_normal
+        recall = tp / n_abnormal
+        ap += (recall - prev_recall) * (tp / (tp + fp))
+        prev_recall = recall
+
+        if result['fpr_at_tpr'] is None and recall >= target_tpr:
+            result['fpr_at_tpr'] = fp / n_normal
+    result['average_precision'] = ap
+
+    return result
+
+
+class RunningStats:
+    """최소/최대/평균/표준편차를 점수 하나당 O(1)로 갱신하는 누적 통계 (Welford 방식)"""
+
+    __slots__ = ('count', 'mean', 'min', 'max', '_m2')
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.min = None
+        self.max = None
+        self._m2 = 0.0
+
+    def add(self, value: float):
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self._m2 += delta * (value - self.mean)
+        if self.min is None or value < self.min:
+            self.min = value
+        if self.max is None or value > self.max:
+            self.max = value
+
+    @property
+    def std(self) -> float:
+        """모표준편차"""
+        return (self._m2 / self.count) ** 0.5 if self.count > 0 else 0.0
+
+    def as_dict(self) -> Dict:
+        return {'count': self.count, 'min': self.min, 'max': self.max, 'mean': self.mean, 'std': self.std}
+
+
+def score_stats(scores: Iterable[float]) -> Dict:
+    """점수들의 {'count', 'min', 'max', 'mean', 'std'}"""
+    stats = RunningStats()
+    for score in scores:
+        stats.add(score)
+    return stats.as_dict()
+
+
+class IncrementalEvaluator:
+    """
+    점수가 도착하는 대로 혼동 행렬, 성능 지표, 점수 분포를 갱신하는 평가기
+
+    점수 하나당 O(1)로 갱신되며, 배치 추론 작업 스레드에서 add()를 호출하고
+    UI 스레드에서 snapshot()을 읽을 수 있도록 lock으로 보호합니다.
+    """
+
+    def __init__(self, threshold: float):
+        """
+        Args:
+            threshold: 이상 판정 임계값 (anomaly_score > threshold이면 비정상)
+        """
+        self.threshold = threshold
+        self._lock = threading.Lock()
+        self._tp = self._fp = self._tn = self._fn = 0
+        self._normal = RunningStats()
+        self._abnormal = RunningStats()
+
+    def add(self, score: float, is_abnormal: bool):
+        """점수 하나 추가"""
+        with self._lock:
+            self._add(score, is_abnormal)
+
+    def add_many(self, items: Iterable[Tuple[float, bool]]):
+        """(점수, 비정상 여부)들을 한 번에 추가"""
+        with self._lock:
+            for score, is_abnormal in items:
+                self._add(score, is_abnormal)
+
+    def _add(self, score: float, is_abnormal: bool):
+        predicted_abnormal = score > self.threshold
+        if is_abnormal:
+            self._abnormal.add(score)
+            if predicted_abnormal:
+                self._tp += 1
+            else:
+                self._fn += 1
+        else:
+            self._normal.add(score)
+            if predicted_abnormal:
+                self._fp += 1
+            else:
+                self._tn += 1
+
+    @property
+    def count(self) -> int:
+        """지금까지 추가된 점수 개수"""
+        return self._normal.count + self._abnormal.count
+
+    def snapshot(self) -> Dict:
+        """
+        현재까지의 결과
+
+        Returns:
+            {'threshold', 'count', 'tp', 'fp', 'tn', 'fn', 'precision', 'recall', 'f1_score', 'accuracy',
+             'normal_stats', 'abnormal_stats'}  (stats는 score_stats와 같은 형식)
+        """
+        with self._lock:
+            result = {'threshold': self.threshold, 'count': self.count,
+                      'tp': self._tp, 'fp': self._fp, 'tn': self._tn, 'fn': self._fn}
+            result.update(confusion_metrics(self._tp, self._fp, self._tn, self._fn))
+            result['normal_stats'] = self._normal.as_dict()
+            result['abnormal_stats'] = self._abnormal.as_dict()
+        return result
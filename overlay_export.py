@@ -0,0 +1,238 @@
+"""
+결과 ZIP의 overlay를 점수(threshold 초과/이하)와 라벨별 폴더로 병렬 추출 (선택적으로 썸네일 생성)
+"""
+import io
+import os
+import shutil
+import threading
+import zipfile
+from collections import Counter
+from concurrent.futures import FIRST_COMPLETED, Executor, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from folder_scan import ABNORMAL, NORMAL
+from result_zip import ThreadLocalZip, find_overlay_members, read_score_table
+from thumbnails import load_thumbnail
+
+# 판정 폴더 (metrics.evaluate_threshold와 같이 점수가 threshold보다 크면 이상 판정)
+ABOVE = 'above'
+BELOW = 'below'
+# 라벨 목록을 지정했지만 어느 쪽에도 없는 이미지의 라벨 폴더
+UNLABELED = 'unlabeled'
+# 썸네일을 저장할 하위 폴더 (판정/라벨 폴더 구조를 그대로 따름)
+THUMBNAIL_DIR = 'thumbnails'
+
+# 작업자 하나에 한 번에 넘기는 멤버 수 (ZIP 안의 저장 순서대로 연속된 멤버)
+EXPORT_BATCH_SIZE = 256
+# 결과에 남기는 실패 메시지 최대 개수 (실패 수는 모두 셈)
+MAX_ERROR_MESSAGES = 100
+
+ExportProgressCallback = Callable[[int, int], None]
+ExportItem = Tuple[str, str]  # (멤버 이름, 출력 폴더 기준 상대 경로)
+
+
+def plan_export(zip_ref: zipfile.ZipFile, threshold: float, normal_images: Sequence[str] = (),
+                abnormal_images: Sequence[str] = ()) -> Tuple[List[ExportItem], Dict]:
+    """
+    scores.csv의 각 행을 overlay 멤버와 연결해 추출 위치 결정
+
+    판정 폴더는 점수가 threshold보다 크면 above, 아니면 below입니다.
+    정상/비정상 이미지 목록을 지정하면 F1 계산(calculate_f1_from_zip)과 같은 방식으로
+    파일명을 행에 대응시켜 판정 폴더 아래 normal/abnormal/unlabeled 폴더로 나눕니다.
+    추출 순서는 ZIP 안의 저장 위치 순서라서 작업자들이 파일을 앞에서부터 연속으로 읽습니다.
+
+    Args:
+        zip_ref: 결과 ZIP (scores.csv와 중앙 디렉터리만 읽음)
+        threshold: 판정 임계값
+        normal_images: 정상 이미지 경로 리스트 (파일명 매칭용)
+        abnormal_images: 비정상 이미지 경로 리스트 (파일명 매칭용)
+
+    Returns:
+        ([(멤버 이름, 상대 경로), ...], {'folders': {상대 폴더: 개수}, 'missing': overlay가 없는 행 수})
+
+    Raises:
+        KeyError: ZIP에 scores.csv가 없는 경우
+    """
+    table = read_score_table(zip_ref)
+    overlays = find_overlay_members(zip_ref)
+
+    labels = None
+    if normal_images or abnormal_images:
+        rows = table.match(list(normal_images) + list(abnormal_images))
+        labels = {row: NORMAL if i < len(normal_images) else ABNORMAL
+                  for i, row in enumerate(rows) if row is not None}
+
+    planned = []
+    folders: Counter = Counter()
+    seen = set()
+    missing = 0
+    for row, path in enumerate(table.paths):
+        member = overlays.get(os.path.splitext(os.path.basename(path))[0])
+        if member is None:
+            missing += 1
+            continue
+        if member in seen:
+            continue  # 파일명이 같은 행은 overlay도 같으므로 첫 행 기준으로 한 번만 추출
+        seen.add(member)
+
+        folder = ABOVE if table.scores[row] > threshold else BELOW
+        if labels is not None:
+            folder = os.path.join(folder, labels.get(row, UNLABELED))
+        folders[folder] += 1
+        rel_path = os.path.join(folder, os.path.basename(member))
+        planned.append((zip_ref.getinfo(member).header_offset, member, rel_path))
+
+    planned.sort()
+    return [(member, rel_path) for _, member, rel_path in planned], {'folders': dict(folders), 'missing': missing}
+
+
+def thumbnail_path(output_dir: str, rel_path: str) -> str:
+    """상대 경로 overlay의 썸네일 저장 경로 (JPEG)"""
+    return os.path.join(output_dir, THUMBNAIL_DIR, os.path.splitext(rel_path)[0] + '.jpg')
+
+
+def export_members(zip_ref: zipfile.ZipFile, items: Sequence[ExportItem], output_dir: str,
+                   thumbnail_size: Optional[int] = None,
+                   stop_event: Optional[threading.Event] = None) -> Tuple[int, List[str]]:
+    """
+    멤버들을 출력 폴더로 추출 (작업자 하나의 ZipFile 핸들 사용, 폴더는 미리 만들어져 있어야 함)
+
+    썸네일이 없으면 멤버를 메모리에 모으지 않고 파일로 바로 복사합니다.
+
+    Returns:
+        (추출한 멤버 수, 실패 메시지 리스트)
+    """
+    exported = 0
+    errors = []
+    for member, rel_path in items:
+        if stop_event is not None and stop_event.is_set():
+            break
+        target = os.path.join(output_dir, rel_path)
+        try:
+            if thumbnail_size:
+                data = zip_ref.read(member)
+                with open(target, 'wb') as f:
+                    f.write(data)
+                thumbnail = load_thumbnail(io.BytesIO(data), (thumbnail_size, thumbnail_size))
+                if thumbnail.mode != 'RGB':
+                    thumbnail = thumbnail.convert('RGB')
+                thumbnail.save(thumbnail_path(output_dir, rel_path), 'JPEG', quality=85)
+            else:
+                with zip_ref.open(member) as src, open(target, 'wb') as dst:
+                    shutil.copyfileobj(src, dst, 1024 * 1024)
+            exported += 1
+        except Exception as e:
+            errors.append(f"{member}: {e}")
+    return exported, errors
+
+
+# 프로세스 작업자의 ZipFile (initializer에서 프로세스마다 한 번 열어 재사용)
+_process_zip: Optional[zipfile.ZipFile] = None
+
+
+def _init_process_worker(zip_path: str):
+    global _process_zip
+    _process_zip = zipfile.ZipFile(zip_path, 'r')
+
+
+def _export_in_process(items: Sequence[ExportItem], output_dir: str,
+                       thumbnail_size: Optional[int]) -> Tuple[int, List[str]]:
+    return export_members(_process_zip, items, output_dir, thumbnail_size)
+
+
+def export_overlays(zip_path: str, output_dir: str, threshold: float,
+                    normal_images: Optional[Sequence[str]] = None,
+                    abnormal_images: Optional[Sequence[str]] = None,
+                    max_workers: int = 4, use_processes: bool = False,
+                    thumbnail_size: Optional[int] = None, batch_size: int = EXPORT_BATCH_SIZE,
+                    progress_callback: Optional[ExportProgressCallback] = None,
+                    stop_event: Optional[threading.Event] = None) -> Dict:
+    """
+    결과 ZIP의 overlay를 판정/라벨별 폴더로 병렬 추출
+
+    작업자(스레드 또는 프로세스)는 각자 ZipFile 핸들을 처음 한 번만 열어 중앙 디렉터리를 읽고,
+    ZIP 안의 저장 순서대로 batch_size개씩 묶인 멤버를 추출합니다.
+    overlay 복사는 압축 해제와 파일 쓰기가 대부분이라 스레드로 충분하고,
+    썸네일을 만들면 디코딩/리사이즈에 CPU를 쓰므로 use_processes=True가 유리합니다.
+
+    Args:
+        zip_path: 배치 추론 결과 ZIP 경로
+        output_dir: 출력 폴더 (없으면 생성, 같은 이름의 파일은 덮어씀)
+        threshold: 판정 임계값
+        normal_images: 정상 이미지 경로 리스트 (지정하면 라벨 폴더로도 나눔)
+        abnormal_images: 비정상 이미지 경로 리스트
+        max_workers: 작업자 수
+        use_processes: 스레드 대신 프로세스 풀 사용
+        thumbnail_size: 지정하면 thumbnails/ 아래 같은 폴더 구조로 한 변이 이 크기 이하인 JPEG 썸네일도 저장
+        batch_size: 작업자 하나에 한 번에 넘기는 멤버 수
+        progress_callback: 묶음이 끝날 때마다 (처리한 멤버 수, 전체 멤버 수)로 호출 (호출한 스레드에서)
+        stop_event: set되면 시작하지 않은 묶음은 버리고 진행 중인 묶음까지만 처리
+
+    Returns:
+        {'output_dir', 'total', 'exported', 'failed', 'errors' (앞쪽 MAX_ERROR_MESSAGES개),
+         'missing' (overlay가 없는 행 수), 'folders' ({상대 폴더: 개수}), 'cancelled'}
+
+    Raises:
+        KeyError: ZIP에 scores.csv가 없는 경우
+    """
+    archive = ThreadLocalZip(zip_path)
+    try:
+        items, summary = plan_export(archive.handle(), threshold, normal_images or (), abnormal_images or ())
+
+        for folder in summary['folders']:
+            os.makedirs(os.path.join(output_dir, folder), exist_ok=True)
+            if thumbnail_size:
+                os.makedirs(os.path.join(output_dir, THUMBNAIL_DIR, folder), exist_ok=True)
+
+        batches = [items[i:i + batch_size] for i in range(0, len(items), batch_size)]
+        total = len(items)
+        processed = exported = failed = 0
+        errors: List[str] = []
+
+        executor: Executor
+        if use_processes:
+            executor = ProcessPoolExecutor(max_workers=max_workers, initializer=_init_process_worker,
+                                           initargs=(archive.zip_path,))
+        else:
+            executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='overlay-export')
+
+        def submit(batch):
+            if use_processes:
+                return executor.submit(_export_in_process, batch, output_dir, thumbnail_size)
+            return executor.submit(lambda: export_members(archive.handle(), batch, output_dir,
+                                                          thumbnail_size, stop_event))
+
+        pending: Dict = {}
+        try:
+            pending.update((submit(batch), len(batch)) for batch in batches)
+            while pending:
+                done, _ = wait(pending, timeout=0.5, return_when=FIRST_COMPLETED)
+                if stop_event is not None and stop_event.is_set():
+                    for future in list(pending):
+                        if future.cancel():
+                            del pending[future]
+                for future in done:
+                    processed += pending.pop(future)
+                    count, batch_errors = future.result()
+                    exported += count
+                    failed += len(batch_errors)
+                    errors.extend(batch_errors[:MAX_ERROR_MESSAGES - len(errors)])
+                    if progress_callback:
+                        progress_callback(processed, total)
+        finally:
+            for future in pending:
+                future.cancel()
+            executor.shutdown(wait=True)
+    finally:
+        archive.close()
+
+    return {
+        'output_dir': os.path.abspath(output_dir),
+        'total': total,
+        'exported': exported,
+        'failed': failed,
+        'errors': errors,
+        'missing': summary['missing'],
+        'folders': summary['folders'],
+        'cancelled': stop_event is not None and stop_event.is_set() and exported + failed < total,
+    }
@@ -0,0 +1,171 @@
+"""
+업로드 전 클라이언트 측 이미지 전처리 (리사이즈, 색 공간 변환, 재인코딩)
+"""
+import mimetypes
+import os
+import shutil
+import tempfile
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional, Tuple
+
+from PIL import Image
+
+# 확장자별 Content-Type (mimetypes는 플랫폼마다 BMP 등의 결과가 달라 직접 지정)
+CONTENT_TYPES = {
+    '.jpg': 'image/jpeg',
+    '.jpeg': 'image/jpeg',
+    '.png': 'image/png',
+    '.bmp': 'image/bmp',
+    '.tif': 'image/tiff',
+    '.tiff': 'image/tiff',
+    '.webp': 'image/webp',
+}
+
+# 저장 포맷별 (확장자, Content-Type)
+FORMATS = {
+    'JPEG': ('.jpg', 'image/jpeg'),
+    'PNG': ('.png', 'image/png'),
+    'BMP': ('.bmp', 'image/bmp'),
+    'WEBP': ('.webp', 'image/webp'),
+}
+
+
+def content_type_for(path: str) -> str:
+    """파일 확장자로 Content-Type 결정"""
+    ext = os.path.splitext(path)[1].lower()
+    if ext in CONTENT_TYPES:
+        return CONTENT_TYPES[ext]
+    return mimetypes.guess_type(path)[0] or 'application/octet-stream'
+
+
+def preprocess_image(src_path: str, dst_path: str, target_size: Optional[Tuple[int, int]],
+                     mode: Optional[str], image_format: str, quality: int):
+    """
+    이미지 하나를 전처리해 dst_path에 저장 (프로세스 풀에서 실행되므로 모듈 최상위 함수)
+
+    JPEG는 draft()로 DCT 단계에서 축소 디코딩해 target_size보다 큰 원본을 전부 풀지 않습니다.
+    크기는 비율을 유지한 채 target_size 안에 맞춥니다.
+    """
+    with Image.open(src_path) as image:
+        if target_size and image.format == 'JPEG':
+            image.draft(mode or image.mode, target_size)
+
+        if mode and image.mode != mode:
+            image = image.convert(mode)
+        elif image_format == 'JPEG' and image.mode not in ('RGB', 'L', 'CMYK'):
+            # JPEG로 저장할 수 없는 모드(RGBA, P 등)는 RGB로 변환
+            image = image.convert('RGB')
+
+        if target_size:
+            image.thumbnail(target_size, Image.Resampling.LANCZOS)
+
+        save_kwargs = {'quality': quality} if image_format in ('JPEG', 'WEBP') else {}
+        image.save(dst_path, image_format, **save_kwargs)
+
+
+class PreparedImages:
+    """
+    전처리된 업로드용 파일 목록 (with 블록이 끝나면 임시 파일 삭제)
+
+    paths[i]는 원본 image_paths[i]에 대응하므로, 업로드 시 원본 파일명을 그대로 사용하면
+    scores.csv의 파일명 매칭(calculate_f1_from_zip)이 그대로 유지됩니다.
+    """
+
+    def __init__(self, paths: List[str], content_types: List[str], temp_dir: Optional[str] = None):
+        self.paths = paths
+        self.content_types = content_types
+        self.temp_dir = temp_dir
+
+    def cleanup(self):
+        if self.temp_dir:
+            shutil.rmtree(self.temp_dir, ignore_errors=True)
+            self.temp_dir = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.cleanup()
+
+
+class Preprocessor:
+    """
+    업로드 전 이미지 전처리기
+
+    배치는 CPU 코어 수만큼의 프로세스 풀에서 병렬로 전처리합니다.
+    프로세스 풀은 처음 사용할 때 생성되며 close() 후에도 다시 사용하면 새로 생성됩니다.
+    """
+
+    def __init__(self, target_size: Optional[Tuple[int, int]] = (512, 512), mode: Optional[str] = 'RGB',
+                 image_format: str = 'JPEG', quality: int = 95, max_workers: Optional[int] = None):
+        """
+        Args:
+            target_size: 최대 (가로, 세로) 크기 (비율 유지, None이면 리사이즈 안 함)
+            mode: 변환할 색 모드 ('RGB', 'L' 등, None이면 유지)
+            image_format: 재인코딩 포맷 (JPEG, PNG, BMP, WEBP)
+            quality: JPEG/WEBP 품질
+            max_workers: 프로세스 수 (None이면 CPU 코어 수)
+        """
+        if image_format not in FORMATS:
+            raise ValueError(f"지원하지 않는 포맷입니다: {image_format}")
+
+        self.target_size = tuple(target_size) if target_size else None
+        self.mode = mode
+        self.image_format = image_format
+        self.quality = quality
+        self.max_workers = max_workers
+        self._executor = None
+        self._executor_lock = threading.Lock()
+
+    @property
+    def signature(self) -> str:
+        """전처리 설정을 나타내는 문자열 (결과 캐시 키 구분용)"""
+        return f"{self.target_size}|{self.mode}|{self.image_format}|{self.quality}"
+
+    @property
+    def content_type(self) -> str:
+        return FORMATS[self.image_format][1]
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._executor_lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+            return self._executor
+
+    def _args(self, src_path: str, dst_path: str):
+        return src_path, dst_path, self.target_size, self.mode, self.image_format, self.quality
+
+    def prepare(self, image_paths: List[str]) -> PreparedImages:
+        """
+        이미지들을 프로세스 풀에서 전처리해 임시 디렉터리에 저장
+
+        Returns:
+            PreparedImages (원본 순서 유지)
+        """
+        temp_dir = tempfile.mkdtemp(prefix='visionad_pre_')
+        ext = FORMATS[self.image_format][0]
+        dst_paths = [os.path.join(temp_dir, f"{i:06d}{ext}") for i in range(len(image_paths))]
+
+        try:
+            if len(image_paths) == 1:
+                # 한 장이면 프로세스 간 전달 비용 없이 현재 프로세스에서 처리
+                preprocess_image(*self._args(image_paths[0], dst_paths[0]))
+            else:
+                executor = self._get_executor()
+                chunksize = max(1, len(image_paths) // ((self.max_workers or os.cpu_count() or 1) * 4))
+                list(executor.map(preprocess_image, *zip(*[self._args(src, dst)
+                                                           for src, dst in zip(image_paths, dst_paths)]),
+                                  chunksize=chunksize))
+        except BaseException:
+            shutil.rmtree(temp_dir, ignore_errors=True)
+            raise
+
+        return PreparedImages(dst_paths, [self.content_type] * len(dst_paths), temp_dir)
+
+    def close(self):
+        """프로세스 풀 종료"""
+        with self._executor_lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=True)
+                self._executor = None
@@ -0,0 +1,265 @@
+"""
+백그라운드 작업의 진행 상황을 메인 스레드에 전달하는 progress bus (채널별 최신 상태만 일정 간격으로 표시)
+"""
+import itertools
+import time
+from collections import deque
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+
+from metrics import RunningStats
+from streaming import PHASE_DONE, PHASE_DOWNLOAD, PHASE_UPLOAD, PHASE_WAITING
+
+ProgressRenderer = Callable[[Dict[str, Any]], None]
+
+
+def format_duration(seconds: Optional[float]) -> str:
+    """남은 시간 표시 문자열 (예: 03:25, 1:02:03, 모르면 --:--)"""
+    if seconds is None:
+        return "--:--"
+    seconds = int(round(seconds))
+    hours, rest = divmod(seconds, 3600)
+    minutes, seconds = divmod(rest, 60)
+    if hours:
+        return f"{hours}:{minutes:02d}:{seconds:02d}"
+    return f"{minutes:02d}:{seconds:02d}"
+
+
+def format_bytes(size: Optional[float]) -> str:
+    """바이트 수 표시 문자열 (예: 512 B, 12.3 MB)"""
+    if size is None:
+        return "?"
+    for unit in ('B', 'KB', 'MB'):
+        if size < 1024:
+            return f"{size:.0f} {unit}" if unit == 'B' else f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.2f} GB"
+
+
+def summarize_transfers(events: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    진행 중인 요청들의 마지막 전송 이벤트(streaming.TransferProgress)를 단계별로 합산
+
+    Returns:
+        {'upload': 단계 합계, 'waiting': 서버 처리를 기다리는 요청 수, 'download': 단계 합계}
+        단계 합계는 {'requests', 'bytes', 'total' (모르는 요청이 있으면 None), 'rate' (바이트/초), 'eta' (초 또는 None)}
+    """
+    summary: Dict[str, Any] = {}
+    for phase in (PHASE_UPLOAD, PHASE_DOWNLOAD):
+        phase_events = [event for event in events if event['phase'] == phase]
+        done = sum(event['bytes'] for event in phase_events)
+        total = None
+        if all(event['total'] is not None for event in phase_events):
+            total = sum(event['total'] for event in phase_events)
+        rate = sum(event['rate'] or 0 for event in phase_events)
+        eta = (total - done) / rate if total is not None and rate else None
+        summary[phase] = {'requests': len(phase_events), 'bytes': done, 'total': total, 'rate': rate, 'eta': eta}
+    summary['waiting'] = sum(1 for event in events if event['phase'] == PHASE_WAITING)
+    return summary
+
+
+class RateMeter:
+    """
+    최근 window초 동안의 (시각, 완료 수) 표본으로 처리 속도와 남은 시간을 계산 (메인 스레드 전용)
+
+    청크 단위로 완료가 몰려 들어와도 구간 평균을 사용하므로 표시 값이 크게 흔들리지 않습니다.
+    """
+
+    def __init__(self, window: float = 10.0):
+        """
+        Args:
+            window: 속도 계산에 사용할 최근 구간 길이 (초)
+        """
+        self.window = window
+        self._samples: 'deque[Tuple[float, int]]' = deque()
+
+    def update(self, timestamp: float, done: int) -> Optional[float]:
+        """
+        표본 추가 후 현재 처리 속도 반환
+
+        Returns:
+            초당 완료 수 (표본이 부족하면 None)
+        """
+        samples = self._samples
+        if samples and done < samples[-1][1]:
+            samples.clear()  # 새 작업으로 완료 수가 줄어든 경우
+        if not samples or timestamp > samples[-1][0]:
+            samples.append((timestamp, done))
+
+        # 구간 밖의 표본은 버리되, 구간 시작점을 알 수 있도록 가장 최근의 오래된 표본 하나는 남김
+        while len(samples) > 2 and samples[1][0] <= timestamp - self.window:
+            samples.popleft()
+        return self.rate()
+
+    def rate(self) -> Optional[float]:
+        if len(self._samples) < 2:
+            return None
+        (start_time, start_done), (end_time, end_done) = self._samples[0], self._samples[-1]
+        if end_time <= start_time:
+            return None
+        return (end_done - start_done) / (end_time - start_time)
+
+    def eta(self, done: int, total: Optional[int]) -> Optional[float]:
+        """남은 시간 (초, 전체 수를 모르거나 속도를 모르면 None)"""
+        if total is None:
+            return None
+        if done >= total:
+            return 0.0
+        rate = self.rate()
+        if not rate:
+            return None
+        return (total - done) / rate
+
+
+class ProgressReporter:
+    """
+    작업 스레드에서 배치 추론 진행 상황을 누적해 bus에 게시하는 객체 (ProgressBus.start로 생성)
+
+    add_scores와 update_chunks는 클라이언트의 scores_callback, chunk_callback으로 그대로 넘길 수 있습니다.
+    둘은 한 작업 스레드에서만 호출하는 것을 전제로 하며, 게시할 때 lock을 잡지 않습니다.
+    add_transfer는 클라이언트의 progress_callback으로 넘기며, 청크 요청을 보내는 여러 스레드에서 호출되어도 됩니다
+    (요청별 마지막 이벤트를 dict 항목 대입으로 기록).
+    """
+
+    def __init__(self, bus: 'ProgressBus', channel: Hashable, total: Optional[int],
+                 extra: Optional[Callable[[], Dict[str, Any]]] = None):
+        self._bus = bus
+        self.channel = channel
+        self.total = total
+        self.extra = extra
+        self.done = 0
+        self.chunks_done = 0
+        self.chunks_total: Optional[int] = None
+        self.scores = RunningStats()
+        self.started_at = time.monotonic()
+        self._transfers: Dict[int, Dict[str, Any]] = {}
+
+    def add_scores(self, items: List[Tuple[str, float]]):
+        """청크 하나의 [(이미지 경로, 점수), ...] 반영"""
+        for _, score in items:
+            self.scores.add(score)
+        self.done += len(items)
+        self.publish()
+
+    def update_chunks(self, done: int, total: int):
+        """완료된 청크 수 반영"""
+        self.chunks_done = done
+        self.chunks_total = total
+        self.publish()
+
+    def update_done(self, done: int, total: Optional[int] = None):
+        """처리한 항목 수 반영 (점수 없이 개수만 보고하는 작업용, 예: overlay 내보내기의 progress_callback)"""
+        self.done = done
+        if total is not None:
+            self.total = total
+        self.publish()
+
+    def add_transfer(self, event: Dict[str, Any]):
+        """청크 요청 하나의 전송 진행 이벤트 반영 (끝난 요청은 합산에서 제외)"""
+        if event['phase'] == PHASE_DONE:
+            self._transfers.pop(event['request'], None)
+        else:
+            self._transfers[event['request']] = event
+        self.publish()
+
+    def publish(self):
+        """현재 상태 게시 (이전에 게시한 상태 중 아직 표시되지 않은 것은 버려짐)"""
+        now = time.monotonic()
+        state = {
+            'done': self.done,
+            'total': self.total,
+            'chunks_done': self.chunks_done,
+            'chunks_total': self.chunks_total,
+            'scores': self.scores.as_dict(),
+            'transfer': summarize_transfers(list(self._transfers.values())),
+            'time': now,
+            'elapsed': now - self.started_at,
+        }
+        if self.extra:
+            state.update(self.extra())
+        self._bus.publish(self, state)
+
+
+class ProgressBus:
+    """
+    작업 스레드가 게시한 진행 상태를 채널별로 최신 값 하나만 남겨 메인 스레드에서 표시하는 bus
+
+    - 작업 스레드의 publish는 채널의 최신 상태를 dict 항목 대입 하나로 덮어써 lock 없이 끝납니다
+      (dict 항목 대입과 itertools.count의 next는 GIL 아래에서 원자적).
+    - 메인 스레드는 poll()을 일정 간격(frame)으로 호출하고, 지난 poll 이후 바뀐 채널만 표시 함수를 호출합니다.
+      그 사이에 여러 번 게시된 상태는 마지막 것만 표시되므로 이미지 수만큼 게시해도 Tk 이벤트가 늘지 않습니다.
+    - 표시 함수에 전달하는 상태에는 RateMeter로 계산한 'rate'(초당 이미지 수)와 'eta'(남은 초)가 추가됩니다.
+    - 채널마다 마지막으로 start()한 작업의 상태만 표시하므로 이전 작업의 늦은 게시는 무시됩니다.
+
+    사용 예:
+        bus = ProgressBus()
+        bus.subscribe('batch', render_batch_progress)       # 메인 스레드
+        progress = bus.start('batch', total=len(paths))      # 메인 스레드, 작업 등록 직전
+        client.inference_batch_chunked(..., chunk_callback=progress.update_chunks,
+                                       scores_callback=progress.add_scores)  # 작업 스레드
+        root.after(100, frame)  # frame()에서 bus.poll() 호출
+    """
+
+    def __init__(self, rate_window: float = 10.0):
+        """
+        Args:
+            rate_window: 처리 속도 계산 구간 (초)
+        """
+        self.rate_window = rate_window
+        self._latest: Dict[Hashable, Tuple[ProgressReporter, int, Dict[str, Any]]] = {}
+        self._seq = itertools.count(1)
+
+        # 이하 메인 스레드 전용
+        self._renderers: Dict[Hashable, List[ProgressRenderer]] = {}
+        self._current: Dict[Hashable, ProgressReporter] = {}
+        self._rendered: Dict[Hashable, int] = {}
+        self._meters: Dict[Hashable, RateMeter] = {}
+
+    def subscribe(self, channel: Hashable, renderer: ProgressRenderer):
+        """채널 상태가 바뀌면 호출할 표시 함수 등록 (메인 스레드에서 호출)"""
+        self._renderers.setdefault(channel, []).append(renderer)
+
+    def start(self, channel: Hashable, total: Optional[int] = None,
+              extra: Optional[Callable[[], Dict[str, Any]]] = None) -> ProgressReporter:
+        """
+        채널에 새 작업의 진행 상황 보고 시작 (메인 스레드에서 호출)
+
+        Args:
+            channel: 채널 이름
+            total: 전체 이미지 수 (모르면 None, 남은 시간을 표시하지 않음)
+            extra: 게시할 때마다 호출해 상태에 더할 값을 반환하는 함수
+                   (예: lambda: {'evaluation': evaluator.snapshot()}, 작업 스레드에서 호출됨)
+
+        Returns:
+            작업 스레드에 넘길 ProgressReporter
+        """
+        reporter = ProgressReporter(self, channel, total, extra)
+        self._current[channel] = reporter
+        self._meters[channel] = RateMeter(self.rate_window)
+        self._rendered.pop(channel, None)
+        reporter.publish()
+        return reporter
+
+    def publish(self, reporter: ProgressReporter, state: Dict[str, Any]):
+        """상태 게시 (작업 스레드에서 호출, lock 없음)"""
+        self._latest[reporter.channel] = (reporter, next(self._seq), state)
+
+    def poll(self) -> int:
+        """
+        바뀐 채널의 최신 상태를 표시 함수로 전달 (메인 스레드에서 frame 간격으로 호출)
+
+        Returns:
+            표시한 채널 수
+        """
+        rendered = 0
+        for channel, (reporter, seq, state) in self._latest.copy().items():
+            if reporter is not self._current.get(channel) or self._rendered.get(channel) == seq:
+                continue
+            self._rendered[channel] = seq
+
+            meter = self._meters[channel]
+            state = dict(state, rate=meter.update(state['time'], state['done']))
+            state['eta'] = meter.eta(state['done'], state['total'])
+            for renderer in self._renderers.get(channel, ()):
+                renderer(state)
+            rendered += 1
+        return rendered
@@ -0,0 +1,373 @@
+"""
+배치 추론 결과 ZIP 브라우저 (점수순 인덱스 + 화면에 보이는 overlay만 디코딩하는 가상화 썸네일 그리드)
+"""
+import os
+import tkinter as tk
+from array import array
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import customtkinter as ctk
+from PIL import ImageTk
+
+from result_zip import ThreadLocalZip, find_overlay_members, read_score_table
+from thumbnails import ThumbnailCallback, ThumbnailLoader
+
+# 정렬 기준
+SORT_SCORE_DESC = "점수 높은 순"
+SORT_SCORE_ASC = "점수 낮은 순"
+SORT_NAME = "파일명 순"
+SORT_OPTIONS = (SORT_SCORE_DESC, SORT_SCORE_ASC, SORT_NAME)
+
+
+class ResultIndex:
+    """
+    결과 ZIP의 scores.csv 행과 overlay 멤버 이름을 연결한 인덱스 (압축 해제 없음)
+
+    ZIP을 열 때 scores.csv와 중앙 디렉터리만 읽고, overlay는 read_overlay/load_overlay로
+    필요한 멤버만 메모리에서 읽습니다. 표시 순서(정렬 + 파일명 필터)는 행 번호 array('l')로 보관하므로
+    10,000개 이상의 결과도 정렬 기준을 바꿀 때 행 번호만 다시 정렬합니다.
+    """
+
+    def __init__(self, zip_path: str):
+        """
+        Args:
+            zip_path: 배치 추론 결과 ZIP 경로
+
+        Raises:
+            KeyError: ZIP에 scores.csv가 없는 경우
+            zipfile.BadZipFile, OSError: ZIP을 읽을 수 없는 경우
+        """
+        self.archive = ThreadLocalZip(zip_path)
+        try:
+            zip_ref = self.archive.handle()
+            self.table = read_score_table(zip_ref)
+            overlays = find_overlay_members(zip_ref)
+        except BaseException:
+            self.archive.close()
+            raise
+
+        self.names = [os.path.basename(p) for p in self.table.paths]
+        self.members: List[Optional[str]] = [overlays.get(os.path.splitext(name)[0]) for name in self.names]
+        self.sort = SORT_SCORE_DESC
+        self._filter = ''
+        self._order = self._build_order()
+
+    @property
+    def zip_path(self) -> str:
+        return self.archive.zip_path
+
+    def _build_order(self) -> array:
+        rows = range(len(self.names))
+        if self._filter:
+            needle = self._filter
+            rows = [i for i in rows if needle in self.names[i].lower()]
+
+        scores = self.table.scores
+        if self.sort == SORT_SCORE_DESC:
+            ordered = sorted(rows, key=scores.__getitem__, reverse=True)
+        elif self.sort == SORT_SCORE_ASC:
+            ordered = sorted(rows, key=scores.__getitem__)
+        else:
+            ordered = sorted(rows, key=self.names.__getitem__)
+        return array('l', ordered)
+
+    def set_sort(self, sort: str):
+        """정렬 기준 설정 (SORT_OPTIONS 중 하나)"""
+        if sort not in SORT_OPTIONS:
+            raise ValueError(f"알 수 없는 정렬 기준: {sort}")
+        if sort != self.sort:
+            self.sort = sort
+            self._order = self._build_order()
+
+    def set_filter(self, text: str):
+        """파일명 필터 설정 (대소문자 무시, 빈 문자열이면 해제)"""
+        text = text.strip().lower()
+        if text != self._filter:
+            self._filter = text
+            self._order = self._build_order()
+
+    @property
+    def total(self) -> int:
+        """전체 결과 수"""
+        return len(self.names)
+
+    def __len__(self) -> int:
+        """표시되는 (필터 일치) 결과 수"""
+        return len(self._order)
+
+    def row(self, index: int) -> Tuple[int, str, float, Optional[str]]:
+        """
+        표시 순서 index의 결과
+
+        Returns:
+            (scores.csv 행 번호 (1부터), 파일명, 점수, overlay 멤버 이름 (없으면 None))
+        """
+        i = self._order[index]
+        return i + 1, self.names[i], self.table.scores[i], self.members[i]
+
+    def top(self, k: int) -> List[Tuple[int, str, float, Optional[str]]]:
+        """현재 표시 순서의 앞쪽 k개 결과 (점수 높은 순이면 이상 점수 상위 k개)"""
+        return [self.row(index) for index in range(min(k, len(self)))]
+
+    def read_overlay(self, member: str) -> bytes:
+        """overlay 멤버의 인코딩된 이미지 바이트 (호출한 스레드의 ZipFile 핸들 사용)"""
+        return self.archive.read(member)
+
+    def load_overlay(self, loader: ThumbnailLoader, member: str, max_size: Tuple[int, int],
+                     callback: ThumbnailCallback, wanted: Optional[Callable[[], bool]] = None) -> Future:
+        """overlay 썸네일을 로더의 작업 스레드에서 디코딩 (ZIP 파일과 멤버 이름으로 캐시)"""
+        return loader.load_bytes((self.archive.signature, member), lambda: self.read_overlay(member),
+                                 max_size, callback, wanted)
+
+    def close(self):
+        """ZIP 핸들 닫기"""
+        self.archive.close()
+
+
+class OverlayGrid(ctk.CTkFrame):
+    """
+    ResultIndex를 썸네일 격자로 표시하는 가상화 위젯
+
+    VirtualImageList와 같이 Canvas에 화면에 보이는 칸 수만큼의 항목만 만들어 두고 스크롤하면 내용만 바꿉니다.
+    썸네일은 보이는 칸의 overlay만 로더에 요청하고, 디코딩 직전에 아직 보이는지 확인하므로
+    빠르게 스크롤해도 지나간 칸은 디코딩하지 않습니다. 결과는 post로 메인 스레드에 넘겨 표시합니다.
+    """
+
+    CELL_PADDING = 8
+    TEXT_HEIGHT = 34
+
+    def __init__(self, master, loader: ThumbnailLoader, post: Callable[..., Any], thumb_size: int = 128,
+                 on_select: Optional[Callable[[Tuple[int, str, float, Optional[str]]], None]] = None,
+                 height: int = 400, **kwargs):
+        """
+        Args:
+            master: 부모 위젯
+            loader: 썸네일 로더 (LRU 캐시 공유)
+            post: 작업 스레드의 콜백을 메인 스레드에서 실행하도록 넘기는 함수 (예: JobScheduler.post)
+            thumb_size: 썸네일 한 변 크기 (px)
+            on_select: 칸을 클릭했을 때 ResultIndex.row 결과로 호출할 콜백
+            height: 격자 높이 (px)
+        """
+        super().__init__(master, **kwargs)
+        self.loader = loader
+        self.post = post
+        self.thumb_size = thumb_size
+        self.on_select = on_select
+        self.index: Optional[ResultIndex] = None
+        self.cell_width = thumb_size + 2 * self.CELL_PADDING
+        self.cell_height = thumb_size + self.TEXT_HEIGHT + self.CELL_PADDING
+        self._top_row = 0
+        self._layout: Tuple[int, int] = (0, 0)        # (열 수, 행 수)
+        self._cells: List[Tuple[int, int, int]] = []  # 칸별 (테두리, 이미지, 텍스트) 항목
+        self._selected: Optional[int] = None
+
+        # 메인 스레드 전용: 보이는 칸의 PhotoImage, 요청 중인 멤버, 읽지 못한 멤버 (다시 요청하지 않음)
+        self._photos: Dict[str, ImageTk.PhotoImage] = {}
+        self._pending = set()
+        self._failed = set()
+        # 작업 스레드가 읽는 보이는 멤버 집합 (메인 스레드가 통째로 교체)
+        self._wanted = frozenset()
+
+        header = ctk.CTkFrame(self, fg_color="transparent")
+        header.pack(fill="x", padx=5, pady=(5, 0))
+
+        self.summary_label = ctk.CTkLabel(header, text="결과 없음", font=("Arial", 12))
+        self.summary_label.pack(side="left")
+
+        self.filter_entry = ctk.CTkEntry(header, width=160, placeholder_text="파일명 필터")
+        self.filter_entry.pack(side="right")
+        self.filter_entry.bind("<KeyRelease>", lambda e: self.apply_filter())
+
+        self.sort_menu = ctk.CTkOptionMenu(header, values=list(SORT_OPTIONS), width=130,
+                                           command=lambda value: self.apply_sort())
+        self.sort_menu.set(SORT_SCORE_DESC)
+        self.sort_menu.pack(side="right", padx=5)
+
+        body = ctk.CTkFrame(self, fg_color="transparent")
+        body.pack(fill="both", expand=True, padx=5, pady=5)
+
+        self.scrollbar = ctk.CTkScrollbar(body, command=self._on_scrollbar)
+        self.scrollbar.pack(side="right", fill="y")
+
+        self.canvas = tk.Canvas(body, height=height, highlightthickness=0, borderwidth=0,
+                                bg=self._apply_appearance_mode(ctk.ThemeManager.theme["CTkTextbox"]["fg_color"]))
+        self.canvas.pack(side="left", fill="both", expand=True)
+        self._text_color = self._apply_appearance_mode(ctk.ThemeManager.theme["CTkTextbox"]["text_color"])
+
+        self.canvas.bind("<Configure>", lambda e: self.render())
+        self.canvas.bind("<Button-1>", self._on_click)
+        for widget in (self.canvas, body):
+            widget.bind("<MouseWheel>", self._on_mousewheel)
+            widget.bind("<Button-4>", lambda e: self.scroll_rows(-1))
+            widget.bind("<Button-5>", lambda e: self.scroll_rows(1))
+
+        self.render()
+
+    def set_index(self, index: Optional[ResultIndex]):
+        """표시할 결과 인덱스 지정 (현재 정렬/필터 설정을 적용)"""
+        self.index = index
+        self._photos.clear()
+        self._pending.clear()
+        self._failed.clear()
+        self._wanted = frozenset()
+        self._selected = None
+        if index is not None:
+            index.set_sort(self.sort_menu.get())
+            index.set_filter(self.filter_entry.get())
+        self._top_row = 0
+        self.render()
+
+    def apply_sort(self):
+        if self.index is not None:
+            self.index.set_sort(self.sort_menu.get())
+        self._selected = None
+        self._top_row = 0
+        self.render()
+
+    def apply_filter(self):
+        if self.index is not None:
+            self.index.set_filter(self.filter_entry.get())
+        self._selected = None
+        self._top_row = 0
+        self.render()
+
+    def grid_shape(self) -> Tuple[int, int]:
+        """캔버스 크기에 맞는 (열 수, 보이는 행 수) (아래쪽에 일부만 보이는 행 포함)"""
+        columns = max(1, self.canvas.winfo_width() // self.cell_width)
+        rows = max(1, -(-self.canvas.winfo_height() // self.cell_height))
+        return columns, rows
+
+    def scroll_rows(self, delta: int):
+        self._top_row += delta
+        self.render()
+
+    def _on_mousewheel(self, event):
+        # Windows는 한 칸에 120, macOS는 1 단위
+        step = event.delta // 120 if abs(event.delta) >= 120 else event.delta
+        self.scroll_rows(-step)
+
+    def _on_scrollbar(self, action, value, unit=None):
+        columns, rows = self.grid_shape()
+        total_rows = -(-len(self.index) // columns) if self.index is not None else 0
+        if action == "moveto":
+            self._top_row = int(float(value) * total_rows)
+        elif action == "scroll":
+            self._top_row += int(value) * (rows if unit == "pages" else 1)
+        self.render()
+
+    def _on_click(self, event):
+        if self.index is None:
+            return
+        columns, _ = self.grid_shape()
+        column = int(self.canvas.canvasx(event.x)) // self.cell_width
+        row = int(self.canvas.canvasy(event.y)) // self.cell_height
+        if column >= columns:
+            return
+        index = (self._top_row + row) * columns + column
+        if index >= len(self.index):
+            return
+        self._selected = index
+        self.render()
+        if self.on_select:
+            self.on_select(self.index.row(index))
+
+    def _rebuild_cells(self, columns: int, rows: int):
+        """창 크기가 바뀌어 격자 모양이 달라졌을 때 칸 항목을 다시 만듦"""
+        self.canvas.delete("all")
+        self._cells = []
+        for slot in range(columns * rows):
+            x = (slot % columns) * self.cell_width + self.CELL_PADDING
+            y = (slot // columns) * self.cell_height + self.CELL_PADDING // 2
+            border = self.canvas.create_rectangle(x - 3, y - 3, x + self.thumb_size + 3, y + self.thumb_size + 3,
+                                                  outline="", width=2)
+            image = self.canvas.create_image(x + self.thumb_size // 2, y + self.thumb_size // 2, anchor="center")
+            text = self.canvas.create_text(x, y + self.thumb_size + 4, anchor="nw", fill=self._text_color,
+                                           font=("Arial", 10), width=self.thumb_size)
+            self._cells.append((border, image, text))
+        self._layout = (columns, rows)
+
+    def render(self):
+        """현재 스크롤 위치에서 보이는 칸만 다시 그리고, 썸네일이 없는 칸의 overlay를 요청"""
+        columns, rows = self.grid_shape()
+        if (columns, rows) != self._layout:
+            self._rebuild_cells(columns, rows)
+
+        count = len(self.index) if self.index is not None else 0
+        total_rows = -(-count // columns)
+        full_rows = max(1, self.canvas.winfo_height() // self.cell_height)
+        self._top_row = max(0, min(self._top_row, total_rows - full_rows))
+
+        first = self._top_row * columns
+        visible = []
+        for slot, (border, image, text) in enumerate(self._cells):
+            index = first + slot
+            if index >= count:
+                self.canvas.itemconfigure(border, outline="")
+                self.canvas.itemconfigure(image, image="")
+                self.canvas.itemconfigure(text, text="")
+                continue
+
+            _, name, score, member = self.index.row(index)
+            label = f"{index + 1}. {name}\n{score:.4f}"
+            self.canvas.itemconfigure(border, outline="#2196F3" if index == self._selected else "")
+            if member is None:
+                self.canvas.itemconfigure(image, image="")
+                self.canvas.itemconfigure(text, text=label + " (overlay 없음)")
+                continue
+            if member in self._failed:
+                self.canvas.itemconfigure(image, image="")
+                self.canvas.itemconfigure(text, text=label + " (overlay 읽기 실패)")
+                continue
+            self.canvas.itemconfigure(text, text=label)
+            visible.append(member)
+            self.canvas.itemconfigure(image, image=self._photos.get(member, ""))
+
+        # 화면에서 벗어난 칸의 PhotoImage와 요청 표시는 버림 (대기 중인 요청은 디코딩 직전에 건너뜀)
+        wanted = frozenset(visible)
+        self._wanted = wanted
+        self._photos = {member: photo for member, photo in self._photos.items() if member in wanted}
+        self._pending &= wanted
+
+        index = self.index
+        for member in visible:
+            if member in self._photos or member in self._pending:
+                continue
+            self._pending.add(member)
+            index.load_overlay(
+                self.loader, member, (self.thumb_size, self.thumb_size),
+                lambda thumbnail, error, member=member: self.post(self._show_thumbnail, index, member,
+                                                                  thumbnail, error),
+                wanted=lambda member=member: member in self._wanted
+            )
+
+        if total_rows:
+            self.scrollbar.set(self._top_row / total_rows, min(1.0, (self._top_row + full_rows) / total_rows))
+        else:
+            self.scrollbar.set(0.0, 1.0)
+
+        if self.index is None:
+            summary = "결과 없음"
+        else:
+            summary = f"총 {self.index.total}개"
+            if count != self.index.total:
+                summary += f" (필터: {count}개)"
+        self.summary_label.configure(text=summary)
+
+    def _show_thumbnail(self, index: ResultIndex, member: str, thumbnail, error: Optional[str]):
+        """디코딩된 썸네일을 보이는 칸에 표시 (메인 스레드에서 호출)"""
+        if index is not self.index or member not in self._wanted:
+            return  # 다른 ZIP을 열었거나 스크롤로 화면에서 벗어남
+        self._pending.discard(member)
+        if error:
+            # 실패한 칸은 다시 그려서 라벨에 표시
+            self._failed.add(member)
+            self.render()
+            return
+
+        photo = ImageTk.PhotoImage(thumbnail)
+        self._photos[member] = photo
+        first = self._top_row * self._layout[0]
+        for slot, (_, image, _) in enumerate(self._cells):
+            if first + slot < len(index) and index.row(first + slot)[3] == member:
+                self.canvas.itemconfigure(image, image=photo)
@@ -0,0 +1,177 @@
+"""
+추론 결과(anomaly score, overlay)를 위한 내용 주소 기반 디스크 캐시
+"""
+import hashlib
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from typing import NamedTuple, Optional
+
+
+class CacheEntry(NamedTuple):
+    """캐시된 추론 결과"""
+    score: float
+    overlay_name: Optional[str]   # 결과 ZIP 안에서의 overlay 멤버 이름 (예: overlays/img1.png)
+    overlay_path: Optional[str]   # 캐시 디렉터리에 저장된 overlay 파일 경로
+
+
+class ResultCache:
+    """
+    이미지 내용 해시 + 서버 URL + 모델 버전을 키로 하는 추론 결과 캐시
+
+    점수는 SQLite 인덱스에, overlay 이미지는 키 이름의 파일로 저장합니다.
+    overlay 전체 크기가 max_bytes를 넘으면 가장 오래 사용하지 않은 항목부터 삭제합니다 (LRU).
+    여러 스레드에서 동시에 사용할 수 있습니다.
+    """
+
+    def __init__(self, cache_dir: str, max_bytes: int = 1024 * 1024 * 1024,
+                 model_version: str = "default", store_overlays: bool = True):
+        """
+        Args:
+            cache_dir: 캐시 디렉터리 (없으면 생성)
+            max_bytes: overlay 파일 전체 크기 상한 (바이트)
+            model_version: 모델 버전 태그 (바뀌면 이전 결과는 사용되지 않음)
+            store_overlays: False이면 점수만 캐시
+        """
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.model_version = model_version
+        self.store_overlays = store_overlays
+
+        self._overlay_dir = os.path.join(cache_dir, 'overlays')
+        os.makedirs(self._overlay_dir, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(os.path.join(cache_dir, 'index.sqlite3'), check_same_thread=False)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS entries ("
+            "key TEXT PRIMARY KEY, score REAL NOT NULL, overlay_name TEXT, overlay_file TEXT, "
+            "size INTEGER NOT NULL DEFAULT 0, last_access REAL NOT NULL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS idx_last_access ON entries(last_access)")
+        self._db.commit()
+
+        self._total_bytes = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+
+    def key_for(self, image_path: str, base_url: str) -> str:
+        """이미지 내용과 서버 URL, 모델 버전으로 캐시 키 계산"""
+        digest = hashlib.sha256()
+        digest.update(f"{base_url}\0{self.model_version}\0".encode('utf-8'))
+        with open(image_path, 'rb') as f:
+            for block in iter(lambda: f.read(1024 * 1024), b''):
+                digest.update(block)
+        return digest.hexdigest()
+
+    def get(self, key: str, require_overlay: bool = False) -> Optional[CacheEntry]:
+        """
+        캐시 조회 (조회된 항목은 최근 사용으로 갱신)
+
+        Args:
+            key: key_for로 계산한 캐시 키
+            require_overlay: True이면 overlay가 없는 항목은 miss로 처리
+
+        Returns:
+            CacheEntry 또는 None
+        """
+        with self._lock:
+            row = self._db.execute(
+                "SELECT score, overlay_name, overlay_file FROM entries WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+
+            score, overlay_name, overlay_file = row
+            overlay_path = os.path.join(self._overlay_dir, overlay_file) if overlay_file else None
+            if overlay_path and not os.path.exists(overlay_path):
+                overlay_name = overlay_path = None
+            if require_overlay and overlay_path is None:
+                return None
+
+            self._db.execute("UPDATE entries SET last_access = ? WHERE key = ?", (time.time(), key))
+            self._db.commit()
+            return CacheEntry(score, overlay_name, overlay_path)
+
+    def put(self, key: str, score: float, overlay_name: Optional[str] = None,
+            overlay_data: Optional[bytes] = None):
+        """
+        추론 결과 저장
+
+        Args:
+            key: key_for로 계산한 캐시 키
+            score: anomaly score
+            overlay_name: 결과 ZIP 안에서의 overlay 멤버 이름
+            overlay_data: overlay 이미지 바이트 (store_overlays가 False이면 무시)
+        """
+        overlay_file = None
+        size = 0
+        if self.store_overlays and overlay_data is not None and overlay_name:
+            overlay_file = key + os.path.splitext(overlay_name)[1]
+            # 같은 키를 여러 스레드가 동시에 저장해도 서로의 임시 파일을 건드리지 않도록 호출마다 다른 이름 사용
+            fd, temp_path = tempfile.mkstemp(suffix='.tmp', prefix=key + '.', dir=self._overlay_dir)
+            try:
+                with os.fdopen(fd, 'wb') as f:
+                    f.write(overlay_data)
+                os.replace(temp_path, os.path.join(self._overlay_dir, overlay_file))
+            except BaseException:
+                if os.path.exists(temp_path):
+                    os.remove(temp_path)
+                raise
+            size = len(overlay_data)
+        else:
+            overlay_name = None
+
+        with self._lock:
+            old = self._db.execute("SELECT size FROM entries WHERE key = ?", (key,)).fetchone()
+            if old:
+                self._total_bytes -= old[0]
+            self._db.execute(
+                "INSERT OR REPLACE INTO entries (key, score, overlay_name, overlay_file, size, last_access) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (key, score, overlay_name, overlay_file, size, time.time())
+            )
+            self._total_bytes += size
+            self._evict()
+            self._db.commit()
+
+    def _evict(self):
+        """overlay 전체 크기가 max_bytes 이하가 될 때까지 오래된 항목 삭제 (lock 보유 상태에서 호출)"""
+        while self._total_bytes > self.max_bytes:
+            rows = self._db.execute(
+                "SELECT key, overlay_file, size FROM entries WHERE size > 0 ORDER BY last_access LIMIT 64"
+            ).fetchall()
+            if not rows:
+                break
+            for key, overlay_file, size in rows:
+                if overlay_file:
+                    try:
+                        os.remove(os.path.join(self._overlay_dir, overlay_file))
+                    except OSError:
+                        pass
+                self._db.execute("DELETE FROM entries WHERE key = ?", (key,))
+                self._total_bytes -= size
+                if self._total_bytes <= self.max_bytes:
+                    break
+
+    @property
+    def total_bytes(self) -> int:
+        """캐시된 overlay 전체 크기"""
+        return self._total_bytes
+
+    def clear(self):
+        """캐시 전체 삭제"""
+        with self._lock:
+            for (overlay_file,) in self._db.execute(
+                    "SELECT overlay_file FROM entries WHERE overlay_file IS NOT NULL").fetchall():
+                try:
+                    os.remove(os.path.join(self._overlay_dir, overlay_file))
+                except OSError:
+                    pass
+            self._db.execute("DELETE FROM entries")
+            self._db.commit()
+            self._total_bytes = 0
+
+    def close(self):
+        with self._lock:
+            self._db.close()
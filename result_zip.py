@@ -0,0 +1,311 @@
+"""
+배치 추론 결과 ZIP (overlays + scores.csv) 처리 유틸리티
+"""
+import csv
+import io
+import os
+import shutil
+import tempfile
+import threading
+import zipfile
+from array import array
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+SCORES_CSV = 'scores.csv'
+
+# scores.csv에서 이미지 경로/점수로 인식하는 컬럼 이름 (앞쪽이 우선)
+PATH_COLUMNS = ('img_path', 'filename', 'image', 'file_name', 'image_name')
+SCORE_COLUMNS = ('anomaly_score', 'score', 'anomaly')
+
+
+def resolve_score_columns(fieldnames: Optional[Sequence[str]]) -> Tuple[str, str]:
+    """
+    scores.csv 헤더에서 (이미지 경로 컬럼, 점수 컬럼) 이름 결정
+
+    인식할 수 있는 컬럼이 없으면 기본 이름(img_path, anomaly_score)을 반환합니다.
+    """
+    fieldnames = fieldnames or []
+    path_column = next((c for c in PATH_COLUMNS if c in fieldnames), PATH_COLUMNS[0])
+    score_column = next((c for c in SCORE_COLUMNS if c in fieldnames), SCORE_COLUMNS[0])
+    return path_column, score_column
+
+
+class ScoreTable:
+    """
+    scores.csv 내용을 담는 배열 기반 점수 테이블
+
+    점수는 array('d')에, 경로는 행 순서대로 리스트에 저장합니다.
+    파일명(basename) 인덱스는 첫 행 번호만 dict에 두고 같은 파일명의 다음 행은
+    array('l') 연결 리스트로 이어 두므로, 파일명이 겹치는 행도 합쳐지지 않고 O(1)로 찾을 수 있습니다.
+    """
+
+    def __init__(self, path_column: str = 'img_path', score_column: str = 'anomaly_score'):
+        self.path_column = path_column
+        self.score_column = score_column
+        self.paths: List[str] = []          # scores.csv에 기록된 경로 (행 순서)
+        self.scores = array('d')            # 행별 anomaly score
+        self._first: Dict[str, int] = {}    # 파일명 -> 첫 행
+        self._last: Dict[str, int] = {}     # 파일명 -> 마지막 행 (추가용)
+        self._next = array('l')             # 같은 파일명의 다음 행 (-1이면 없음)
+
+    def __len__(self) -> int:
+        return len(self.scores)
+
+    def append(self, img_path: str, score: float):
+        """행 추가"""
+        row = len(self.scores)
+        name = os.path.basename(img_path)
+
+        self.paths.append(img_path)
+        self.scores.append(score)
+        self._next.append(-1)
+
+        last = self._last.get(name)
+        if last is None:
+            self._first[name] = row
+        else:
+            self._next[last] = row
+        self._last[name] = row
+
+    def rows_for(self, filename: str) -> List[int]:
+        """파일명(basename)이 같은 모든 행 번호"""
+        rows = []
+        row = self._first.get(os.path.basename(filename), -1)
+        while row != -1:
+            rows.append(row)
+            row = self._next[row]
+        return rows
+
+    def score_of(self, filename: str) -> Optional[float]:
+        """파일명의 첫 번째 점수 (없으면 None)"""
+        row = self._first.get(os.path.basename(filename))
+        return None if row is None else self.scores[row]
+
+    def match(self, image_paths: Iterable[str]) -> List[Optional[int]]:
+        """
+        입력 이미지 경로들을 scores.csv 행에 대응
+
+        서버에는 파일명만 전송되므로 파일명이 같은 이미지가 여러 개면
+        전송 순서대로 같은 파일명의 행을 하나씩 배정합니다 (n번째 이미지 -> n번째 행).
+
+        Returns:
+            이미지별 행 번호 리스트 (대응하는 행이 없으면 None)
+        """
+        cursor: Dict[str, int] = {}   # 파일명 -> 다음에 배정할 행
+        rows = []
+        for img_path in image_paths:
+            name = os.path.basename(img_path)
+            row = cursor.get(name, self._first.get(name, -1))
+            if row == -1:
+                rows.append(None)
+                cursor[name] = -1
+            else:
+                rows.append(row)
+                cursor[name] = self._next[row]
+        return rows
+
+
+def read_score_table(zip_ref: zipfile.ZipFile) -> ScoreTable:
+    """
+    결과 ZIP의 scores.csv를 멤버에서 직접 스트리밍으로 읽어 ScoreTable 생성
+
+    경로/점수 컬럼은 헤더에서 한 번만 결정합니다.
+    경로가 비어 있는 행은 건너뛰고, 점수를 변환할 수 없으면 0.0으로 처리합니다.
+
+    Raises:
+        KeyError: ZIP에 scores.csv가 없는 경우
+    """
+    with zip_ref.open(SCORES_CSV) as raw:
+        reader = csv.reader(io.TextIOWrapper(raw, encoding='utf-8', newline=''))
+        fieldnames = next(reader, [])
+        path_column, score_column = resolve_score_columns(fieldnames)
+        path_index = fieldnames.index(path_column) if path_column in fieldnames else -1
+        score_index = fieldnames.index(score_column) if score_column in fieldnames else -1
+
+        table = ScoreTable(path_column, score_column)
+        if path_index < 0:
+            return table
+
+        for row in reader:
+            if len(row) <= path_index or not row[path_index]:
+                continue
+            try:
+                score = float(row[score_index]) if 0 <= score_index < len(row) and row[score_index] else 0.0
+            except ValueError:
+                score = 0.0
+            table.append(row[path_index], score)
+
+    return table
+
+
+def find_overlay_members(zip_ref: zipfile.ZipFile) -> dict:
+    """
+    결과 ZIP의 overlay 멤버를 {파일명 stem: 멤버 이름}으로 반환
+
+    서버는 입력 파일명의 stem을 유지한 채 확장자만 바꿔 overlay를 저장하므로
+    입력 이미지와 overlay를 stem으로 연결합니다.
+    """
+    members = {}
+    for info in zip_ref.infolist():
+        if info.is_dir() or info.filename == SCORES_CSV:
+            continue
+        stem = os.path.splitext(os.path.basename(info.filename))[0]
+        members.setdefault(stem, info.filename)
+    return members
+
+
+class ThreadLocalZip:
+    """
+    스레드마다 자기 ZipFile 핸들로 멤버를 읽는 읽기 전용 결과 ZIP
+
+    ZipFile 하나를 여러 스레드가 공유하면 파일 위치 이동과 읽기가 lock으로 직렬화되므로,
+    스레드별로 핸들을 따로 열어 멤버를 동시에 읽습니다.
+    중앙 디렉터리는 스레드(작업자)당 처음 한 번만 읽고 이후에는 같은 핸들을 재사용합니다.
+    """
+
+    def __init__(self, zip_path: str):
+        """
+        Args:
+            zip_path: 결과 ZIP 경로
+        """
+        stat = os.stat(zip_path)
+        self.zip_path = os.path.abspath(zip_path)
+        # 같은 경로의 ZIP이 다시 저장되면 달라지는 식별자 (썸네일 캐시 키 등)
+        self.signature = (self.zip_path, stat.st_mtime_ns, stat.st_size)
+        self._local = threading.local()
+        self._handles: List[zipfile.ZipFile] = []
+        self._lock = threading.Lock()
+        self._closed = False
+
+    def handle(self) -> zipfile.ZipFile:
+        """현재 스레드의 ZipFile 핸들 (처음 호출할 때 열림)"""
+        zip_ref = getattr(self._local, 'zip_ref', None)
+        if zip_ref is None:
+            zip_ref = zipfile.ZipFile(self.zip_path, 'r')
+            with self._lock:
+                if self._closed:
+                    zip_ref.close()
+                    raise ValueError("이미 닫힌 ZIP입니다")
+                self._handles.append(zip_ref)
+            self._local.zip_ref = zip_ref
+        return zip_ref
+
+    def read(self, member: str) -> bytes:
+        """멤버 내용 전체 읽기 (현재 스레드의 핸들 사용)"""
+        return self.handle().read(member)
+
+    def close(self):
+        """모든 스레드의 핸들 닫기 (이후 handle()/read()는 ValueError)"""
+        with self._lock:
+            self._closed = True
+            handles, self._handles = self._handles, []
+        for zip_ref in handles:
+            zip_ref.close()
+
+
+def write_result_zip(output_path: str, rows: List[Tuple[str, float]],
+                     overlays: List[Tuple[str, str]], header: Tuple[str, str] = ('img_path', 'anomaly_score')):
+    """
+    (파일명, 점수) 행과 overlay 파일들로 배치 결과와 같은 형식의 ZIP 생성
+
+    Args:
+        output_path: 저장할 ZIP 경로
+        rows: scores.csv에 기록할 (이미지 경로, 점수) 리스트
+        overlays: (ZIP 안에서의 멤버 이름, 디스크의 파일 경로) 리스트
+        header: scores.csv의 (경로 컬럼, 점수 컬럼) 이름
+    """
+    with zipfile.ZipFile(output_path, 'w', zipfile.ZIP_STORED) as out_zip:
+        for member_name, file_path in overlays:
+            try:
+                out_zip.write(file_path, member_name)
+            except FileNotFoundError:
+                # 캐시 정리 등으로 overlay가 사라진 경우 점수만 기록
+                continue
+
+        with out_zip.open(SCORES_CSV, 'w') as dst:
+            text = io.TextIOWrapper(dst, encoding='utf-8', newline='')
+            writer = csv.writer(text)
+            writer.writerow(header)
+            writer.writerows(rows)
+            text.flush()
+            text.detach()
+
+
+def merge_result_zips(zip_paths: List[str], output_path: str) -> int:
+    """
+    여러 배치 결과 ZIP을 하나로 병합
+
+    overlay 등 scores.csv 이외의 멤버는 순서대로 스트리밍 복사하되, 압축을 풀어 원본과 같은
+    compress_type으로 다시 압축합니다 (원본 압축 데이터를 그대로 옮기지는 않음).
+    각 ZIP의 scores.csv는 첫 번째 ZIP의 헤더 기준으로 하나의 scores.csv로 합칩니다.
+    같은 이름의 멤버가 여러 ZIP에 있으면 먼저 나온 것만 유지합니다.
+    결과는 임시 파일에 기록한 뒤 output_path로 원자적으로 교체합니다.
+
+    Args:
+        zip_paths: 병합할 결과 ZIP 경로 리스트 (이 순서대로 병합)
+        output_path: 병합 결과 ZIP 저장 경로
+
+    Returns:
+        병합된 scores.csv의 데이터 행 수
+    """
+    output_dir = os.path.dirname(os.path.abspath(output_path))
+    fd, temp_path = tempfile.mkstemp(prefix='.merge-', suffix='.zip', dir=output_dir)
+    os.close(fd)
+
+    # scores.csv는 멤버를 복사하는 동안 임시 파일에 모아둠 (행 수가 많아도 메모리 사용량 일정)
+    csv_buffer = tempfile.TemporaryFile(mode='w+', newline='', encoding='utf-8')
+    row_count = 0
+
+    try:
+        with zipfile.ZipFile(temp_path, 'w', zipfile.ZIP_DEFLATED) as out_zip:
+            written = set()
+            writer = None
+
+            for zip_path in zip_paths:
+                with zipfile.ZipFile(zip_path, 'r') as src_zip:
+                    for info in src_zip.infolist():
+                        if info.filename == SCORES_CSV:
+                            with src_zip.open(info) as raw:
+                                reader = csv.DictReader(io.TextIOWrapper(raw, encoding='utf-8', newline=''))
+                                if writer is None:
+                                    writer = csv.DictWriter(csv_buffer, fieldnames=reader.fieldnames or [],
+                                                            extrasaction='ignore')
+                                    writer.writeheader()
+                                for row in reader:
+                                    writer.writerow(row)
+                                    row_count += 1
+                            continue
+
+                        if info.filename in written:
+                            continue
+                        written.add(info.filename)
+
+                        # 원본의 압축 방식/시간 정보를 유지한 채 스트리밍 복사 (압축 해제 후 같은 방식으로 재압축)
+                        new_info = zipfile.ZipInfo(info.filename, info.date_time)
+                        new_info.compress_type = info.compress_type
+                        new_info.external_attr = info.external_attr
+                        if info.is_dir():
+                            out_zip.writestr(new_info, b'')
+                            continue
+                        with src_zip.open(info) as src, out_zip.open(new_info, 'w') as dst:
+                            shutil.copyfileobj(src, dst, 1024 * 1024)
+
+            if writer is not None:
+                csv_buffer.seek(0)
+                with out_zip.open(SCORES_CSV, 'w') as dst:
+                    encoded = io.TextIOWrapper(dst, encoding='utf-8', newline='')
+                    shutil.copyfileobj(csv_buffer, encoded, 1024 * 1024)
+                    encoded.flush()
+                    encoded.detach()
+
+        os.replace(temp_path, output_path)
+    except BaseException:
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+        raise
+    finally:
+        csv_buffer.close()
+
+    return row_count
@@ -0,0 +1,293 @@
+"""
+대용량 배치 요청을 위한 스트리밍 업로드/다운로드 유틸리티
+"""
+import itertools
+import os
+import tempfile
+import time
+import uuid
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+# (지금까지 처리한 바이트 수, 전체 바이트 수 또는 None)
+ProgressCallback = Callable[[int, Optional[int]], None]
+
+# 배치 요청 진행 단계 (업로드 → 서버 처리 대기 → 결과 다운로드 → 종료)
+PHASE_UPLOAD = 'upload'
+PHASE_WAITING = 'waiting'
+PHASE_DOWNLOAD = 'download'
+PHASE_DONE = 'done'
+
+# 단계별 진행 이벤트 콜백 (TransferProgress 참고)
+TransferCallback = Callable[[Dict[str, Any]], None]
+
+
+def _quote_param(value: str) -> str:
+    """multipart 헤더 파라미터 값 이스케이프 (HTML5 방식, urllib3와 동일)"""
+    replacements = {'"': '%22', '\\': '\\\\'}
+    replacements.update({chr(c): f'%{c:02X}' for c in range(0x20) if c != 0x1B})
+    return ''.join(replacements.get(ch, ch) for ch in value)
+
+
+class MultipartFileStream:
+    """
+    multipart/form-data 본문을 전송 시점에 디스크에서 조금씩 읽어 만드는 file-like 객체
+
+    requests에 data=로 넘기면 전체 길이(__len__)로 Content-Length가 설정되고,
+    본문은 read() 호출마다 필요한 만큼만 파일에서 읽어 보냅니다.
+    한 번에 열려 있는 파일은 하나뿐이므로 배치 크기와 무관하게 메모리 사용량이 일정합니다.
+    """
+
+    def __init__(self, fields: List[Tuple[str, str, str, str]],
+                 progress_callback: Optional[ProgressCallback] = None,
+                 chunk_size: int = 64 * 1024):
+        """
+        Args:
+            fields: (필드 이름, 전송할 파일명, 파일 경로, Content-Type) 리스트
+            progress_callback: 업로드 진행 콜백 (전송한 바이트 수, 전체 바이트 수)
+            chunk_size: 반복(iter) 시 한 번에 읽을 바이트 수
+        """
+        self.boundary = uuid.uuid4().hex
+        self.content_type = f"multipart/form-data; boundary={self.boundary}"
+        self.progress_callback = progress_callback
+        self.chunk_size = chunk_size
+
+        # 본문 구성 요소: bytes(헤더/구분자) 또는 (파일 경로, 파일 크기)
+        self._segments = []
+        for field_name, filename, file_path, content_type in fields:
+            header = (
+                f'--{self.boundary}\r\n'
+                f'Content-Disposition: form-data; name="{_quote_param(field_name)}"; '
+                f'filename="{_quote_param(filename)}"\r\n'
+                f'Content-Type: {content_type}\r\n\r\n'
+            ).encode('utf-8')
+            self._segments.append(header)
+            self._segments.append((file_path, os.path.getsize(file_path)))
+            self._segments.append(b'\r\n')
+        self._segments.append(f'--{self.boundary}--\r\n'.encode('utf-8'))
+
+        self._total = sum(len(seg) if isinstance(seg, bytes) else seg[1] for seg in self._segments)
+        self._index = 0      # 현재 구성 요소 위치
+        self._offset = 0     # 현재 구성 요소 내 위치
+        self._file = None    # 현재 읽고 있는 파일 핸들
+        self._sent = 0
+
+    def __len__(self) -> int:
+        return self._total
+
+    @property
+    def bytes_sent(self) -> int:
+        return self._sent
+
+    def read(self, size: int = -1) -> bytes:
+        """최대 size 바이트를 읽어 반환 (size < 0이면 남은 전체)"""
+        remaining = self._total - self._sent if size is None or size < 0 else size
+        out = bytearray()
+
+        while remaining > 0 and self._index < len(self._segments):
+            segment = self._segments[self._index]
+
+            if isinstance(segment, bytes):
+                piece = segment[self._offset:self._offset + remaining]
+                self._offset += len(piece)
+                if self._offset >= len(segment):
+                    self._advance()
+            else:
+                file_path, file_size = segment
+                if self._file is None:
+                    self._file = open(file_path, 'rb')
+                piece = self._file.read(min(remaining, file_size - self._offset))
+                if not piece:
+                    raise IOError(f"업로드 중 파일 크기가 변경되었습니다: {file_path}")
+                self._offset += len(piece)
+                if self._offset >= file_size:
+                    self._advance()
+
+            out += piece
+            remaining -= len(piece)
+
+        if out:
+            self._sent += len(out)
+            if self.progress_callback:
+                self.progress_callback(self._sent, self._total)
+
+        return bytes(out)
+
+    def _advance(self):
+        """다음 구성 요소로 이동 (열린 파일은 닫음)"""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        self._index += 1
+        self._offset = 0
+
+    def __iter__(self) -> Iterator[bytes]:
+        while True:
+            chunk = self.read(self.chunk_size)
+            if not chunk:
+                return
+            yield chunk
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+def download_to_file(response, output_path: str,
+                     progress_callback: Optional[ProgressCallback] = None,
+                     chunk_size: int = 1024 * 1024) -> int:
+    """
+    stream=True로 받은 응답 본문을 고정 크기 청크로 임시 파일에 기록한 뒤 output_path로 원자적 교체
+
+    다운로드 도중 실패하면 임시 파일을 지우므로 output_path에 깨진 ZIP이 남지 않습니다.
+
+    Args:
+        response: stream=True로 요청한 requests.Response
+        output_path: 최종 저장 경로
+        progress_callback: 다운로드 진행 콜백 (받은 바이트 수, Content-Length 또는 None)
+        chunk_size: 한 번에 기록할 바이트 수
+
+    Returns:
+        받은 전체 바이트 수
+    """
+    content_length = response.headers.get('Content-Length')
+    total = int(content_length) if content_length and content_length.isdigit() else None
+
+    # 같은 디렉터리에 임시 파일을 만들어야 os.replace가 원자적으로 동작함
+    output_dir = os.path.dirname(os.path.abspath(output_path))
+    fd, temp_path = tempfile.mkstemp(prefix='.download-', suffix='.part', dir=output_dir)
+
+    received = 0
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            for chunk in response.iter_content(chunk_size=chunk_size):
+                if not chunk:
+                    continue
+                f.write(chunk)
+                received += len(chunk)
+                if progress_callback:
+                    progress_callback(received, total)
+
+        os.replace(temp_path, output_path)
+    except BaseException:
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+        raise
+
+    return received
+
+
+class TransferProgress:
+    """
+    요청 하나의 업로드 → 서버 처리 대기 → 다운로드 진행 상황을 단계별 이벤트로 전달
+
+    upload/download를 ProgressCallback으로 넘기면 바이트 단위 진행을 받아
+    단계 시작 이후 평균 처리량과 남은 시간을 계산해 callback에 다음 dict로 전달합니다.
+        {'request': 요청 번호, 'phase': PHASE_*, 'bytes': 처리한 바이트 수, 'total': 전체 바이트 수 또는 None,
+         'rate': 바이트/초 또는 None, 'eta': 남은 초 또는 None, 'elapsed': 단계 경과 초,
+         'error': 에러 메시지 (PHASE_DONE만)}
+
+    단계가 바뀔 때와 끝날 때는 항상 전달하고, 그 사이에는 interval초에 한 번만 전달합니다.
+    시간 확인도 check_bytes를 처리할 때마다 한 번만 하므로 작은 블록으로 자주 호출되어도 부담이 거의 없습니다.
+    업로드를 처음부터 다시 보내면 (다른 서버로 재전송) 업로드 단계를 새로 시작합니다.
+    """
+
+    _request_ids = itertools.count(1)
+
+    def __init__(self, callback: TransferCallback, interval: float = 0.1, check_bytes: int = 256 * 1024):
+        """
+        Args:
+            callback: 진행 이벤트 콜백 (전송 중인 스레드에서 호출)
+            interval: 같은 단계에서 이벤트를 전달하는 최소 간격 (초)
+            check_bytes: 전달 간격을 확인하는 바이트 단위
+        """
+        self.request = next(self._request_ids)
+        self.callback = callback
+        self.interval = interval
+        self.check_bytes = check_bytes
+
+        self.phase: Optional[str] = None
+        self._started = 0.0
+        self._bytes = 0
+        self._total: Optional[int] = None
+        self._next_check = 0
+        self._next_emit = 0.0
+
+    def _begin(self, phase: str, total: Optional[int]):
+        self.phase = phase
+        self._started = time.monotonic()
+        self._bytes = 0
+        self._total = total
+        self._next_check = self.check_bytes
+        self._emit(self._started)
+
+    def _emit(self, now: float, error: Optional[str] = None):
+        self._next_emit = now + self.interval
+        elapsed = now - self._started
+        rate = self._bytes / elapsed if elapsed > 0 and self._bytes else None
+        eta = None
+        if self._total is not None and rate:
+            eta = max(0, self._total - self._bytes) / rate
+
+        event = {'request': self.request, 'phase': self.phase, 'bytes': self._bytes, 'total': self._total,
+                 'rate': rate, 'eta': eta, 'elapsed': elapsed}
+        if self.phase == PHASE_DONE:
+            event['error'] = error
+        self.callback(event)
+
+    def _advance(self, done: int):
+        """진행 바이트 반영 (check_bytes마다 시간을 확인해 interval이 지났으면 전달)"""
+        self._bytes = done
+        if done < self._next_check:
+            return
+        self._next_check = done + self.check_bytes
+        now = time.monotonic()
+        if now >= self._next_emit:
+            self._emit(now)
+
+    def upload(self, sent: int, total: Optional[int]):
+        """업로드 진행 (MultipartFileStream의 progress_callback)"""
+        if self.phase != PHASE_UPLOAD or sent < self._bytes:
+            self._begin(PHASE_UPLOAD, total)
+        self._advance(sent)
+
+        if total is not None and sent >= total:
+            self._emit(time.monotonic())
+            self._begin(PHASE_WAITING, None)
+
+    def download(self, received: int, total: Optional[int]):
+        """다운로드 진행 (download_to_file의 progress_callback)"""
+        if self.phase != PHASE_DOWNLOAD:
+            self._begin(PHASE_DOWNLOAD, total)
+        self._advance(received)
+
+        if total is not None and received >= total:
+            self._emit(time.monotonic())
+
+    def finish(self, error: Optional[str] = None):
+        """요청 종료 이벤트 전달 (성공/실패 모두 한 번 호출)"""
+        self.phase = PHASE_DONE
+        self._emit(time.monotonic(), error)
+
+
+def chain_progress(*callbacks: Optional[ProgressCallback]) -> Optional[ProgressCallback]:
+    """여러 ProgressCallback을 차례로 호출하는 콜백 (None은 제외, 모두 None이면 None)"""
+    callbacks = [callback for callback in callbacks if callback is not None]
+    if not callbacks:
+        return None
+    if len(callbacks) == 1:
+        return callbacks[0]
+
+    def on_progress(done, total):
+        for callback in callbacks:
+            callback(done, total)
+
+    return on_progress
@@ -0,0 +1,75 @@
+"""
+결과 캐시를 사용하는 배치 추론 테스트 (로컬 대체 서버 사용)
+"""
+import os
+import sys
+import zipfile
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from api_client import VisionADClient  # noqa: E402
+from benchmark import StandInServer, generate_images, score_for  # noqa: E402
+from result_cache import ResultCache  # noqa: E402
+
+
+@pytest.fixture
+def server():
+    with StandInServer() as stand_in:
+        yield stand_in
+
+
+def expected_score(path):
+    with open(path, 'rb') as f:
+        return score_for(f.read())
+
+
+def test_cached_batch_keeps_upload_order_for_duplicate_basenames(server, tmp_path):
+    """hit/miss가 섞이고 파일명이 같아도 scores.csv 행이 업로드 순서를 따라 점수가 바뀌지 않음"""
+    x_images = generate_images(str(tmp_path / 'x'), 64, 2)
+    y_images = generate_images(str(tmp_path / 'y'), 64, 2)
+    client = VisionADClient(server.url, cache=ResultCache(str(tmp_path / 'cache')))
+    try:
+        # y 이미지만 캐시에 넣어 둠
+        success, error = client.inference_batch(y_images, str(tmp_path / 'warm.zip'))
+        assert success, error
+
+        # [y0 (hit), x0 (miss), x1 (miss), y1 (hit)] - y0/x0, x1/y1의 파일명이 같음
+        images = [y_images[0], x_images[0], x_images[1], y_images[1]]
+        output_path = str(tmp_path / 'mixed.zip')
+        success, error = client.inference_batch(images, output_path)
+        assert success, error
+
+        normal, abnormal = [y_images[0], x_images[1]], [x_images[0], y_images[1]]
+        result, error = client.calculate_f1_from_zip(output_path, normal, abnormal)
+        assert error is None
+        assert result['normal_scores'] == pytest.approx([expected_score(p) for p in normal])
+        assert result['abnormal_scores'] == pytest.approx([expected_score(p) for p in abnormal])
+
+        with zipfile.ZipFile(output_path) as zip_ref:
+            names = zip_ref.namelist()
+        assert sorted(names) == ['overlays/bench_64_00000.png', 'overlays/bench_64_00001.png', 'scores.csv']
+    finally:
+        client.close()
+        client.cache.close()
+
+
+def test_batch_from_single_cache_uses_server_zip_layout(server, tmp_path):
+    """단일 추론으로 캐시된 overlay도 배치 결과 ZIP에서는 overlays/ 아래에 저장됨"""
+    images = generate_images(str(tmp_path / 'images'), 64, 2)
+    client = VisionADClient(server.url, cache=ResultCache(str(tmp_path / 'cache')))
+    try:
+        _, _, error = client.inference_single(images[1])
+        assert error is None
+
+        output_path = str(tmp_path / 'result.zip')
+        success, error = client.inference_batch(images, output_path)
+        assert success, error
+
+        with zipfile.ZipFile(output_path) as zip_ref:
+            names = zip_ref.namelist()
+        assert sorted(names) == ['overlays/bench_64_00000.png', 'overlays/bench_64_00001.png', 'scores.csv']
+    finally:
+        client.close()
+        client.cache.close()
@@ -0,0 +1,29 @@
+"""
+threshold 곡선 계산 테스트
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from metrics import evaluate_threshold, threshold_sweep  # noqa: E402
+
+
+def test_sweep_includes_flag_everything_point():
+    # 모든 점수가 같으면 모두 이상으로 판정하는 지점만 F1이 0보다 큼
+    sweep = threshold_sweep([0.5], [0.5, 0.5])
+
+    assert sweep['thresholds'][0] < 0.5
+    assert sweep['best_index'] == 0
+    assert sweep['best_f1'] == evaluate_threshold([0.5], [0.5, 0.5], sweep['best_threshold'])['f1_score']
+    assert sweep['tp'][0] == 2 and sweep['fp'][0] == 1
+
+
+def test_sweep_matches_evaluate_threshold_at_every_point():
+    normal, abnormal = [0.2, 0.3, 0.3], [0.25, 0.9, 0.95]
+    sweep = threshold_sweep(normal, abnormal)
+
+    for i, threshold in enumerate(sweep['thresholds']):
+        expected = evaluate_threshold(normal, abnormal, threshold)
+        assert (sweep['tp'][i], sweep['fp'][i], sweep['tn'][i], sweep['fn'][i]) == \
+            (expected['tp'], expected['fp'], expected['tn'], expected['fn'])
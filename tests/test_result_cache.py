@@ -0,0 +1,30 @@
+"""
+결과 캐시 테스트
+"""
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from result_cache import ResultCache  # noqa: E402
+
+
+def test_concurrent_puts_of_same_key(tmp_path):
+    # 같은 이미지가 병렬 청크 두 곳에 들어가면 같은 키를 동시에 저장함
+    cache = ResultCache(str(tmp_path))
+    key = 'a' * 64
+    data = b'\x89PNG' + b'0' * 4096
+    try:
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            futures = [executor.submit(cache.put, key, 0.5, 'overlays/img.png', data) for _ in range(200)]
+            for future in futures:
+                future.result()
+
+        entry = cache.get(key, require_overlay=True)
+        assert entry is not None
+        with open(entry.overlay_path, 'rb') as f:
+            assert f.read() == data
+        assert not [name for name in os.listdir(os.path.dirname(entry.overlay_path)) if name.endswith('.tmp')]
+    finally:
+        cache.close()
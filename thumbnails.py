@@ -0,0 +1,183 @@
+"""
+GUI 미리보기용 썸네일 생성 (백그라운드 디코딩 + LRU 캐시)
+"""
+import io
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import IO, Callable, Hashable, Optional, Tuple, Union
+
+from PIL import Image
+
+ThumbnailCallback = Callable[[Optional[Image.Image], Optional[str]], None]
+
+
+def make_thumbnail(image: Image.Image, max_size: Tuple[int, int]) -> Image.Image:
+    """
+    이미지를 max_size 안에 맞도록 축소한 복사본 반환 (비율 유지)
+
+    화면에 표시할 수 있도록 RGB/RGBA/L 이외의 모드는 RGB로 변환합니다.
+    """
+    if image.mode not in ('RGB', 'RGBA', 'L'):
+        image = image.convert('RGBA' if 'A' in image.getbands() else 'RGB')
+    else:
+        image = image.copy()
+    image.thumbnail(max_size, Image.Resampling.LANCZOS)
+    return image
+
+
+def load_thumbnail(image_path: Union[str, IO[bytes]], max_size: Tuple[int, int]) -> Image.Image:
+    """
+    이미지 파일(경로 또는 파일 객체)을 열어 썸네일 생성
+
+    JPEG는 draft()로 DCT 단계에서 축소 디코딩해 큰 원본을 전부 풀지 않습니다.
+    """
+    with Image.open(image_path) as image:
+        if image.format == 'JPEG':
+            image.draft('RGB', max_size)
+        image.load()
+        return make_thumbnail(image, max_size)
+
+
+def _image_bytes(image: Image.Image) -> int:
+    return image.width * image.height * len(image.getbands())
+
+
+class ThumbnailCache:
+    """
+    (경로, 수정 시각, 파일 크기, 썸네일 크기)를 키로 하는 썸네일 LRU 캐시
+
+    픽셀 데이터 전체 크기가 max_bytes를 넘으면 가장 오래 사용하지 않은 항목부터 삭제합니다.
+    여러 스레드에서 동시에 사용할 수 있습니다.
+    """
+
+    def __init__(self, max_bytes: int = 64 * 1024 * 1024):
+        """
+        Args:
+            max_bytes: 캐시할 썸네일 픽셀 데이터 전체 크기 상한 (바이트)
+        """
+        self.max_bytes = max_bytes
+        self._entries: 'OrderedDict[Hashable, Image.Image]' = OrderedDict()
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key_for(image_path: str, max_size: Tuple[int, int]) -> Hashable:
+        """파일이 바뀌면 다른 키가 되도록 수정 시각과 크기를 포함한 캐시 키 계산"""
+        stat = os.stat(image_path)
+        return os.path.abspath(image_path), stat.st_mtime_ns, stat.st_size, tuple(max_size)
+
+    def get(self, key: Hashable) -> Optional[Image.Image]:
+        with self._lock:
+            image = self._entries.get(key)
+            if image is not None:
+                self._entries.move_to_end(key)
+            return image
+
+    def put(self, key: Hashable, image: Image.Image):
+        size = _image_bytes(image)
+        if size > self.max_bytes:
+            return
+
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._total_bytes -= _image_bytes(old)
+            self._entries[key] = image
+            self._total_bytes += size
+
+            while self._total_bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._total_bytes -= _image_bytes(evicted)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def total_bytes(self) -> int:
+        return self._total_bytes
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._total_bytes = 0
+
+
+class ThumbnailLoader:
+    """
+    썸네일을 백그라운드 스레드에서 생성하는 로더
+
+    디코딩과 리사이즈는 작업 스레드에서 수행하고, 결과는 callback(썸네일, 에러 메시지)으로 전달합니다.
+    callback은 작업 스레드에서 호출되므로 GUI에서는 root.after 등으로 메인 스레드에 넘겨야 합니다.
+    """
+
+    def __init__(self, cache: Optional[ThumbnailCache] = None, max_workers: int = 2):
+        """
+        Args:
+            cache: 사용할 썸네일 캐시 (None이면 새로 생성)
+            max_workers: 디코딩 스레드 수
+        """
+        self.cache = cache if cache is not None else ThumbnailCache()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='thumbnail')
+
+    def load(self, image_path: str, max_size: Tuple[int, int], callback: ThumbnailCallback) -> Future:
+        """파일 경로의 썸네일 요청 (캐시에 있으면 디코딩 없이 바로 전달)"""
+        def task():
+            try:
+                key = ThumbnailCache.key_for(image_path, max_size)
+                thumbnail = self.cache.get(key)
+                if thumbnail is None:
+                    thumbnail = load_thumbnail(image_path, max_size)
+                    self.cache.put(key, thumbnail)
+            except Exception as e:
+                callback(None, str(e))
+                return
+            callback(thumbnail, None)
+
+        return self._executor.submit(task)
+
+    def load_bytes(self, key: Hashable, read: Callable[[], bytes], max_size: Tuple[int, int],
+                   callback: ThumbnailCallback, wanted: Optional[Callable[[], bool]] = None) -> Future:
+        """
+        파일이 아닌 곳(ZIP 멤버 등)에 있는 이미지의 썸네일 요청
+
+        Args:
+            key: 원본 이미지를 식별하는 캐시 키 (썸네일 크기는 자동으로 덧붙임)
+            read: 작업 스레드에서 호출해 인코딩된 이미지 바이트를 반환하는 함수
+            max_size: 썸네일 최대 크기
+            callback: 결과를 받을 콜백 (작업 스레드에서 호출)
+            wanted: 디코딩 직전에 호출해 False이면 건너뛰는 함수 (스크롤로 화면에서 벗어난 요청 등,
+                    건너뛰면 callback을 호출하지 않음)
+        """
+        def task():
+            if wanted is not None and not wanted():
+                return
+            try:
+                cache_key = (key, tuple(max_size))
+                thumbnail = self.cache.get(cache_key)
+                if thumbnail is None:
+                    thumbnail = load_thumbnail(io.BytesIO(read()), max_size)
+                    self.cache.put(cache_key, thumbnail)
+            except Exception as e:
+                callback(None, str(e))
+                return
+            callback(thumbnail, None)
+
+        return self._executor.submit(task)
+
+    def load_image(self, image: Image.Image, max_size: Tuple[int, int], callback: ThumbnailCallback) -> Future:
+        """이미 메모리에 있는 PIL 이미지의 썸네일 요청 (추론 결과 등, 캐시하지 않음)"""
+        def task():
+            try:
+                thumbnail = make_thumbnail(image, max_size)
+            except Exception as e:
+                callback(None, str(e))
+                return
+            callback(thumbnail, None)
+
+        return self._executor.submit(task)
+
+    def close(self):
+        """작업 스레드 종료 (진행 중인 디코딩은 기다리지 않음)"""
+        self._executor.shutdown(wait=False)